@@ -0,0 +1,134 @@
+import os
+import random
+import sys
+from typing import List, Optional
+
+from project.controller.cli_parser import CLIArgumentParser
+
+# Готовые размеры наборов данных
+SIZES = {
+    '10k': 10_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000,
+}
+
+# Количество строк, формируемых и записываемых за один раз
+WRITE_BATCH = 10_000
+
+# Аргументы генератора: python -m benchmarks.generate --rows 1m --output data.csv
+GENERATE_ARGUMENT_DEFINITIONS: dict[str, dict[str, any]] = {
+    'rows': {
+        'type': str,
+        'default': '10k',
+        'help': 'Количество строк: число или готовый размер (10k, 1m, 10m)',
+        'required': False
+    },
+    'output': {
+        'type': str,
+        'help': 'Путь к создаваемому CSV-файлу',
+        'required': True
+    },
+    'extra-columns': {
+        'type': int,
+        'default': 0,
+        'help': 'Количество дополнительных строковых колонок attr_N',
+        'required': False
+    },
+    'brands': {
+        'type': int,
+        'default': 50,
+        'help': 'Количество различных брендов (кардинальность колонки brand)',
+        'required': False
+    },
+    'cardinality': {
+        'type': int,
+        'default': 1000,
+        'help': 'Количество различных значений дополнительных колонок',
+        'required': False
+    },
+    'seed': {
+        'type': int,
+        'default': 0,
+        'help': 'Начальное значение генератора случайных чисел',
+        'required': False
+    }
+}
+
+
+def parse_rows(rows: str) -> int:
+    """Разбирает количество строк: число или название готового размера.
+
+    Raises:
+        ValueError: Если значение не число и не готовый размер.
+    """
+    if rows.lower() in SIZES:
+        return SIZES[rows.lower()]
+    try:
+        count = int(rows.replace('_', ''))
+    except ValueError:
+        raise ValueError(f"Некорректное количество строк: {rows} (число или {', '.join(SIZES)})") from None
+    if count < 0:
+        raise ValueError(f"Некорректное количество строк: {rows}")
+    return count
+
+
+def generate_csv(
+    file_path: str,
+    rows: int,
+    extra_columns: int = 0,
+    brands: int = 50,
+    cardinality: int = 1000,
+    seed: int = 0
+) -> None:
+    """Создает CSV-файл с товарами, похожий на sample/products.csv.
+
+    Колонки: name (уникальная), brand, price (целое), rating (одна цифра
+    после запятой) и extra_columns строковых колонок attr_N. Содержимое
+    определяется только параметрами: при одинаковых параметрах файлы
+    совпадают побайтно, поэтому замеры разных коммитов сравнимы.
+
+    Args:
+        file_path: Путь к создаваемому файлу.
+        rows: Количество строк данных.
+        extra_columns: Количество дополнительных колонок.
+        brands: Количество различных брендов.
+        cardinality: Количество различных значений дополнительных колонок.
+        seed: Начальное значение генератора случайных чисел.
+
+    Raises:
+        ValueError: Если параметры некорректны.
+    """
+    if rows < 0 or extra_columns < 0 or brands < 1 or cardinality < 1:
+        raise ValueError("Некорректные параметры генератора данных")
+    rng = random.Random(seed)
+    brand_names = [f"brand{i:03d}" for i in range(brands)]
+    header = ['name', 'brand', 'price', 'rating'] + [f"attr_{i + 1}" for i in range(extra_columns)]
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(file_path, mode='w', encoding='utf-8', newline='') as csvfile:
+        csvfile.write(','.join(header) + '\n')
+        for start in range(0, rows, WRITE_BATCH):
+            lines: List[str] = []
+            for i in range(start, min(start + WRITE_BATCH, rows)):
+                line = (
+                    f"product {i},{brand_names[rng.randrange(brands)]},"
+                    f"{rng.randint(10, 5000)},{rng.randint(10, 50) / 10}"
+                )
+                for _ in range(extra_columns):
+                    line += f",v{rng.randrange(cardinality)}"
+                lines.append(line + '\n')
+            csvfile.writelines(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Создает набор данных по аргументам командной строки."""
+    parser = CLIArgumentParser(prog='benchmarks.generate', description='Генератор CSV-файлов для замеров')
+    for flag, params in GENERATE_ARGUMENT_DEFINITIONS.items():
+        parser.add_argument('--'+flag, **params)
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    generate_csv(args.output, parse_rows(args.rows), args.extra_columns, args.brands, args.cardinality, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from tabulate import tabulate
+
+from benchmarks.generate import generate_csv, parse_rows
+from project.controller.cli_parser import CLIArgumentParser
+from project.model.csv_parser import CSVParser
+from project.model.predicates import PredicateParser
+from project.model.processors import Aggregate, OrderBy, Where
+
+try:
+    import resource
+except ImportError:  # resource есть только в Unix; без него пиковая память не измеряется
+    resource = None
+
+try:
+    import numpy
+except ImportError:  # NumPy - необязательная зависимость
+    numpy = None
+
+# Корень репозитория: рабочий каталог процессов замеров
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Условие фильтрации замеров: проходит примерно половина строк
+WHERE_CONDITION = 'price>2500'
+
+# Агрегаты, замеряемые по отдельности
+AGGREGATE_FUNCTIONS = ('min', 'max', 'avg', 'sum', 'count', 'median', 'p90')
+
+# Запрос полного конвейера командной строки
+CLI_QUERY = ['--where', WHERE_CONDITION, '--group-by', 'brand', '--aggregate', 'price=avg,rating=max']
+
+# Относительное замедление, которое считается регрессией
+REGRESSION_THRESHOLD = 0.1
+
+Case = Callable[[str], Callable[[], Any]]
+
+
+def _on_rows(operation: Callable[[List[Dict[str, str]], Any], Any]) -> Case:
+    """Замер операции над строками, заранее прочитанными CSVParser.parse."""
+    def prepare(file_path: str) -> Callable[[], Any]:
+        rows = CSVParser.parse(file_path)
+        schema = CSVParser.infer_schema(file_path)
+        return lambda: operation(rows, schema)
+    return prepare
+
+
+def _aggregate(aggregator_type: str) -> Case:
+    """Замер одной агрегатной функции по колонке price."""
+    return _on_rows(lambda rows, schema: Aggregate.execute(rows, ('price', '=', aggregator_type), schema))
+
+
+def _cli(flags: List[str]) -> Case:
+    """Замер полного конвейера: запуск python -m project.main в отдельном процессе."""
+    def prepare(file_path: str) -> Callable[[], Any]:
+        command = [sys.executable, '-m', 'project.main', '--file', file_path] + flags
+        return lambda: subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+    return prepare
+
+
+CASES: Dict[str, Case] = {
+    'parse': lambda file_path: lambda: CSVParser.parse(file_path),
+    'parse_table': lambda file_path: lambda: CSVParser.parse_table(file_path),
+    'where': _on_rows(lambda rows, schema: Where.execute(rows, PredicateParser.parse(WHERE_CONDITION), schema)),
+    'order_by': _on_rows(lambda rows, schema: OrderBy.execute(rows, ('price', '=', 'desc'), schema)),
+    **{f'aggregate_{name}': _aggregate(name) for name in AGGREGATE_FUNCTIONS},
+    'cli_stream': _cli(CLI_QUERY),
+    'cli_columnar': _cli(CLI_QUERY + ['--engine', 'columnar']),
+}
+
+# Аргументы запуска: python -m benchmarks.run --sizes 10k,1m --compare old.json
+RUN_ARGUMENT_DEFINITIONS: dict[str, dict[str, any]] = {
+    'sizes': {
+        'type': str,
+        'default': '10k,1m',
+        'help': 'Размеры наборов данных через запятую: 10k, 1m, 10m или число строк',
+        'required': False
+    },
+    'cases': {
+        'type': str,
+        'help': 'Замеры через запятую (по умолчанию все): ' + ', '.join(CASES),
+        'required': False
+    },
+    'repeat': {
+        'type': int,
+        'default': 3,
+        'help': 'Количество повторов замера; в отчет попадает лучшее время',
+        'required': False
+    },
+    'data-dir': {
+        'type': str,
+        'default': os.path.join('benchmarks', 'data'),
+        'help': 'Каталог сгенерированных наборов данных (создаются один раз)',
+        'required': False
+    },
+    'extra-columns': {
+        'type': int,
+        'default': 0,
+        'help': 'Количество дополнительных колонок наборов данных',
+        'required': False
+    },
+    'brands': {
+        'type': int,
+        'default': 50,
+        'help': 'Количество различных брендов',
+        'required': False
+    },
+    'cardinality': {
+        'type': int,
+        'default': 1000,
+        'help': 'Количество различных значений дополнительных колонок',
+        'required': False
+    },
+    'output': {
+        'type': str,
+        'help': 'Путь к JSON-файлу результатов (по умолчанию benchmarks/results/<коммит>.json)',
+        'required': False
+    },
+    'compare': {
+        'type': str,
+        'help': 'JSON-файл прошлых результатов: при замедлении больше порога код выхода 1',
+        'required': False
+    },
+    'threshold': {
+        'type': float,
+        'default': REGRESSION_THRESHOLD,
+        'help': 'Порог регрессии: относительное замедление, например 0.1',
+        'required': False
+    }
+}
+
+
+def measure(case: str, file_path: str, repeat: int) -> Dict[str, Any]:
+    """Выполняет замер в текущем процессе.
+
+    Подготовка (например, чтение строк для where) в замер времени не входит.
+    Пиковая память - наибольший RSS текущего процесса и его дочерних
+    процессов, поэтому каждый замер запускается в отдельном процессе.
+
+    Args:
+        case: Название замера из CASES.
+        file_path: Путь к CSV-файлу.
+        repeat: Количество повторов.
+
+    Returns:
+        Лучшее и среднее время в секундах и пиковый RSS в байтах (None, если не измерен).
+    """
+    run = CASES[case](file_path)
+    times = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return {'best': min(times), 'mean': sum(times) / len(times), 'peak_rss': _peak_rss()}
+
+
+def _peak_rss() -> Optional[int]:
+    """Пиковый RSS процесса и его дочерних процессов в байтах."""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # В Linux ru_maxrss в килобайтах, в macOS - в байтах
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _measure_in_subprocess(case: str, file_path: str, repeat: int) -> Dict[str, Any]:
+    """Выполняет замер в новом процессе, чтобы пиковая память не зависела от предыдущих замеров."""
+    code = 'import json, sys; from benchmarks.run import measure; ' \
+           'print(json.dumps(measure(sys.argv[1], sys.argv[2], int(sys.argv[3]))))'
+    completed = subprocess.run(
+        [sys.executable, '-c', code, case, file_path, str(repeat)],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if completed.returncode:
+        raise RuntimeError(f"Замер {case} завершился с ошибкой:\n{completed.stderr}")
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def run_benchmarks(
+    sizes: List[str],
+    cases: List[str],
+    repeat: int = 3,
+    data_dir: str = os.path.join('benchmarks', 'data'),
+    extra_columns: int = 0,
+    brands: int = 50,
+    cardinality: int = 1000
+) -> Dict[str, Any]:
+    """Выполняет замеры на наборах данных заданных размеров.
+
+    Наборы данных создаются генератором один раз и переиспользуются.
+
+    Args:
+        sizes: Размеры наборов данных (10k, 1m, 10m или число строк).
+        cases: Названия замеров из CASES.
+        repeat: Количество повторов каждого замера.
+        data_dir: Каталог наборов данных.
+        extra_columns: Количество дополнительных колонок.
+        brands: Количество различных брендов.
+        cardinality: Количество различных значений дополнительных колонок.
+
+    Returns:
+        Отчет: сведения об окружении и результаты замеров.
+
+    Raises:
+        ValueError: Если замер неизвестен.
+    """
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        raise ValueError(f"Неизвестные замеры: {', '.join(unknown)}")
+    results = []
+    for size in sizes:
+        rows = parse_rows(size)
+        file_path = os.path.abspath(os.path.join(
+            data_dir, f"products_{rows}_{extra_columns}_{brands}_{cardinality}.csv"
+        ))
+        if not os.path.exists(file_path):
+            generate_csv(file_path, rows, extra_columns, brands, cardinality)
+        file_size = os.path.getsize(file_path)
+        for case in cases:
+            measurement = _measure_in_subprocess(case, file_path, repeat)
+            best = measurement['best']
+            results.append({
+                'dataset': size,
+                'rows': rows,
+                'case': case,
+                **measurement,
+                'rows_per_second': rows / best if best else None,
+                'mb_per_second': file_size / best / (1 << 20) if best else None,
+            })
+    return {
+        'commit': _git_commit(),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': numpy is not None,
+        'extra_columns': extra_columns,
+        'brands': brands,
+        'cardinality': cardinality,
+        'results': results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = REGRESSION_THRESHOLD
+) -> List[Dict[str, Any]]:
+    """Сравнивает результаты двух запусков по одинаковым замерам и наборам данных.
+
+    Args:
+        baseline: Отчет прошлого запуска.
+        current: Отчет текущего запуска.
+        threshold: Относительное замедление, которое считается регрессией.
+
+    Returns:
+        Строки сравнения: время до и после, отношение и признак регрессии.
+    """
+    previous = {(result['dataset'], result['case']): result for result in baseline['results']}
+    rows = []
+    for result in current['results']:
+        old = previous.get((result['dataset'], result['case']))
+        if old is None or not old['best']:
+            continue
+        ratio = result['best'] / old['best']
+        rows.append({
+            'dataset': result['dataset'],
+            'case': result['case'],
+            'before': old['best'],
+            'after': result['best'],
+            'ratio': ratio,
+            'regression': ratio > 1 + threshold,
+        })
+    return rows
+
+
+def _git_commit() -> Optional[str]:
+    """Текущий коммит репозитория или None, если git недоступен."""
+    try:
+        completed = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True)
+    except OSError:
+        return None
+    return completed.stdout.strip() or None
+
+
+def _report_table(report: Dict[str, Any]) -> str:
+    """Форматирует результаты замеров для вывода в терминал."""
+    return tabulate([
+        {
+            'dataset': result['dataset'],
+            'case': result['case'],
+            'best, s': round(result['best'], 4),
+            'rows/s': round(result['rows_per_second'] or 0),
+            'MB/s': round(result['mb_per_second'] or 0, 1),
+            'peak RSS, MB': None if result['peak_rss'] is None else round(result['peak_rss'] / (1 << 20), 1),
+        }
+        for result in report['results']
+    ], headers='keys', tablefmt='github')
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Выполняет замеры, сохраняет отчет и сравнивает его с прошлым.
+
+    Returns:
+        Код выхода: 1, если при сравнении найдены регрессии, иначе 0.
+    """
+    parser = CLIArgumentParser(prog='benchmarks.run', description='Замеры производительности Workmate')
+    for flag, params in RUN_ARGUMENT_DEFINITIONS.items():
+        parser.add_argument('--'+flag, **params)
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    sizes = [size.strip() for size in args.sizes.split(',') if size.strip()]
+    cases = [case.strip() for case in args.cases.split(',')] if args.cases else list(CASES)
+    report = run_benchmarks(sizes, cases, args.repeat, args.data_dir, args.extra_columns, args.brands, args.cardinality)
+    print(_report_table(report))
+
+    output = args.output or os.path.join('benchmarks', 'results', f"{(report['commit'] or 'local')[:12]}.json")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, mode='w', encoding='utf-8') as report_file:
+        json.dump(report, report_file, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты сохранены: {output}")
+
+    if not args.compare:
+        return 0
+    with open(args.compare, encoding='utf-8') as baseline_file:
+        rows = compare(json.load(baseline_file), report, args.threshold)
+    print()
+    print(tabulate(rows, headers='keys', tablefmt='github', floatfmt='.4f'))
+    regressions = [row for row in rows if row['regression']]
+    if regressions:
+        print(f"\nРегрессии: {len(regressions)} (замедление больше {args.threshold:.0%})")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
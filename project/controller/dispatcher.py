@@ -1,33 +1,205 @@
 import argparse
-from typing import Dict, List, Tuple, Union, Any
+import glob
+import json
+import os
+import sys
+from typing import Collection, Dict, Iterable, List, Optional, Set, Tuple, Union, Any
 from tabulate import tabulate
+from project.model.compression import is_compressed
 from project.model.csv_parser import CSVParser
-from project.model.util import ExpressionParser
-from project.model.processors import Aggregate, Where, OrderBy
+from project.model.external_sort import ExternalSort
+from project.model.grouping import HashAggregate
+from project.model.index import IndexedReader, SecondaryIndex
+from project.model.parallel import ParallelScan
+from project.model.planner import QueryPlan, QueryPlanner
+from project.model.predicates import PredicateParser
+from project.model.processors import Aggregate, Limit, Select, Where, OrderBy
+from project.model.profiler import Profiler
+from project.model.result_cache import DEFAULT_ENTRIES, ResultCache
+from project.model.schema import Schema
+from project.model.table import Table
+from project.model.table_cache import DEFAULT_CACHE_SIZE, TableCache
+from project.model.util import ExpressionParser, parse_size
 from project.view.results_printer import print_results
+from project.view.writers import OUTPUT_FORMATS, write_results
 from project.controller.cli_parser import CLIArgumentParser
+from project.controller.server import DEFAULT_HOST, DEFAULT_PORT, QUERY_FIELDS, QueryClient, QueryServer
 
 # Определения аргументов командной строки
 ARGUMENT_DEFINITIONS: dict[str, dict[str, any]] = {
     'file': {
         'type': str,
-        'help': 'Путь к CSV-файлу',
+        'help': 'Путь к CSV-файлу или шаблон, например "data/2026-*.csv" (шарды обрабатываются параллельно)',
         'required': True
     },
     'where': {
         'type': str,
-        'help': 'Флаг фильтрации',
+        'help': 'Флаг фильтрации: сравнения, AND/OR/NOT, скобки, IN (...), BETWEEN ... AND ..., LIKE',
+        'required': False
+    },
+    'select': {
+        'type': str,
+        'help': 'Колонки результата через запятую, например "name,price"; остальные колонки не читаются',
         'required': False
     },
     'aggregate': {
         'type': str,
-        'help': 'Флаг агрегации',
+        'help': 'Флаг агрегации; несколько агрегатов через запятую считаются за один проход',
         'required': False
     },
     'order-by': {
         'type': str,
         'help': 'Флаг порядка сортировки',
         'required': False
+    },
+    'engine': {
+        'type': str,
+        'choices': ['stream', 'columnar'],
+        'default': 'stream',
+        'help': 'Движок обработки: потоковый построчный (по умолчанию) или колоночная таблица в памяти; '
+                'колоночный окупается с --cache-dir и в режиме serve',
+        'required': False
+    },
+    'schema': {
+        'type': str,
+        'help': 'Типы колонок, например "price:int,rating:float" (отключает автоопределение)',
+        'required': False
+    },
+    'workers': {
+        'type': int,
+        'default': 1,
+        'help': 'Количество процессов для параллельной обработки файла по частям',
+        'required': False
+    },
+    'cache-dir': {
+        'type': str,
+        'help': 'Каталог двоичного кэша разобранных файлов (включает колоночный движок)',
+        'required': False
+    },
+    'cache-size': {
+        'type': str,
+        'default': '1G',
+        'help': 'Максимальный размер кэша, например 512M или 2G',
+        'required': False
+    },
+    'limit': {
+        'type': int,
+        'help': 'Максимальное количество выводимых строк (с --order-by - отбор top-K кучей)',
+        'required': False
+    },
+    'sort-memory': {
+        'type': str,
+        'help': 'Бюджет памяти сортировки, например 512M; сверх него фрагменты сбрасываются на диск',
+        'required': False
+    },
+    'group-by': {
+        'type': str,
+        'help': 'Поле группировки: агрегаты считаются для каждого значения поля (без --aggregate - количество строк)',
+        'required': False
+    },
+    'max-groups': {
+        'type': int,
+        'help': 'Максимальное количество групп в памяти; строки остальных групп сбрасываются на диск по разделам',
+        'required': False
+    },
+    'approx': {
+        'action': 'store_true',
+        'help': 'Приближенные median и квантили pNN в постоянной памяти (потоковый движок без --workers)',
+        'required': False
+    },
+    'server': {
+        'type': str,
+        'help': 'Адрес сервера запросов (host:port): запрос выполняется над уже загруженным файлом',
+        'required': False
+    },
+    'result-cache': {
+        'type': str,
+        'help': 'Каталог кэша результатов: повторный запрос к неизмененному файлу не выполняется заново',
+        'required': False
+    },
+    'result-cache-size': {
+        'type': str,
+        'default': '256M',
+        'help': 'Максимальный размер кэша результатов, например 64M',
+        'required': False
+    },
+    'result-ttl': {
+        'type': float,
+        'help': 'Время жизни результата в кэше, секунд',
+        'required': False
+    },
+    'output': {
+        'type': str,
+        'choices': list(OUTPUT_FORMATS),
+        'default': 'table',
+        'help': 'Формат вывода: таблица (не больше 1000 строк) или потоковые csv, tsv, jsonl, binary',
+        'required': False
+    },
+    'profile': {
+        'nargs': '?',
+        'const': 'table',
+        'choices': ['table', 'json'],
+        'help': 'Замер этапов (время, CPU, строки, байты, пик памяти) в stderr: таблицей или в JSON',
+        'required': False
+    },
+    'explain': {
+        'nargs': '?',
+        'const': 'table',
+        'choices': ['table', 'json'],
+        'help': 'Показать план выполнения запроса без его выполнения: таблицей или в JSON',
+        'required': False
+    }
+}
+
+# Аргументы команды построения индекса: index build --file X --column brand
+INDEX_ARGUMENT_DEFINITIONS: dict[str, dict[str, any]] = {
+    'file': {
+        'type': str,
+        'help': 'Путь к CSV-файлу',
+        'required': True
+    },
+    'column': {
+        'type': str,
+        'help': 'Колонка, по которой строится индекс',
+        'required': True
+    }
+}
+
+# Аргументы сервера запросов: serve --file a.csv --file b.csv --port 8765
+SERVE_ARGUMENT_DEFINITIONS: dict[str, dict[str, any]] = {
+    'file': {
+        'type': str,
+        'action': 'append',
+        'help': 'Путь к CSV-файлу; флаг можно повторять',
+        'required': True
+    },
+    'schema': {
+        'type': str,
+        'help': 'Типы колонок, например "price:int,rating:float" (отключает автоопределение)',
+        'required': False
+    },
+    'host': {
+        'type': str,
+        'default': DEFAULT_HOST,
+        'help': 'Адрес, на котором сервер принимает запросы',
+        'required': False
+    },
+    'port': {
+        'type': int,
+        'default': DEFAULT_PORT,
+        'help': 'Порт сервера',
+        'required': False
+    },
+    'cache-dir': {
+        'type': str,
+        'help': 'Каталог двоичного кэша разобранных файлов',
+        'required': False
+    },
+    'cache-size': {
+        'type': str,
+        'default': '1G',
+        'help': 'Максимальный размер кэша, например 512M или 2G',
+        'required': False
     }
 }
 
@@ -36,45 +208,700 @@ class CLIArgumentsDispatcher:
 
     @staticmethod
     def _processor_pipeline(
-        csv_obj: List[Dict[str, str]],
-        args: argparse.Namespace
+        csv_obj: Iterable[Dict[str, str]],
+        args: argparse.Namespace,
+        schema: Optional[Schema] = None,
+        cache: Optional[ResultCache] = None,
+        profiler: Optional[Profiler] = None,
+        plan: Optional[QueryPlan] = None,
+        reuse_filters: bool = False
     ) -> Union[List[Dict[str, str]], Dict[str, List[Any]]]:
-        """Обрабатывает данные согласно переданным аргументам.
+        """Обрабатывает данные согласно переданным аргументам, используя кэш результатов.
 
-        Порядок обработки: where -> order_by -> aggregate.
+        Если результат такого же запроса к неизмененному файлу есть в кэше, он
+        возвращается без обработки данных; иначе вычисленный результат
+        сохраняется. Если кэш живет между запросами (сервер), фильтрация
+        переиспользует отфильтрованные наборы более широких условий.
 
         Args:
-            csv_obj: Данные CSV в виде списка словарей.
+            csv_obj: Данные CSV в виде списка словарей, потокового итератора
+                или колоночной таблицы.
             args: Аргументы командной строки.
+            schema: Схема с типами колонок для преобразования значений.
+            cache: Кэш результатов. None - без кэширования.
+            profiler: Профилировщик этапов. None - без замеров.
+            plan: План запроса. None - план составляется по аргументам.
+            reuse_filters: Сохранять и переиспользовать отфильтрованные наборы строк.
+                Имеет смысл, только если кэш переживает запрос: в однократном
+                запуске фильтр объединяется с агрегацией и не буферизуется.
 
         Returns:
             Обработанные данные в зависимости от аргументов.
         """
+        if cache is None:
+            return CLIArgumentsDispatcher._execute_stages(csv_obj, args, schema, profiler=profiler, plan=plan)
+        key = CLIArgumentsDispatcher._result_key(args, 'columnar' if isinstance(csv_obj, Table) else 'stream')
+        result = cache.get(key)
+        if result is None:
+            result = CLIArgumentsDispatcher._execute_stages(
+                csv_obj, args, schema, cache if reuse_filters else None, profiler, plan, materialize=True
+            )
+            cache.put(key, result)
+        return result
+
+    @staticmethod
+    def _execute_stages(
+        csv_obj: Iterable[Dict[str, str]],
+        args: argparse.Namespace,
+        schema: Optional[Schema] = None,
+        filter_cache: Optional[ResultCache] = None,
+        profiler: Optional[Profiler] = None,
+        plan: Optional[QueryPlan] = None,
+        materialize: bool = False
+    ) -> Union[List[Dict[str, str]], Dict[str, List[Any]]]:
+        """Обрабатывает данные по плану запроса (QueryPlanner).
+
+        Логический порядок обработки: where -> order_by -> group_by/aggregate ->
+        limit; сортировка перед агрегацией не выполняется (при группировке она
+        задает порядок групп), а фильтр перед агрегацией потока проверяется
+        в ее цикле. Между этапами данные передаются итератором, поэтому
+        фильтрация и агрегаты min/max/avg работают потоково; целиком в памяти
+        строки держат только сортировка в памяти и median. Группировка хранит по накопителю на группу. Сортировка
+        с лимитом хранит не больше limit строк, а для больших файлов и при
+        заданном бюджете памяти выполняется внешняя сортировка слиянием.
+        Колоночная таблица обрабатывается векторными операциями над колонками.
+
+        Args:
+            csv_obj: Данные CSV в виде списка словарей, потокового итератора
+                или колоночной таблицы.
+            args: Аргументы командной строки.
+            schema: Схема с типами колонок для преобразования значений.
+            filter_cache: Кэш отфильтрованных наборов строк. None - без кэширования.
+            profiler: Профилировщик этапов. None - без замеров.
+            plan: План запроса. None - план составляется по аргументам.
+            materialize: Вернуть строки списком даже для потокового формата
+                вывода (результат сохраняется в кэш).
+
+        Returns:
+            Обработанные данные в зависимости от аргументов. Строки для
+            потокового формата вывода (--output) возвращаются итератором.
+        """
         data = csv_obj
         args_dict = vars(args)
+        profiler = profiler or Profiler(enabled=False)
+        if plan is None:
+            file_path = None if isinstance(data, Table) else args_dict.get('file')
+            plan = CLIArgumentsDispatcher._plan(args, schema, file_path)
+        # Кэш переиспользует отфильтрованные наборы, поэтому с ним фильтр остается отдельным этапом
+        fused = plan.fused and filter_cache is None and not isinstance(data, Table)
+        if plan.select is not None and isinstance(data, Table) and filter_cache is None:
+            # Фильтр и сортировка переставляют только нужные колонки
+            data = data.select([name for name in data.column_names if name in plan.fields])
+
+        if plan.predicate is not None and not fused:
+            if filter_cache is not None:
+                if isinstance(data, Table):
+                    data = profiler.call(
+                        'where', filter_cache.filter, data, plan.predicate, args.file, schema, plan.fields
+                    )
+                else:
+                    data = profiler.iterate(
+                        'where', filter_cache.filter(data, plan.predicate, args.file, schema, plan.fields)
+                    )
+            elif isinstance(data, Table):
+                data = profiler.call('where', Where.execute, data, plan.predicate, schema)
+            else:
+                data = profiler.iterate('where', Where.iter_filter(data, plan.predicate, schema))
+
+        match plan.sort:
+            case 'top_k':
+                data = profiler.call('order_by', OrderBy.execute, data, plan.order_by, schema, args.limit)
+            case 'external':
+                data = profiler.iterate(
+                    'order_by', ExternalSort.iter_sorted(data, plan.order_by, plan.sort_memory, schema)
+                )
+            case 'memory':
+                data = profiler.call('order_by', OrderBy.execute, data, plan.order_by, schema)
+
+        where = plan.predicate if fused else None
+        prefix = 'where+' if fused else ''
+        if plan.group_by:
+            result = profiler.call(
+                prefix + 'group_by', HashAggregate.execute, data, plan.group_by, plan.aggregates, schema,
+                approximate=bool(args_dict.get('approx')),
+                max_groups=args_dict.get('max_groups'),
+                where=where
+            )
+            if plan.order_by is not None:
+                result = HashAggregate.order(result, plan.order_by[2])
+            return Limit.execute_columns(result, plan.limit)
+
+        if plan.aggregates:
+            return profiler.call(
+                prefix + 'aggregate', Aggregate.execute_many, data, plan.aggregates, schema,
+                bool(args_dict.get('approx')), where
+            )
+
+        if plan.limit is not None:
+            if isinstance(data, Table):
+                data = profiler.call('limit', Limit.execute, data, plan.limit)
+            else:
+                data = profiler.iterate('limit', Limit.iter_limit(data, plan.limit))
+
+        if plan.select is not None:
+            if isinstance(data, Table):
+                data = profiler.call('select', Select.execute, data, plan.select)
+            else:
+                data = profiler.iterate('select', Select.iter_project(data, plan.select))
 
+        if isinstance(data, Table):
+            return data.to_dict() if len(data) else []
+        if not materialize and args_dict.get('output') not in (None, 'table'):
+            # Потоковые форматы вывода записывают строки по мере их получения
+            return data
+        # Для табличного вывода и кэша нужен весь результат
+        return list(data)
+
+    @staticmethod
+    def _parallel_pipeline(
+        args: argparse.Namespace,
+        schema: Optional[Schema] = None,
+        files: Optional[List[str]] = None
+    ) -> Union[List[Dict[str, str]], Dict[str, List[Any]]]:
+        """Обрабатывает файл или несколько файлов по частям в нескольких процессах.
+
+        Args:
+            args: Аргументы командной строки.
+            schema: Схема с типами колонок для преобразования значений.
+            files: Файлы-шарды. None - один файл args.file.
+
+        Returns:
+            Обработанные данные в том же виде, что и у последовательного конвейера.
+        """
+        args_dict = vars(args)
+        expressions = {}
         if args_dict.get('where'):
-            expression = ExpressionParser.parse_expression(args.where)
-            data = Where.execute(data, expression)
+            expressions['where'] = PredicateParser.parse(args.where)
+        if args_dict.get('order_by'):
+            expressions['order_by'] = ExpressionParser.parse_expression(args.order_by)
+        if args_dict.get('aggregate'):
+            expressions['aggregates'] = ExpressionParser.parse_expressions(args.aggregate)
+        plan = CLIArgumentsDispatcher._plan(args)
+        result = ParallelScan.execute(
+            files or args.file,
+            args.workers,
+            group_by=args_dict.get('group_by'),
+            schema=schema,
+            limit=args_dict.get('limit'),
+            fields=plan.fields,
+            **expressions
+        )
+        return result if plan.select is None else Select.execute(result, plan.select)
+
+    @staticmethod
+    def _referenced_fields(args: argparse.Namespace) -> Optional[Set[str]]:
+        """Определяет поля, которые нужно читать из файла для выполнения запроса.
 
-        if args_dict.get('order_by'):  # argparse заменяет дефисы на подчеркивания
-            expression = ExpressionParser.parse_expression(args.order_by)
-            data = OrderBy.execute(data, expression)
+        Если результатом будет агрегат, достаточно полей из where, aggregate и
+        group_by (сортировка перед агрегацией не выполняется); остальные колонки
+        можно не декодировать. Если выводятся строки, нужны все колонки или
+        выбранные --select вместе с полями условия и сортировки.
 
+        Args:
+            args: Аргументы командной строки.
+
+        Returns:
+            Множество полей или None, если нужны все поля.
+        """
+        return CLIArgumentsDispatcher._plan(args).fields
+
+    @staticmethod
+    def _plan(
+        args: argparse.Namespace,
+        schema: Optional[Schema] = None,
+        file_path: Optional[str] = None,
+        use_index: bool = False
+    ) -> QueryPlan:
+        """Составляет план запроса по аргументам командной строки.
+
+        Args:
+            args: Аргументы командной строки.
+            schema: Схема с типами колонок.
+            file_path: CSV-файл, читаемый потоково. None - данные в памяти.
+            use_index: Выбирать чтение по индексам.
+
+        Returns:
+            План запроса.
+        """
+        args_dict = vars(args)
+        aggregates = None
         if args_dict.get('aggregate'):
-            expression = ExpressionParser.parse_expression(args.aggregate)
-            _, _, aggregator_type = expression
-            data = {aggregator_type: [Aggregate.execute(data, expression)]}
+            aggregates = ExpressionParser.parse_expressions(args.aggregate)
+        elif args_dict.get('group_by'):
+            aggregates = [(args.group_by, '=', 'count')]
+        sort_memory = args_dict.get('sort_memory')
+        select = ExpressionParser.parse_columns(args.select) if args_dict.get('select') else None
+        return QueryPlanner.plan(
+            PredicateParser.parse(args.where) if args_dict.get('where') else None,
+            ExpressionParser.parse_expression(args.order_by) if args_dict.get('order_by') else None,
+            args_dict.get('group_by'),
+            aggregates,
+            args_dict.get('limit'),
+            schema,
+            file_path,
+            parse_size(sort_memory) if sort_memory else None,
+            use_index,
+            select
+        )
+
+    @staticmethod
+    def _result_key(args: argparse.Namespace, engine: str) -> str:
+        """Вычисляет ключ кэша результата по разобранным выражениям запроса.
+
+        Одинаковые по смыслу запросы (пробелы, регистр значений, порядок
+        операндов AND/OR) получают один ключ. Флаги, не влияющие на
+        результат (бюджет памяти сортировки, лимит групп в памяти), в ключ не входят.
+
+        Args:
+            args: Аргументы командной строки.
+            engine: Движок, которым вычисляется результат (stream, columnar, parallel).
+
+        Returns:
+            Ключ результата для ResultCache.
+        """
+        args_dict = vars(args)
+        query = {
+            'engine': engine,
+            'schema': Schema.parse(args.schema).types if args_dict.get('schema') else None,
+            'where': PredicateParser.parse(args.where).key() if args_dict.get('where') else None,
+            'select': ExpressionParser.parse_columns(args.select) if args_dict.get('select') else None,
+            'order_by': ExpressionParser.parse_expression(args.order_by) if args_dict.get('order_by') else None,
+            'aggregate': ExpressionParser.parse_expressions(args.aggregate) if args_dict.get('aggregate') else None,
+            'group_by': args_dict.get('group_by'),
+            'limit': args_dict.get('limit'),
+            'approx': bool(args_dict.get('approx')),
+        }
+        return ResultCache.fingerprint(CLIArgumentsDispatcher._input_files(args), query)
+
+    @staticmethod
+    def _input_files(args: argparse.Namespace) -> List[str]:
+        """Раскрывает шаблон --file в список файлов.
+
+        Args:
+            args: Аргументы командной строки.
 
-        return data
+        Returns:
+            Файлы, подходящие под шаблон, по алфавиту, или сам путь, если это не шаблон.
+
+        Raises:
+            ValueError: Если под шаблон не подходит ни один файл.
+        """
+        if not any(char in args.file for char in '*?['):
+            return [args.file]
+        files = sorted(glob.glob(args.file))
+        if not files:
+            raise ValueError(f"Нет файлов, подходящих под шаблон: {args.file}")
+        return files
 
     @staticmethod
-    def run() -> None:
-        """Основной метод, запускающий обработку аргументов и данных."""
+    def _shard_pipeline(
+        args: argparse.Namespace,
+        files: List[str],
+        schema: Optional[Schema] = None
+    ) -> Union[List[Dict[str, str]], Dict[str, List[Any]]]:
+        """Обрабатывает несколько файлов-шардов одновременно.
+
+        Файлы фильтруются и частично агрегируются или сортируются независимо
+        в пуле процессов, частичные результаты объединяются. Колонки и типы
+        шардов сверяются заранее.
+
+        Args:
+            args: Аргументы командной строки.
+            files: Пути к файлам-шардам.
+            schema: Явно заданная схема.
+
+        Returns:
+            Обработанные данные в том же виде, что и для одного файла.
+
+        Raises:
+            ValueError: Если колонки или типы шардов не совпадают или задан колоночный движок.
+        """
+        args_dict = vars(args)
+        if args_dict.get('engine') == 'columnar' or args_dict.get('cache_dir'):
+            raise ValueError("Несколько файлов обрабатываются только потоковым движком")
+        schema = Schema.combine({file_path: CSVParser.infer_schema(file_path) for file_path in files}, schema)
+        if (args_dict.get('workers') or 1) <= 1:
+            args = argparse.Namespace(**{**args_dict, 'workers': min(len(files), os.cpu_count() or 1)})
+        return CLIArgumentsDispatcher._parallel_pipeline(args, schema, files)
+
+    @staticmethod
+    def _write_output(data: Union[Iterable[Dict[str, Any]], Dict[str, List[Any]]], args: argparse.Namespace) -> None:
+        """Выводит результат таблицей или в потоковом формате --output."""
+        output_format = vars(args).get('output') or 'table'
+        if output_format == 'table':
+            print_results(data)
+        else:
+            write_results(data, output_format)
+
+    @staticmethod
+    def _result_cache(args: argparse.Namespace) -> Optional[ResultCache]:
+        """Создает дисковый кэш результатов, если он задан аргументами."""
+        args_dict = vars(args)
+        if not args_dict.get('result_cache'):
+            return None
+        return ResultCache(
+            cache_dir=args.result_cache,
+            max_size=parse_size(args_dict.get('result_cache_size') or '256M'),
+            ttl=args_dict.get('result_ttl')
+        )
+
+    @staticmethod
+    def _load_table(
+        args: argparse.Namespace,
+        schema: Optional[Schema] = None,
+        fields: Optional[Collection[str]] = None,
+        text_fields: Optional[Collection[str]] = None
+    ) -> Table:
+        """Загружает колоночную таблицу из кэша или разбирает CSV-файл.
+
+        Без кэша таблица нужна одному запросу, поэтому разбираются только его
+        колонки, а запись чисел в CSV запоминается только для колонок из LIKE
+        и выводимых колонок; в кэш всегда попадает таблица целиком.
+
+        Args:
+            args: Аргументы командной строки.
+            schema: Схема с типами колонок.
+            fields: Колонки запроса. None - все колонки.
+            text_fields: Колонки, числа которых нужны в записи из CSV (LIKE и
+                вывод строк). None - все колонки.
+
+        Returns:
+            Колоночная таблица.
+        """
+        args_dict = vars(args)
+        if not args_dict.get('cache_dir'):
+            return CSVParser.parse_table(args.file, schema, fields, text_fields)
+        cache_size = args_dict.get('cache_size')
+        cache = TableCache(args.cache_dir, parse_size(cache_size) if cache_size else DEFAULT_CACHE_SIZE)
+        return cache.get_or_parse(args.file, schema, lambda: CSVParser.parse_table(args.file, schema))
+
+    @staticmethod
+    def run_index(argv: List[str]) -> None:
+        """Выполняет команду работы с индексами (index build).
+
+        Args:
+            argv: Аргументы командной строки после слова index.
+        """
+        parser = CLIArgumentParser(prog='index', description='Построение вторичного индекса колонки CSV-файла')
+        parser.add_argument('action', choices=['build'], help='Действие с индексом')
+        for flag, params in INDEX_ARGUMENT_DEFINITIONS.items():
+            parser.add_argument('--'+flag, **params)
+        args = parser.parse_args(argv)
+        info = SecondaryIndex.build(args.file, args.column)
+        print_results({name: [value] for name, value in info.items()})
+
+    @staticmethod
+    def run_serve(argv: List[str]) -> None:
+        """Запускает сервер запросов к файлам, загруженным в память (serve).
+
+        Args:
+            argv: Аргументы командной строки после слова serve.
+        """
+        parser = CLIArgumentParser(prog='serve', description='Сервер запросов к CSV-файлам в памяти')
+        for flag, params in SERVE_ARGUMENT_DEFINITIONS.items():
+            parser.add_argument('--'+flag, **params)
+        args = parser.parse_args(argv)
+        schema = Schema.parse(args.schema) if args.schema else None
+
+        def load(file_path: str) -> Table:
+            return CLIArgumentsDispatcher._load_table(
+                argparse.Namespace(file=file_path, cache_dir=args.cache_dir, cache_size=args.cache_size), schema
+            )
+
+        # Повторяющиеся запросы дашбордов отвечаются из памяти сервера
+        cache = ResultCache(DEFAULT_ENTRIES)
+
+        def execute(table: Table, query: argparse.Namespace, query_schema: Optional[Schema]) -> Any:
+            return CLIArgumentsDispatcher._processor_pipeline(table, query, query_schema, cache, reuse_filters=True)
+
+        server = QueryServer(args.file, load, execute, schema, args.host, args.port)
+        print(f"Сервер запросов: {server.address} (файлов: {len(args.file)})")
+        server.serve()
+
+    @staticmethod
+    def run(argv: Optional[List[str]] = None) -> None:
+        """Основной метод, запускающий обработку аргументов и данных.
+
+        Args:
+            argv: Аргументы командной строки. None - аргументы процесса.
+        """
+        if argv is None:
+            argv = sys.argv[1:]
+        if argv[:1] == ['index']:
+            CLIArgumentsDispatcher.run_index(argv[1:])
+            return
+        if argv[:1] == ['serve']:
+            CLIArgumentsDispatcher.run_serve(argv[1:])
+            return
         parser = CLIArgumentParser(description='Workmate. Тестовое задание')
         for flag, params in ARGUMENT_DEFINITIONS.items():
             parser.add_argument('--'+flag, **params)
-        args = parser.parse_args()
-        csv_obj = CSVParser.parse(args.file)
-        data = CLIArgumentsDispatcher._processor_pipeline(csv_obj, args)
-        print_results(data)
+        args = parser.parse_args(argv)
+        args_dict = vars(args)
+        if args_dict.get('server'):
+            # Тонкий клиент: файл уже разобран и хранится в памяти сервера
+            query = {field: args_dict.get(field) for field in QUERY_FIELDS}
+            query['file'] = os.path.abspath(args.file)
+            CLIArgumentsDispatcher._write_output(QueryClient.execute(args.server, query), args)
+            return
+        schema = Schema.parse(args.schema) if args_dict.get('schema') else None
+        cache = CLIArgumentsDispatcher._result_cache(args)
+        files = CLIArgumentsDispatcher._input_files(args)
+        if len(files) == 1:
+            args.file = files[0]
+        engine = CLIArgumentsDispatcher._choose_engine(args, files)
+        if args_dict.get('explain'):
+            plan = CLIArgumentsDispatcher._explain(args, files, engine, schema, cache)
+            print(json.dumps(plan, ensure_ascii=False, indent=2) if args.explain == 'json' else
+                  tabulate(plan, headers='keys', tablefmt='github'))
+            return
+        profiler = Profiler(enabled=bool(args_dict.get('profile')))
+        profiler.start()
+        try:
+            CLIArgumentsDispatcher._execute(args, files, engine, schema, cache, profiler)
+        finally:
+            profiler.stop()
+        if args_dict.get('profile'):
+            CLIArgumentsDispatcher._print_profile(profiler.report(), args.profile)
+
+    @staticmethod
+    def _execute(
+        args: argparse.Namespace,
+        files: List[str],
+        engine: str,
+        schema: Optional[Schema],
+        cache: Optional[ResultCache],
+        profiler: Profiler
+    ) -> None:
+        """Выполняет запрос выбранным движком и выводит результат."""
+        args_dict = vars(args)
+
+        def read_size(*paths: str) -> Optional[int]:
+            # Размеры файлов нужны только для отчета профилировщика
+            return sum(map(os.path.getsize, paths)) if profiler.enabled else None
+
+        if cache is not None:
+            # При попадании в кэш файл не читается
+            key = CLIArgumentsDispatcher._result_key(args, engine)
+            cached = profiler.call('result_cache', cache.get, key)
+            if cached is not None:
+                profiler.call('output', CLIArgumentsDispatcher._write_output, cached, args)
+                return
+        if args_dict.get('select'):
+            # Потоковое чтение пропускает отсутствующие колонки, поэтому они проверяются по заголовкам
+            for file_path in files:
+                header = CSVParser.read_header(file_path)
+                for name in ExpressionParser.parse_columns(args.select):
+                    if name not in header:
+                        raise ValueError(f"Колонка не найдена: {name}")
+        if engine == 'shards':
+            data = profiler.call(
+                'parallel_scan', CLIArgumentsDispatcher._shard_pipeline, args, files, schema,
+                bytes_read=read_size(*files)
+            )
+            if cache is not None:
+                cache.put(key, data)
+        elif engine == 'columnar':
+            plan = CLIArgumentsDispatcher._plan(args, schema)
+            text_fields = plan.predicate.text_fields() if plan.predicate is not None else set()
+            if not plan.aggregates:
+                # Строки результата выводятся с числами в записи из CSV
+                text_fields = None if plan.fields is None else text_fields | set(plan.fields)
+            csv_obj = profiler.call(
+                'read', CLIArgumentsDispatcher._load_table, args, schema, plan.fields, text_fields,
+                bytes_read=None if args_dict.get('cache_dir') else read_size(args.file)
+            )
+            data = CLIArgumentsDispatcher._processor_pipeline(csv_obj, args, schema, cache, profiler, plan)
+        else:
+            # Типы колонок определяются один раз по выборке, а не для каждой ячейки
+            schema = schema or CSVParser.infer_schema(args.file)
+            if engine == 'parallel':
+                data = profiler.call(
+                    'parallel_scan', CLIArgumentsDispatcher._parallel_pipeline, args, schema,
+                    bytes_read=read_size(args.file)
+                )
+                if cache is not None:
+                    cache.put(key, data)
+            else:
+                plan = CLIArgumentsDispatcher._plan(args, schema, args.file, use_index=True)
+                if plan.access == 'index':
+                    # По актуальным индексам полей условия читаются только записи-кандидаты
+                    csv_obj = IndexedReader.iter_at(args.file, plan.offsets, plan.fields)
+                    bytes_read = None
+                else:
+                    csv_obj = CSVParser.iter_rows(args.file, plan.fields)
+                    bytes_read = read_size(args.file)
+                csv_obj = profiler.iterate('read', csv_obj, bytes_read=bytes_read)
+                data = CLIArgumentsDispatcher._processor_pipeline(csv_obj, args, schema, cache, profiler, plan)
+        profiler.call('output', CLIArgumentsDispatcher._write_output, data, args)
+
+    @staticmethod
+    def _choose_engine(args: argparse.Namespace, files: List[str]) -> str:
+        """Выбирает движок выполнения: shards, columnar, parallel или stream."""
+        args_dict = vars(args)
+        if len(files) > 1:
+            return 'shards'
+        if args_dict.get('engine') == 'columnar' or args_dict.get('cache_dir'):
+            return 'columnar'
+        return 'parallel' if (args_dict.get('workers') or 1) > 1 else 'stream'
+
+    @staticmethod
+    def _explain(
+        args: argparse.Namespace,
+        files: List[str],
+        engine: str,
+        schema: Optional[Schema],
+        cache: Optional[ResultCache]
+    ) -> List[Dict[str, str]]:
+        """Составляет план выполнения запроса, не читая данные файла.
+
+        Проверяются только метаданные: наличие результата в кэше, индексы
+        (по ним считается число записей-кандидатов) и выборка строк для
+        определения типов.
+
+        Args:
+            args: Аргументы командной строки.
+            files: Входные файлы.
+            engine: Выбранный движок.
+            schema: Явно заданная схема.
+            cache: Кэш результатов.
+
+        Returns:
+            Шаги плана: {'step': этап, 'plan': способ выполнения}; шаги rewrite
+            описывают перестановки планировщика.
+        """
+        args_dict = vars(args)
+        plan = []
+
+        def step(name: str, description: str) -> None:
+            plan.append({'step': name, 'plan': description})
+
+        size = sum(os.path.getsize(file_path) for file_path in files)
+        compressed = [file_path for file_path in files if is_compressed(file_path)]
+        step('input', f"{len(files)} файл(ов), {size} байт" + (f", сжатых: {len(compressed)}" if compressed else ''))
+        workers = args_dict.get('workers') or 1
+        match engine:
+            case 'shards':
+                workers = workers if workers > 1 else min(len(files), os.cpu_count() or 1)
+                step('engine', f"шарды: {len(files)} файлов одновременно в {workers} процессах, "
+                               f"частичные результаты объединяются")
+            case 'columnar':
+                step('engine', "колоночная таблица в памяти")
+            case 'parallel':
+                step('engine', f"параллельно: части файла в {workers} процессах, частичные результаты объединяются")
+            case _:
+                step('engine', "потоково: строки читаются по одной, файл в память не загружается")
+        if cache is not None:
+            hit = cache.get(CLIArgumentsDispatcher._result_key(args, engine)) is not None
+            step('result_cache', "результат есть в кэше: файл читаться не будет" if hit else "результата нет в кэше")
+
+        if engine == 'stream':
+            query = CLIArgumentsDispatcher._plan(
+                args, schema or CSVParser.infer_schema(args.file), args.file, use_index=True
+            )
+        else:
+            query = CLIArgumentsDispatcher._plan(args)
+        decoded = "все поля" if query.fields is None else "поля " + ', '.join(sorted(query.fields))
+        if engine == 'columnar':
+            if args_dict.get('cache_dir'):
+                step('read', f"двоичный колоночный кэш {args.cache_dir} (разбор CSV при промахе)")
+            else:
+                step('read', f"разбор CSV в колоночную таблицу, {decoded}")
+        elif engine == 'stream':
+            if query.access == 'index':
+                step('read', f"индекс {', '.join(query.index_fields)}: {len(query.offsets)} записей-кандидатов "
+                             f"из {query.index_rows}, {decoded}")
+            elif compressed:
+                step('read', f"полный просмотр с потоковой распаковкой, {decoded}")
+            else:
+                step('read', f"полный просмотр, {decoded}" + ('' if query.fields is None else " (отображение в память)"))
+        else:
+            step('read', f"полный просмотр по частям, {decoded}")
+        for rewrite in query.rewrites:
+            step('rewrite', rewrite)
+
+        if query.predicate is not None:
+            if engine == 'columnar':
+                detail = "векторный фильтр колонок"
+                if args_dict.get('cache_dir'):
+                    detail += "; блоки отбрасываются по статистикам min/max"
+            elif query.fused and engine == 'stream':
+                detail = "проверяется в цикле агрегации"
+            else:
+                detail = "построчный фильтр"
+            step('where', f"{args.where}: {detail}")
+        if query.order_by is not None and query.group_by:
+            step('order_by', f"{args.order_by}: порядок групп после агрегации")
+        elif query.order_by is not None:
+            match query.sort:
+                case 'top_k':
+                    detail = f"top-K: ограниченная куча на {args.limit} строк"
+                case 'external':
+                    budget = args.sort_memory if args_dict.get('sort_memory') else f"{query.sort_memory >> 20}M"
+                    detail = f"внешняя сортировка слиянием, бюджет памяти {budget}"
+                case _:
+                    detail = "сортировка частей и слияние" if engine in ('parallel', 'shards') else "сортировка в памяти"
+            step('order_by', f"{args.order_by}: {detail}")
+        approximate = bool(args_dict.get('approx'))
+        if query.group_by:
+            detail = "хеш-агрегация, накопитель на группу"
+            if args_dict.get('max_groups'):
+                detail += f"; больше {args.max_groups} групп - сброс разделов на диск"
+            step('group_by', f"{args.group_by}: {detail}")
+        if args_dict.get('aggregate'):
+            detail = "все агрегаты за один проход"
+            if approximate:
+                detail += "; median и квантили - приближенно (P²)"
+            step('aggregate', f"{args.aggregate}: {detail}")
+        if query.limit is not None:
+            step('limit', f"первые {query.limit} строк результата")
+        if query.select is not None:
+            step('select', f"колонки результата: {', '.join(query.select)}")
+        output = args_dict.get('output') or 'table'
+        step('output', "таблица, не больше 1000 строк" if output == 'table' else f"потоковая запись {output}")
+        return plan
+
+    @staticmethod
+    def _print_profile(report: Dict[str, Any], output_format: str) -> None:
+        """Выводит замер этапов в stderr, чтобы не смешивать его с результатом."""
+        if output_format == 'json':
+            print(json.dumps(report, ensure_ascii=False, indent=2), file=sys.stderr)
+            return
+
+        def milliseconds(seconds: Optional[float]) -> Optional[float]:
+            return None if seconds is None else round(seconds * 1000, 1)
+
+        def kilobytes(size: Optional[int]) -> Optional[int]:
+            return None if size is None else round(size / 1024)
+
+        rows = [
+            {
+                'stage': stage['stage'],
+                'wall, ms': milliseconds(stage['wall']),
+                'cpu, ms': milliseconds(stage['cpu']),
+                'rows in': stage['rows_in'],
+                'rows out': stage['rows_out'],
+                'bytes read': stage['bytes_read'],
+                'peak memory, KB': kilobytes(stage['peak_memory']),
+            }
+            for stage in report['stages']
+        ]
+        total = report['total']
+        rows.append({
+            'stage': 'total',
+            'wall, ms': milliseconds(total['wall']),
+            'cpu, ms': milliseconds(total['cpu']),
+            'peak memory, KB': kilobytes(total['peak_memory']),
+        })
+        print(file=sys.stderr)
+        print(tabulate(rows, headers='keys', tablefmt='github'), file=sys.stderr)
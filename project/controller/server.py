@@ -0,0 +1,192 @@
+import argparse
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from project.model.schema import Schema
+from project.model.table import Table
+
+Result = Union[List[Dict[str, Any]], Dict[str, List[Any]]]
+
+# Параметры запроса, которые клиент передает серверу
+QUERY_FIELDS = ('file', 'where', 'select', 'order_by', 'aggregate', 'group_by', 'limit', 'max_groups', 'approx')
+
+# Путь HTTP-запроса на выполнение запроса к данным
+QUERY_PATH = '/query'
+
+# Адрес сервера по умолчанию
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+
+class QueryServer:
+    """Долгоживущий сервер запросов к CSV-файлам, загруженным в память.
+
+    Файлы один раз разбираются в колоночные таблицы; запросы (where, select,
+    order_by, aggregate, group_by, limit) принимаются по HTTP на локальном адресе в
+    JSON и выполняются над готовыми таблицами, без запуска интерпретатора и
+    повторного разбора CSV. Если файл изменился, он перечитывается при
+    следующем запросе к нему. Таблицы только читаются, поэтому запросы
+    выполняются в потоках параллельно.
+    """
+
+    def __init__(
+        self,
+        files: List[str],
+        load: Callable[[str], Table],
+        execute: Callable[[Table, argparse.Namespace, Optional[Schema]], Result],
+        schema: Optional[Schema] = None,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT
+    ) -> None:
+        """
+        Args:
+            files: Пути к CSV-файлам.
+            load: Функция загрузки таблицы файла (разбор или чтение из кэша).
+            execute: Конвейер обработки таблицы по параметрам запроса.
+            schema: Схема с типами колонок.
+            host: Адрес, на котором принимаются запросы.
+            port: Порт. 0 - любой свободный.
+        """
+        self.load = load
+        self.execute = execute
+        self.schema = schema
+        self._lock = threading.Lock()
+        self._tables: Dict[str, Tuple[Tuple[int, int], Table]] = {}
+        for file_path in files:
+            self.table(file_path)
+        self.http = ThreadingHTTPServer((host, port), _QueryHandler)
+        self.http.query_server = self
+
+    @property
+    def address(self) -> str:
+        """Адрес сервера в виде host:port."""
+        host, port = self.http.server_address[:2]
+        return f"{host}:{port}"
+
+    def table(self, file_path: str) -> Table:
+        """Возвращает таблицу файла, перечитывая файл, если он изменился.
+
+        Args:
+            file_path: Путь к CSV-файлу.
+
+        Returns:
+            Колоночная таблица.
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        version = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            loaded = self._tables.get(path)
+            if loaded is None or loaded[0] != version:
+                loaded = self._tables[path] = (version, self.load(path))
+        return loaded[1]
+
+    def query(self, query: Dict[str, Any]) -> Result:
+        """Выполняет запрос к загруженному файлу.
+
+        Args:
+            query: Параметры запроса: file и флаги в форме атрибутов argparse.
+
+        Returns:
+            Результат в том же виде, что и у командной строки.
+
+        Raises:
+            ValueError: Если файл не загружен на сервер или запрос некорректен.
+        """
+        files = list(self._tables)
+        file_path = os.path.abspath(query['file']) if query.get('file') else None
+        if file_path is None and len(files) == 1:
+            file_path = files[0]
+        if file_path not in self._tables:
+            raise ValueError(f"Файл не загружен на сервер: {query.get('file')}")
+        args = argparse.Namespace(**{field: query.get(field) for field in QUERY_FIELDS})
+        args.file = file_path
+        return self.execute(self.table(file_path), args, self.schema)
+
+    def serve(self) -> None:
+        """Принимает запросы до прерывания (Ctrl+C) или вызова shutdown."""
+        try:
+            self.http.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.http.server_close()
+
+    def shutdown(self) -> None:
+        """Останавливает прием запросов."""
+        self.http.shutdown()
+
+
+class _QueryHandler(BaseHTTPRequestHandler):
+    """Обработчик HTTP-запросов: POST /query с JSON-телом запроса."""
+
+    def do_POST(self) -> None:
+        if self.path != QUERY_PATH:
+            self._reply(404, {'error': f"Неизвестный путь: {self.path}"})
+            return
+        try:
+            query = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)))
+            result = self.server.query_server.query(query)
+        except (ValueError, KeyError, TypeError) as e:
+            self._reply(400, {'error': str(e)})
+            return
+        except Exception as e:
+            # Ошибка одного запроса не должна останавливать сервер
+            self._reply(500, {'error': f"Ошибка сервера: {e}"})
+            return
+        self._reply(200, {'result': result})
+
+    def _reply(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Сотни запросов в минуту не должны засорять вывод сервера
+        pass
+
+
+class QueryClient:
+    """Тонкий клиент сервера запросов: передает параметры и получает результат."""
+
+    @staticmethod
+    def execute(address: str, query: Dict[str, Any]) -> Result:
+        """Выполняет запрос на сервере.
+
+        Args:
+            address: Адрес сервера: host:port или URL.
+            query: Параметры запроса.
+
+        Returns:
+            Результат запроса.
+
+        Raises:
+            ValueError: Если сервер отклонил запрос.
+            ConnectionError: Если сервер недоступен.
+        """
+        url = address if address.startswith(('http://', 'https://')) else f"http://{address}"
+        request = urllib.request.Request(
+            url.rstrip('/') + QUERY_PATH,
+            data=json.dumps(query).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return json.loads(response.read())['result']
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read())['error']
+            except (ValueError, KeyError):
+                message = f"HTTP {e.code}: {e.reason}"
+            raise ValueError(message) from None
+        except urllib.error.URLError as e:
+            raise ConnectionError(f"Сервер запросов недоступен: {address} ({e.reason})") from None
@@ -0,0 +1,160 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from project.model.selection import P2Quantile, quantile
+
+# Поддерживаемые типы агрегации, помимо квантилей вида p50, p90, p99.9
+AGGREGATE_TYPES = ('min', 'max', 'avg', 'sum', 'count', 'median')
+
+# Формат названия квантиля: p и процент
+QUANTILE_PATTERN = re.compile(r'p(\d{1,2}(?:\.\d+)?|100)')
+
+
+def quantile_level(aggregator_type: str) -> Optional[float]:
+    """Возвращает уровень квантиля для агрегата median или pNN.
+
+    Args:
+        aggregator_type: Тип агрегации.
+
+    Returns:
+        Уровень от 0 до 1 или None, если агрегат не квантиль.
+    """
+    if aggregator_type == 'median':
+        return 0.5
+    match = QUANTILE_PATTERN.fullmatch(aggregator_type)
+    return float(match.group(1)) / 100 if match else None
+
+
+def validate_aggregate(aggregator_type: str) -> None:
+    """Проверяет тип агрегации.
+
+    Raises:
+        ValueError: Если тип агрегации неизвестен.
+    """
+    if aggregator_type not in AGGREGATE_TYPES and quantile_level(aggregator_type) is None:
+        raise ValueError(f"Неизвестный тип агрегации: {aggregator_type}")
+
+
+class Accumulator:
+    """Накопитель статистик числового поля.
+
+    Хранит count, sum, min и max, а при необходимости и сами значения (для точных
+    квантилей) или потоковые оценки P² (для приближенных). Накопители, собранные
+    по разным частям данных, можно объединять через merge, поэтому они подходят
+    для частичной агрегации в параллельных обработчиках.
+    """
+    __slots__ = ('count', 'total', 'minimum', 'maximum', 'values', 'estimators')
+
+    def __init__(self, keep_values: bool = False, estimated_levels: Tuple[float, ...] = ()) -> None:
+        """
+        Args:
+            keep_values: Сохранять ли все значения (нужно для точных квантилей).
+            estimated_levels: Уровни квантилей, оцениваемых потоково без хранения значений.
+        """
+        self.count = 0
+        self.total = 0
+        self.minimum: Optional[Union[int, float]] = None
+        self.maximum: Optional[Union[int, float]] = None
+        self.values: Optional[List[Union[int, float]]] = [] if keep_values else None
+        self.estimators: Dict[float, P2Quantile] = {level: P2Quantile(level) for level in estimated_levels}
+
+    @classmethod
+    def for_aggregate(cls, aggregator_type: str, approximate: bool = False) -> 'Accumulator':
+        """Создает накопитель, достаточный для вычисления указанного агрегата.
+
+        Args:
+            aggregator_type: Тип агрегации.
+            approximate: Оценивать квантили потоково вместо хранения всех значений.
+        """
+        return cls.for_aggregates((aggregator_type,), approximate)
+
+    @classmethod
+    def for_aggregates(cls, aggregator_types: Iterable[str], approximate: bool = False) -> 'Accumulator':
+        """Создает общий накопитель для нескольких агрегатов одного поля.
+
+        Счетчики count, sum, min и max общие для всех агрегатов; значения
+        сохраняются один раз, даже если по ним считается несколько квантилей.
+
+        Args:
+            aggregator_types: Типы агрегации.
+            approximate: Оценивать квантили потоково вместо хранения всех значений.
+        """
+        levels = tuple(dict.fromkeys(
+            level for level in map(quantile_level, aggregator_types) if level is not None
+        ))
+        if approximate:
+            return cls(estimated_levels=levels)
+        return cls(keep_values=bool(levels))
+
+    def add(self, value: Union[int, float, str]) -> None:
+        """Учитывает очередное значение.
+
+        Raises:
+            ValueError: Если значение строковое.
+        """
+        if isinstance(value, str):
+            raise ValueError("Агрегация для строк не предусмотрена")
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        if self.values is not None:
+            self.values.append(value)
+        for estimator in self.estimators.values():
+            estimator.add(value)
+
+    def merge(self, other: 'Accumulator') -> 'Accumulator':
+        """Добавляет к накопителю статистики другого накопителя.
+
+        Args:
+            other: Накопитель, собранный по другой части данных.
+
+        Returns:
+            Этот же накопитель.
+
+        Raises:
+            ValueError: Если накопители содержат потоковые оценки квантилей.
+        """
+        if self.estimators or other.estimators:
+            raise ValueError("Приближенные квантили нельзя объединять")
+        self.count += other.count
+        self.total += other.total
+        if other.minimum is not None and (self.minimum is None or other.minimum < self.minimum):
+            self.minimum = other.minimum
+        if other.maximum is not None and (self.maximum is None or other.maximum > self.maximum):
+            self.maximum = other.maximum
+        if self.values is not None and other.values is not None:
+            self.values.extend(other.values)
+        return self
+
+    def result(self, aggregator_type: str) -> Union[int, float]:
+        """Вычисляет агрегат по накопленным статистикам.
+
+        Для пустого накопителя возвращается 0.
+
+        Args:
+            aggregator_type: Тип агрегации: min, max, avg, sum, count, median или квантиль pNN.
+
+        Returns:
+            Результат агрегации.
+
+        Raises:
+            ValueError: Если тип агрегации неизвестен.
+        """
+        validate_aggregate(aggregator_type)
+        if not self.count:
+            return 0
+        match aggregator_type:
+            case 'min': return self.minimum
+            case 'max': return self.maximum
+            case 'avg': return self.total / self.count
+            case 'sum': return self.total
+            case 'count': return self.count
+        level = quantile_level(aggregator_type)
+        if level in self.estimators:
+            return self.estimators[level].result()
+        if self.values is None:
+            raise ValueError(f"Накопитель не хранит значения для агрегата {aggregator_type}")
+        return quantile(self.values, level)
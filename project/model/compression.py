@@ -0,0 +1,265 @@
+import bz2
+import gzip
+import io
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Iterator, List, Optional, TextIO, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstandard - необязательная зависимость, нужна только для .zst
+    zstandard = None
+
+# Сигнатуры (magic bytes) форматов сжатия
+GZIP_MAGIC = b'\x1f\x8b'
+BZIP2_MAGIC = b'BZh'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# Заголовок блока BGZF: gzip-заголовок с дополнительным полем BC длиной 2 байта
+BGZF_HEADER_SIZE = 18
+BGZF_EXTRA = b'BC\x02\x00'
+
+# Пропускаемые кадры zstd: сигнатуры 0x184D2A50-0x184D2A5F
+ZSTD_SKIPPABLE_MASK = 0xFFFFFFF0
+ZSTD_SKIPPABLE_MAGIC = 0x184D2A50
+
+# Объем сжатых данных, распаковываемый одной задачей потока
+SPAN_SIZE = 1 << 20
+
+# Кадры большего размера распаковываются последовательно, чтобы не держать их в памяти целиком
+MAX_FRAME_SIZE = 64 << 20
+
+Frame = Tuple[int, int]
+
+
+def detect_compression(file_path: str) -> Optional[str]:
+    """Определяет формат сжатия файла по первым байтам.
+
+    Args:
+        file_path: Путь к файлу.
+
+    Returns:
+        'bgzf', 'gzip', 'bz2', 'zstd' или None для несжатого файла.
+    """
+    with open(file_path, mode='rb') as file:
+        head = file.read(BGZF_HEADER_SIZE)
+    if head.startswith(GZIP_MAGIC):
+        return 'bgzf' if _is_bgzf_header(head) else 'gzip'
+    if head.startswith(BZIP2_MAGIC):
+        return 'bz2'
+    if head.startswith(ZSTD_MAGIC):
+        return 'zstd'
+    return None
+
+
+def is_compressed(file_path: str) -> bool:
+    """Проверяет, сжат ли файл."""
+    return detect_compression(file_path) is not None
+
+
+def open_binary(file_path: str, workers: Optional[int] = None) -> BinaryIO:
+    """Открывает файл на чтение байтов, распаковывая его на лету.
+
+    Данные распаковываются потоково, по мере чтения. Файлы из независимых
+    блоков (BGZF, многокадровый zstd) распаковываются блоками параллельно в
+    нескольких потоках: zlib и zstandard освобождают GIL на время распаковки.
+
+    Args:
+        file_path: Путь к файлу: несжатому, gzip, bzip2 или zstd.
+        workers: Количество потоков распаковки. None - по числу процессоров.
+
+    Returns:
+        Двоичный поток несжатых данных.
+
+    Raises:
+        ValueError: Если для формата файла не установлен нужный пакет.
+    """
+    compression = detect_compression(file_path)
+    if compression is None:
+        return open(file_path, mode='rb')
+    if compression == 'bz2':
+        return bz2.open(file_path, mode='rb')
+    if compression == 'zstd' and zstandard is None:
+        raise ValueError(f"Для чтения файла {file_path} в формате zstd нужен пакет zstandard")
+
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    frames = None
+    if workers > 1 and compression != 'gzip':
+        frames = _bgzf_frames(file_path) if compression == 'bgzf' else _zstd_frames(file_path)
+    if frames is not None and len(frames) > 1:
+        inflate = _inflate_gzip if compression == 'bgzf' else _inflate_zstd
+        return io.BufferedReader(_ChunkReader(_parallel_chunks(file_path, frames, inflate, workers)))
+    if compression == 'zstd':
+        raw = open(file_path, mode='rb')
+        return zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+    return gzip.open(file_path, mode='rb')
+
+
+def open_text(file_path: str, workers: Optional[int] = None) -> TextIO:
+    """Открывает файл на чтение текста UTF-8 для модуля csv, распаковывая его на лету.
+
+    Аргументы те же, что у open_binary.
+
+    Returns:
+        Текстовый поток без преобразования переводов строк (newline='').
+    """
+    if not is_compressed(file_path):
+        return open(file_path, mode='r', encoding='utf-8', newline='')
+    return io.TextIOWrapper(open_binary(file_path, workers), encoding='utf-8', newline='')
+
+
+class _ChunkReader(io.RawIOBase):
+    """Двоичный поток над итератором фрагментов несжатых данных."""
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._chunk = memoryview(b'')
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray) -> int:
+        while not self._chunk:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._chunk = memoryview(chunk)
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            # Останавливает распаковку оставшихся блоков
+            self._chunks.close()
+        super().close()
+
+
+def _parallel_chunks(
+    file_path: str,
+    frames: List[Frame],
+    inflate: Callable[[bytes], bytes],
+    workers: int
+) -> Iterator[bytes]:
+    """Распаковывает группы кадров в пуле потоков и выдает результаты в порядке файла.
+
+    Впереди чтения распаковывается не больше 2 * workers групп, поэтому
+    память ограничена независимо от размера файла.
+    """
+    spans: List[List[Frame]] = [[]]
+    span_size = 0
+    for frame in frames:
+        if span_size >= SPAN_SIZE:
+            spans.append([])
+            span_size = 0
+        spans[-1].append(frame)
+        span_size += frame[1]
+
+    with open(file_path, mode='rb') as file, ThreadPoolExecutor(max_workers=workers) as executor:
+        def inflate_span(span: List[Frame]) -> bytes:
+            start = span[0][0]
+            data = os.pread(file.fileno(), span[-1][0] + span[-1][1] - start, start)
+            return b''.join(inflate(data[offset - start:offset - start + size]) for offset, size in span)
+
+        pending = deque()
+        for span in spans:
+            pending.append(executor.submit(inflate_span, span))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _inflate_gzip(member: bytes) -> bytes:
+    """Распаковывает один gzip-блок (член BGZF)."""
+    return zlib.decompress(member, 16 + zlib.MAX_WBITS)
+
+
+def _inflate_zstd(frame: bytes) -> bytes:
+    """Распаковывает один кадр zstd."""
+    return zstandard.ZstdDecompressor().decompressobj().decompress(frame)
+
+
+def _is_bgzf_header(header: bytes) -> bool:
+    """Проверяет, что gzip-заголовок - заголовок блока BGZF (bgzip)."""
+    return (
+        len(header) >= BGZF_HEADER_SIZE and header.startswith(GZIP_MAGIC)
+        and bool(header[3] & 4) and header[12:16] == BGZF_EXTRA
+    )
+
+
+def _bgzf_frames(file_path: str) -> Optional[List[Frame]]:
+    """Перечисляет блоки BGZF по размерам из их заголовков, не распаковывая данные.
+
+    Returns:
+        Список (смещение, размер) блоков или None, если файл не целиком состоит из блоков BGZF.
+    """
+    frames = []
+    file_size = os.path.getsize(file_path)
+    with open(file_path, mode='rb') as file:
+        offset = 0
+        while offset < file_size:
+            file.seek(offset)
+            header = file.read(BGZF_HEADER_SIZE)
+            if not _is_bgzf_header(header):
+                return None
+            size = struct.unpack_from('<H', header, 16)[0] + 1
+            if offset + size > file_size:
+                return None
+            frames.append((offset, size))
+            offset += size
+    return frames
+
+
+def _zstd_frames(file_path: str) -> Optional[List[Frame]]:
+    """Перечисляет кадры zstd по заголовкам кадров и блоков, не распаковывая данные.
+
+    Пропускаемые кадры (метаданные) в список не входят.
+
+    Returns:
+        Список (смещение, размер) кадров или None, если структуру файла не удалось
+        разобрать или кадр больше MAX_FRAME_SIZE.
+    """
+    frames = []
+    file_size = os.path.getsize(file_path)
+    with open(file_path, mode='rb') as file:
+        offset = 0
+        while offset < file_size:
+            file.seek(offset)
+            head = file.read(8)
+            if len(head) < 5:
+                return None
+            magic = struct.unpack_from('<I', head)[0]
+            if magic & ZSTD_SKIPPABLE_MASK == ZSTD_SKIPPABLE_MAGIC:
+                offset += 8 + struct.unpack_from('<I', head, 4)[0]
+                continue
+            if head[:4] != ZSTD_MAGIC:
+                return None
+            descriptor = head[4]
+            single_segment = descriptor >> 5 & 1
+            content_size_bytes = (single_segment, 2, 4, 8)[descriptor >> 6]
+            position = offset + 5 + (not single_segment) + (0, 1, 2, 4)[descriptor & 3] + content_size_bytes
+            # Блоки кадра: 3-байтовый заголовок (последний блок, тип, размер) и данные
+            while True:
+                file.seek(position)
+                block = file.read(3)
+                if len(block) < 3:
+                    return None
+                block_header = int.from_bytes(block, 'little')
+                block_type = block_header >> 1 & 3
+                if block_type == 3:
+                    return None
+                position += 3 + (1 if block_type == 1 else block_header >> 3)
+                if block_header & 1:
+                    break
+            if descriptor & 4:
+                position += 4
+            if position > file_size or position - offset > MAX_FRAME_SIZE:
+                return None
+            frames.append((offset, position - offset))
+            offset = position
+    return frames
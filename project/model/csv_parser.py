@@ -1,8 +1,15 @@
-from typing import Dict, List
+from itertools import islice
+from typing import Collection, Dict, Iterator, List, Optional
 import csv
 
+from project.model.compression import is_compressed, open_text
+from project.model.mmap_reader import MMapReader
+from project.model.row import record_type
+from project.model.schema import SAMPLE_SIZE, Schema
+from project.model.table import Table
+
 class CSVParser:
-    """Парсер CSV-файлов. Преобразует данные в список словарей."""
+    """Парсер CSV-файлов. Преобразует данные в записи, читаемые как словари."""
     @staticmethod
     def parse(file_path: str) -> List[Dict[str, str]]:
         """Чтение и парсинг CSV-файла.
@@ -11,7 +18,107 @@ class CSVParser:
             file_path: Путь к CSV-файлу.
 
         Returns:
-            Список словарей, где ключи - названия колонок, значения - данные ячеек.
+            Список записей, где ключи - названия колонок, значения - данные ячеек.
+        """
+        return list(CSVParser.iter_rows(file_path))
+
+    @staticmethod
+    def iter_rows(file_path: str, fields: Optional[Collection[str]] = None) -> Iterator[Dict[str, str]]:
+        """Потоковое чтение CSV-файла: строки выдаются по одной.
+
+        Файл целиком в память не загружается, поэтому объем потребляемой
+        памяти не зависит от размера файла. Если указаны поля, файл читается
+        через отображение в память и декодируются только эти поля. Сжатый
+        файл (gzip, bzip2, zstd) распаковывается потоково по мере чтения.
+
+        Строка - запись (Record): значения в кортеже и общий для всех строк
+        заголовок. Она читается как словарь csv.DictReader, но не хранит
+        ключи в каждой строке.
+
+        Args:
+            file_path: Путь к CSV-файлу.
+            fields: Поля, на которые ссылается запрос. None - все поля.
+
+        Yields:
+            Запись, где ключи - названия колонок, значения - данные ячеек.
+        """
+        compressed = is_compressed(file_path)
+        if fields is not None and not compressed:
+            yield from MMapReader.iter_rows(file_path, fields)
+            return
+        with open_text(file_path) as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader, [])
+            if fields is None:
+                make = record_type(tuple(header))
+                width = len(header)
+                for values in reader:
+                    if len(values) == width:
+                        yield make(values)
+                    elif values:
+                        # Недостающие значения - None, как в csv.DictReader; значения без колонки отбрасываются
+                        yield make((values + [None] * width)[:width])
+                return
+            # Сжатый файл не отображается в память: строки разбирает модуль csv,
+            # а в записи попадают только нужные поля
+            wanted = [index for index, name in enumerate(header) if name in fields]
+            make = record_type(tuple(header[index] for index in wanted))
+            for values in reader:
+                if values:
+                    yield make([values[index] if index < len(values) else None for index in wanted])
+
+    @staticmethod
+    def parse_table(
+        file_path: str,
+        schema: Optional[Schema] = None,
+        fields: Optional[Collection[str]] = None,
+        text_fields: Optional[Collection[str]] = None
+    ) -> Table:
+        """Чтение CSV-файла в колоночную таблицу.
+
+        Строки не превращаются в словари: ячейки сразу раскладываются по колонкам,
+        тип каждой колонки определяется один раз.
+
+        Args:
+            file_path: Путь к CSV-файлу.
+            schema: Схема с типами колонок. Колонки вне схемы типизируются автоматически.
+            fields: Колонки, попадающие в таблицу. None - все колонки.
+            text_fields: Колонки, для которых запоминается запись чисел в CSV.
+                None - все колонки.
+
+        Returns:
+            Колоночная таблица с типизированными колонками.
+        """
+        with open_text(file_path) as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader, [])
+            return Table.from_rows(header, reader, schema, fields, text_fields)
+
+    @staticmethod
+    def read_header(file_path: str) -> List[str]:
+        """Читает названия колонок CSV-файла; сжатый файл распаковывается только в начале.
+
+        Args:
+            file_path: Путь к CSV-файлу.
+
+        Returns:
+            Названия колонок в порядке файла.
+        """
+        with open_text(file_path, workers=1) as csvfile:
+            return next(csv.reader(csvfile), [])
+
+    @staticmethod
+    def infer_schema(file_path: str, sample_size: int = SAMPLE_SIZE) -> Schema:
+        """Определяет типы колонок по первым строкам CSV-файла.
+
+        Args:
+            file_path: Путь к CSV-файлу.
+            sample_size: Количество строк выборки.
+
+        Returns:
+            Схема с типами колонок.
         """
-        with open(file_path, mode='r', encoding='utf-8') as csvfile:
-            return list(csv.DictReader(csvfile))
+        with open_text(file_path) as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader, [])
+            return Schema.infer(header, islice(reader, sample_size))
@@ -0,0 +1,128 @@
+import heapq
+import pickle
+import sys
+import tempfile
+from itertools import islice
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from project.model.processors import OrderBy
+from project.model.row import pack_rows, unpack_rows
+from project.model.schema import Schema
+
+# Количество строк в одной порции при записи и чтении отсортированного фрагмента
+BATCH_SIZE = 1024
+
+# Максимальное количество фрагментов, сливаемых за один проход
+MAX_MERGE_FANIN = 64
+
+SortKey = Callable[[Dict[str, str]], Union[int, float, str]]
+
+
+def estimate_row_size(row: Dict[str, str]) -> int:
+    """Оценивает объем памяти, занимаемый строкой (записью или словарем), в байтах."""
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row.values())
+
+
+class ExternalSort:
+    """Внешняя сортировка слиянием для данных, не помещающихся в память.
+
+    Строки накапливаются, пока их оценочный объем не превысит бюджет памяти;
+    накопленный фрагмент сортируется и сбрасывается во временный файл.
+    Фрагменты затем сливаются k-путевым слиянием, а результат выдается
+    потоково. Если данные уместились в бюджет, диск не используется.
+    """
+
+    @staticmethod
+    def iter_sorted(
+        data: Iterable[Dict[str, str]],
+        expression: Tuple[str, str, str],
+        memory_budget: int,
+        schema: Optional[Schema] = None,
+        temp_dir: Optional[str] = None
+    ) -> Iterator[Dict[str, str]]:
+        """Сортирует строки с ограничением памяти и выдает их по одной.
+
+        Порядок результата совпадает с OrderBy.execute, включая порядок строк
+        с равными ключами.
+
+        Args:
+            data: Данные для сортировки (список или потоковый итератор).
+            expression: Кортеж (поле, оператор, направление).
+            memory_budget: Бюджет памяти на накопление строк в байтах.
+            schema: Схема с типами колонок.
+            temp_dir: Каталог для временных файлов. None - системный.
+
+        Yields:
+            Строки в отсортированном порядке.
+
+        Raises:
+            ValueError: Если направление сортировки некорректно.
+        """
+        field, _, direction = expression
+        if direction not in ('asc', 'desc'):
+            raise ValueError("Направление сортировки должно быть 'asc' или 'desc'")
+        key = OrderBy.sort_key(field, schema)
+        reverse = direction == 'desc'
+
+        runs: List[IO[bytes]] = []
+        try:
+            buffer: List[Dict[str, str]] = []
+            used = 0
+            for row in data:
+                buffer.append(row)
+                used += estimate_row_size(row)
+                if used >= memory_budget:
+                    buffer.sort(key=key, reverse=reverse)
+                    runs.append(ExternalSort._write_run(buffer, temp_dir))
+                    buffer, used = [], 0
+
+            buffer.sort(key=key, reverse=reverse)
+            if not runs:
+                yield from buffer
+                return
+            if buffer:
+                runs.append(ExternalSort._write_run(buffer, temp_dir))
+                buffer = []
+
+            # Слишком много фрагментов сливаются в несколько проходов,
+            # чтобы не исчерпать лимит открытых файлов
+            while len(runs) > MAX_MERGE_FANIN:
+                merged = []
+                for start in range(0, len(runs), MAX_MERGE_FANIN):
+                    group = runs[start:start + MAX_MERGE_FANIN]
+                    merged.append(ExternalSort._write_run(
+                        ExternalSort._merge(group, key, reverse), temp_dir
+                    ))
+                    for run in group:
+                        run.close()
+                runs = merged
+
+            yield from ExternalSort._merge(runs, key, reverse)
+        finally:
+            for run in runs:
+                run.close()
+
+    @staticmethod
+    def _merge(runs: List[IO[bytes]], key: SortKey, reverse: bool) -> Iterator[Dict[str, str]]:
+        """Сливает отсортированные фрагменты; при равных ключах первым идет более ранний фрагмент."""
+        return heapq.merge(*(ExternalSort._read_run(run) for run in runs), key=key, reverse=reverse)
+
+    @staticmethod
+    def _write_run(rows: Iterable[Dict[str, str]], temp_dir: Optional[str]) -> IO[bytes]:
+        """Записывает отсортированный фрагмент во временный файл порциями."""
+        run = tempfile.TemporaryFile(dir=temp_dir)
+        rows = iter(rows)
+        while batch := list(islice(rows, BATCH_SIZE)):
+            pickle.dump(pack_rows(batch), run, protocol=pickle.HIGHEST_PROTOCOL)
+        return run
+
+    @staticmethod
+    def _read_run(run: IO[bytes]) -> Iterator[Dict[str, str]]:
+        """Читает фрагмент из временного файла порциями."""
+        run.seek(0)
+        while True:
+            try:
+                batch = unpack_rows(pickle.load(run))
+            except EOFError:
+                return
+            yield from batch
@@ -0,0 +1,320 @@
+import pickle
+import tempfile
+from itertools import islice
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from project.model.accumulators import Accumulator, validate_aggregate
+from project.model.predicates import Predicate
+from project.model.processors import Aggregate
+from project.model.schema import Schema
+from project.model.table import Table
+from project.model.util import convert_to_number_if_possible
+
+# Количество разделов, на которые делятся строки при сбросе на диск
+SPILL_PARTITIONS = 16
+
+# Количество записей в одной порции при записи и чтении раздела
+BATCH_SIZE = 1024
+
+GroupKey = Union[int, float, str]
+Groups = Dict[GroupKey, List[Accumulator]]
+Expression = Tuple[str, str, str]
+
+
+class HashAggregate:
+    """Агрегация по группам через хэш-таблицу (GROUP BY).
+
+    За один проход для каждого значения ключа группировки заводятся
+    накопители агрегируемых полей; общие статистики (count, sum, min, max)
+    считаются один раз на поле. Если групп больше допустимого, записи
+    с новыми ключами сбрасываются на диск в разделы по хэшу ключа, и каждый
+    раздел затем агрегируется отдельно (гибридная хэш-агрегация).
+    """
+
+    @staticmethod
+    def execute(
+        data: Union[Iterable[Dict[str, str]], Table],
+        group_field: str,
+        expressions: List[Expression],
+        schema: Optional[Schema] = None,
+        approximate: bool = False,
+        max_groups: Optional[int] = None,
+        temp_dir: Optional[str] = None,
+        where: Optional[Predicate] = None
+    ) -> Dict[str, List[Any]]:
+        """Вычисляет агрегаты для каждой группы строк.
+
+        Условие where проверяется в цикле агрегации, без отдельного этапа фильтрации.
+
+        Args:
+            data: Данные (список, потоковый итератор или колоночная таблица).
+            group_field: Поле, по значениям которого строки делятся на группы.
+            expressions: Список кортежей (поле, оператор, тип_агрегации).
+            schema: Схема с типами колонок.
+            approximate: Оценивать median и квантили приближенно, в постоянной памяти.
+            max_groups: Максимальное количество групп в памяти. None - без ограничения.
+            temp_dir: Каталог для сброшенных разделов. None - системный.
+            where: Условие отбора агрегируемых строк. None - все строки.
+
+        Returns:
+            Таблица {колонка: [значения]}: ключ группировки и агрегаты, по строке
+            на группу в порядке возрастания ключа. Пустой словарь, если групп нет.
+
+        Raises:
+            ValueError: Если тип агрегации неизвестен, данные строковые или
+                ограничение количества групп некорректно.
+        """
+        for _, _, aggregator_type in expressions:
+            validate_aggregate(aggregator_type)
+        if max_groups is not None and max_groups < 1:
+            raise ValueError("Количество групп в памяти должно быть положительным")
+
+        if isinstance(data, Table):
+            if where is not None:
+                data = data.take(where.filter_indices(data, schema=schema))
+            return HashAggregate._execute_table(data, group_field, expressions)
+        if where is not None:
+            data = filter(where.compile(schema), data)
+
+        layout = HashAggregate.layout(expressions)
+        records = HashAggregate._iter_records(data, group_field, layout, schema)
+        groups = HashAggregate._aggregate_records(records, layout, approximate, max_groups, temp_dir)
+        return HashAggregate.result_table(group_field, expressions, layout, groups)
+
+    @staticmethod
+    def layout(expressions: List[Expression]) -> Dict[str, List[str]]:
+        """Группирует типы агрегации по полям: {поле: [типы агрегации]}."""
+        types_by_field: Dict[str, List[str]] = {}
+        for field, _, aggregator_type in expressions:
+            types_by_field.setdefault(field, []).append(aggregator_type)
+        return types_by_field
+
+    @staticmethod
+    def accumulate(
+        rows: Iterable[Dict[str, str]],
+        group_field: str,
+        expressions: List[Expression],
+        schema: Optional[Schema] = None
+    ) -> Groups:
+        """Собирает накопители групп в памяти (частичная агрегация части файла).
+
+        Returns:
+            Словарь {ключ: [накопители полей в порядке layout]}.
+        """
+        layout = HashAggregate.layout(expressions)
+        records = HashAggregate._iter_records(rows, group_field, layout, schema)
+        return dict(HashAggregate._aggregate_records(records, layout))
+
+    @staticmethod
+    def merge(target: Groups, other: Groups) -> Groups:
+        """Добавляет к таблице групп частичную таблицу другой части данных.
+
+        Returns:
+            Таблица target.
+        """
+        for key, accumulators in other.items():
+            current = target.get(key)
+            if current is None:
+                target[key] = accumulators
+                continue
+            for accumulator, partial in zip(current, accumulators):
+                accumulator.merge(partial)
+        return target
+
+    @staticmethod
+    def result_table(
+        group_field: str,
+        expressions: List[Expression],
+        layout: Dict[str, List[str]],
+        groups: Iterable[Tuple[GroupKey, List[Accumulator]]]
+    ) -> Dict[str, List[Any]]:
+        """Формирует таблицу результатов: ключ группы и значения агрегатов."""
+        positions = {field: index for index, field in enumerate(layout)}
+        results = [
+            (key, [accumulators[positions[field]].result(aggregator_type) for field, _, aggregator_type in expressions])
+            for key, accumulators in groups
+        ]
+        return HashAggregate._to_columns(group_field, expressions, results)
+
+    @staticmethod
+    def validate_order(group_field: str, order_by: Expression) -> None:
+        """Проверяет, что сортировку можно применить к группам.
+
+        Группы сортируются по ключу группировки; по другим полям порядок групп
+        не определен, так как строки внутри группы свернуты в агрегаты.
+
+        Raises:
+            ValueError: Если поле сортировки не совпадает с полем группировки
+                или направление некорректно.
+        """
+        field, _, direction = order_by
+        if field != group_field:
+            raise ValueError(f"Группы сортируются только по полю группировки {group_field}, а не по {field}")
+        if direction not in ('asc', 'desc'):
+            raise ValueError("Направление сортировки должно быть 'asc' или 'desc'")
+
+    @staticmethod
+    def order(result: Dict[str, List[Any]], direction: str) -> Dict[str, List[Any]]:
+        """Упорядочивает таблицу групп по ключу в заданном направлении.
+
+        Группы уже идут по возрастанию ключа, поэтому для 'desc' колонки разворачиваются.
+
+        Args:
+            result: Таблица групп {колонка: [значения]}.
+            direction: Направление сортировки ('asc' или 'desc').
+
+        Returns:
+            Таблица групп в заданном порядке.
+        """
+        if direction != 'desc':
+            return result
+        return {name: values[::-1] for name, values in result.items()}
+
+    @staticmethod
+    def _execute_table(table: Table, group_field: str, expressions: List[Expression]) -> Dict[str, List[Any]]:
+        """Группировка колоночной таблицы: агрегаты считаются над выборками колонок."""
+        indices_by_key: Dict[GroupKey, List[int]] = {}
+        group_column = table.encoded_column(group_field)
+        dictionary = group_column.dictionary
+        # Словарная колонка группируется по целым кодам, а не по строкам
+        keys = group_column.values.tolist() if dictionary is not None else group_column.to_list()
+        for index, key in enumerate(keys):
+            indices_by_key.setdefault(key, []).append(index)
+        if dictionary is not None:
+            indices_by_key = {dictionary[code]: indices for code, indices in indices_by_key.items()}
+        columns = {field: table.column(field) for field, _, _ in expressions}
+        results = [
+            (key, [columns[field].take(indices).aggregate(aggregator_type) for field, _, aggregator_type in expressions])
+            for key, indices in indices_by_key.items()
+        ]
+        return HashAggregate._to_columns(group_field, expressions, results)
+
+    @staticmethod
+    def _to_columns(
+        group_field: str,
+        expressions: List[Expression],
+        results: List[Tuple[GroupKey, List[Any]]]
+    ) -> Dict[str, List[Any]]:
+        """Упорядочивает группы по ключу и раскладывает результат по колонкам."""
+        if not results:
+            return {}
+        results.sort(key=_group_order)
+        labels = list(Aggregate.result_table(expressions, [None] * len(expressions)))
+        table = {group_field: [key for key, _ in results]}
+        for position, label in enumerate(labels):
+            table[label] = [Aggregate.convert_float_to_int_if_necessary(values[position]) for _, values in results]
+        return table
+
+    @staticmethod
+    def _iter_records(
+        rows: Iterable[Dict[str, str]],
+        group_field: str,
+        layout: Dict[str, List[str]],
+        schema: Optional[Schema]
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Преобразует строки в компактные записи (ключ, значения полей).
+
+        Значения преобразуются один раз, поэтому сброшенные на диск записи
+        не нужно разбирать повторно.
+        """
+        convert_key = schema.converter(group_field) if schema else convert_to_number_if_possible
+        plan = [
+            (field, Aggregate.value_converter(field, types, schema))
+            for field, types in layout.items()
+        ]
+        for row in rows:
+            yield (convert_key(row.get(group_field)), *(convert(row.get(field)) for field, convert in plan))
+
+    @staticmethod
+    def _aggregate_records(
+        records: Iterable[Tuple[Any, ...]],
+        layout: Dict[str, List[str]],
+        approximate: bool = False,
+        max_groups: Optional[int] = None,
+        temp_dir: Optional[str] = None,
+        depth: int = 0
+    ) -> Iterator[Tuple[GroupKey, List[Accumulator]]]:
+        """Агрегирует записи по группам с ограничением количества групп в памяти.
+
+        Записи групп, уже находящихся в памяти, агрегируются сразу. Записи с
+        новыми ключами при заполненной хэш-таблице сбрасываются в разделы по
+        хэшу ключа; все записи одного ключа попадают в один раздел, поэтому
+        разделы затем агрегируются независимо.
+
+        Yields:
+            Пары (ключ, накопители полей в порядке layout).
+        """
+        type_lists = list(layout.values())
+        groups: Groups = {}
+        partitions: List[Optional[IO[bytes]]] = [None] * SPILL_PARTITIONS
+        buffers: List[List[Tuple[Any, ...]]] = [[] for _ in range(SPILL_PARTITIONS)]
+        try:
+            for record in records:
+                key = record[0]
+                accumulators = groups.get(key)
+                if accumulators is None:
+                    if max_groups is not None and len(groups) >= max_groups:
+                        # На каждом уровне разделы делятся по своему хэшу, иначе
+                        # ключи одного раздела снова попали бы в один раздел
+                        partition = hash((depth, key)) % SPILL_PARTITIONS
+                        buffers[partition].append(record)
+                        if len(buffers[partition]) >= BATCH_SIZE:
+                            partitions[partition] = HashAggregate._spill(
+                                partitions[partition], buffers[partition], temp_dir
+                            )
+                            buffers[partition] = []
+                        continue
+                    accumulators = groups[key] = [
+                        Accumulator.for_aggregates(types, approximate) for types in type_lists
+                    ]
+                for accumulator, value in zip(accumulators, islice(record, 1, None)):
+                    accumulator.add(value)
+
+            yield from groups.items()
+            groups.clear()
+
+            for partition, buffer in zip(partitions, buffers):
+                if partition is None and not buffer:
+                    continue
+                yield from HashAggregate._aggregate_records(
+                    HashAggregate._read_partition(partition, buffer),
+                    layout, approximate, max_groups, temp_dir, depth + 1
+                )
+        finally:
+            for partition in partitions:
+                if partition is not None:
+                    partition.close()
+
+    @staticmethod
+    def _spill(
+        partition: Optional[IO[bytes]],
+        records: List[Tuple[Any, ...]],
+        temp_dir: Optional[str]
+    ) -> IO[bytes]:
+        """Дописывает порцию записей в файл раздела, создавая его при необходимости."""
+        if partition is None:
+            partition = tempfile.TemporaryFile(dir=temp_dir)
+        pickle.dump(records, partition, protocol=pickle.HIGHEST_PROTOCOL)
+        return partition
+
+    @staticmethod
+    def _read_partition(
+        partition: Optional[IO[bytes]],
+        tail: List[Tuple[Any, ...]]
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Читает записи раздела с диска порциями, затем несброшенный остаток."""
+        if partition is not None:
+            partition.seek(0)
+            while True:
+                try:
+                    batch = pickle.load(partition)
+                except EOFError:
+                    break
+                yield from batch
+        yield from tail
+
+
+def _group_order(result: Tuple[GroupKey, List[Any]]) -> Tuple[bool, GroupKey]:
+    """Ключ сортировки групп: сначала числовые ключи, затем строковые."""
+    key = result[0]
+    return isinstance(key, str), key
@@ -0,0 +1,457 @@
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from project.model.compression import is_compressed
+from project.model.mmap_reader import iter_offset_records, iter_records, read_header
+from project.model.predicates import And, Between, Comparison, InList, Or, Predicate, normalize_constant
+from project.model.schema import Schema, infer_column_type
+from project.model.table_cache import file_identity
+
+# Сигнатура и версия формата файла индекса
+MAGIC = b'WMINDEX1'
+
+# Расширение файлов индекса
+INDEX_SUFFIX = '.wmidx'
+
+# Выравнивание секций индекса
+ALIGNMENT = 8
+
+# Коды типов array.array для ключей числовых колонок
+KEY_TYPECODES = {'int': 'q', 'float': 'd'}
+
+Key = Union[int, float, str]
+
+
+def index_path(file_path: str, column: str) -> str:
+    """Путь к файлу индекса колонки рядом с CSV-файлом."""
+    safe_column = re.sub(r'[^\w.-]', '_', column)
+    return f"{file_path}.{safe_column}{INDEX_SUFFIX}"
+
+
+def _key_hash(key: Key) -> int:
+    """Стабильный между запусками 64-битный хэш ключа (равные числа int и float совпадают)."""
+    data = key.encode('utf-8') if isinstance(key, str) else struct.pack('<d', float(key))
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little', signed=True)
+
+
+def _align(offset: int) -> int:
+    """Округляет смещение вверх до границы ALIGNMENT."""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class SecondaryIndex:
+    """Вторичный индекс колонки CSV-файла в отдельном файле рядом с ним.
+
+    Индекс отображает значения колонки в смещения записей в CSV-файле.
+    Различные ключи хранятся по возрастанию, для каждого - непрерывный
+    участок смещений его записей (в порядке следования в файле). Поверх
+    ключей построена хэш-таблица с открытой адресацией для поиска по
+    равенству; по упорядоченным ключам числовой колонки диапазоны ищутся
+    двоичным поиском. Файл индекса отображается в память, поэтому поиск
+    читает только нужные страницы, а не весь индекс.
+
+    Ключи нормализуются так же, как значения в построчном фильтре при
+    схеме с типом колонки индекса, поэтому индекс применим, только если
+    тип колонки в схеме запроса совпадает с типом индекса. Значения
+    строковой колонки, тип которой определен по выборке, построчный фильтр
+    сравнивает с числами как числа ('123' и '0123' равны 123); такие
+    условия по строковым ключам не вычисляются.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path: Путь к файлу индекса.
+
+        Raises:
+            ValueError: Если файл не является индексом или создан на другой архитектуре.
+        """
+        with open(path, mode='rb') as indexfile:
+            self.buffer = mmap.mmap(indexfile.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self.buffer[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"Файл не является индексом: {path}")
+            (length,) = struct.unpack_from('<Q', self.buffer, len(MAGIC))
+            start = len(MAGIC) + 8
+            self.header: Dict[str, Any] = json.loads(self.buffer[start:start + length].decode('utf-8'))
+            if self.header['byteorder'] != sys.byteorder:
+                raise ValueError(f"Индекс создан с другим порядком байтов: {path}")
+        except BaseException:
+            self.buffer.close()
+            raise
+        self.data_start = _align(start + length)
+        self.column: str = self.header['column']
+        self.kind: str = self.header['kind']
+        self._views: List[memoryview] = []
+        sections = self.header['sections']
+        self.positions = self._view(sections['positions'], 'q')
+        self.starts = self._view(sections['starts'], 'q')
+        self.slots = self._view(sections['slots'], 'q')
+        if self.kind in KEY_TYPECODES:
+            self.keys: Sequence[Key] = self._view(sections['keys'], KEY_TYPECODES[self.kind])
+        else:
+            self.keys = _StringKeys(
+                self._view(sections['key_offsets'], 'q'), self.buffer, self.data_start + sections['keys']['offset']
+            )
+
+    def __enter__(self) -> 'SecondaryIndex':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Освобождает отображение файла индекса."""
+        for view in self._views:
+            view.release()
+        self._views.clear()
+        self.buffer.close()
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.kind in KEY_TYPECODES
+
+    @staticmethod
+    def open(file_path: str, column: str) -> Optional['SecondaryIndex']:
+        """Открывает индекс колонки, если он есть и соответствует текущему файлу.
+
+        Args:
+            file_path: Путь к CSV-файлу.
+            column: Название колонки.
+
+        Returns:
+            Индекс или None, если индекса нет, он поврежден или CSV-файл изменился.
+        """
+        path = index_path(file_path, column)
+        if not os.path.exists(path):
+            return None
+        try:
+            index = SecondaryIndex(path)
+        except (ValueError, KeyError, OSError):
+            return None
+        if index.column != column or index.header['source'] != file_identity(file_path):
+            index.close()
+            return None
+        return index
+
+    @staticmethod
+    def build(file_path: str, column: str) -> Dict[str, Any]:
+        """Строит индекс колонки и сохраняет его рядом с CSV-файлом.
+
+        Тип ключей определяется по всем значениям колонки. Записи без значения
+        колонки в индекс не попадают.
+
+        Args:
+            file_path: Путь к CSV-файлу.
+            column: Название колонки.
+
+        Returns:
+            Сведения об индексе: путь, тип, количество записей и различных значений.
+
+        Raises:
+            ValueError: Если колонки нет в файле или файл сжат.
+        """
+        if is_compressed(file_path):
+            # Смещения записей имеют смысл только в несжатом файле
+            raise ValueError(f"Индекс строится только для несжатого CSV-файла: {file_path}")
+        identity = file_identity(file_path)
+        header, data_start = read_header(file_path)
+        if column not in header:
+            raise ValueError(f"Колонка не найдена: {column}")
+
+        raw_values: List[str] = []
+        offsets = array('q')
+        with open(file_path, mode='rb') as csvfile:
+            if os.fstat(csvfile.fileno()).st_size > data_start:
+                with mmap.mmap(csvfile.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    for offset, record in iter_offset_records(buffer, data_start, len(buffer), header, (column,)):
+                        value = record[column]
+                        if value is not None:
+                            raw_values.append(value)
+                            offsets.append(offset)
+
+        kind = infer_column_type(raw_values)
+        # Ключи нормализуются как в построчном фильтре при явной схеме с типом колонки
+        convert = Schema({column: kind}).converter(column)
+        keys = [normalize_constant(value, convert) for value in raw_values]
+        del raw_values
+        # Сортировка устойчива: записи с равными ключами остаются в порядке файла
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        positions = array('q', (offsets[i] for i in order))
+
+        distinct: List[Key] = []
+        starts = array('q')
+        for position, i in enumerate(order):
+            if not distinct or keys[i] != distinct[-1]:
+                distinct.append(keys[i])
+                starts.append(position)
+        starts.append(len(order))
+
+        capacity = 8
+        while capacity < 2 * len(distinct):
+            capacity *= 2
+        # Ячейка хэш-таблицы: (хэш ключа, номер ключа); -1 - пустая ячейка
+        slots = array('q', [0, -1]) * capacity
+        for number, key in enumerate(distinct):
+            key_hash = _key_hash(key)
+            slot = key_hash & (capacity - 1)
+            while slots[2 * slot + 1] != -1:
+                slot = (slot + 1) & (capacity - 1)
+            slots[2 * slot], slots[2 * slot + 1] = key_hash, number
+
+        sections: Dict[str, bytes] = {'positions': positions.tobytes(), 'starts': starts.tobytes(), 'slots': slots.tobytes()}
+        if kind in KEY_TYPECODES:
+            sections['keys'] = array(KEY_TYPECODES[kind], distinct).tobytes()
+        else:
+            encoded = [key.encode('utf-8') for key in distinct]
+            sections['key_offsets'] = array('q', accumulate(map(len, encoded), initial=0)).tobytes()
+            sections['keys'] = b''.join(encoded)
+
+        path = index_path(file_path, column)
+        SecondaryIndex._write(path, {
+            'source': identity,
+            'column': column,
+            'kind': kind,
+            'rows': len(order),
+            'distinct': len(distinct),
+            'byteorder': sys.byteorder,
+        }, sections)
+        return {'index': path, 'kind': kind, 'rows': len(order), 'distinct': len(distinct)}
+
+    def equal(self, value: Key) -> List[int]:
+        """Смещения записей, нормализованное значение колонки которых равно value."""
+        if self.is_numeric and isinstance(value, str):
+            return []
+        key_hash = _key_hash(value)
+        capacity = len(self.slots) // 2
+        slot = key_hash & (capacity - 1)
+        while (number := self.slots[2 * slot + 1]) != -1:
+            if self.slots[2 * slot] == key_hash and self.keys[number] == value:
+                return self.positions[self.starts[number]:self.starts[number + 1]].tolist()
+            slot = (slot + 1) & (capacity - 1)
+        return []
+
+    def range(
+        self,
+        low: Optional[Union[int, float]] = None,
+        low_inclusive: bool = True,
+        high: Optional[Union[int, float]] = None,
+        high_inclusive: bool = True
+    ) -> List[int]:
+        """Смещения записей числовой колонки со значением в заданном диапазоне.
+
+        Args:
+            low: Нижняя граница. None - без ограничения.
+            low_inclusive: Включать ли нижнюю границу.
+            high: Верхняя граница. None - без ограничения.
+            high_inclusive: Включать ли верхнюю границу.
+
+        Returns:
+            Смещения записей в порядке возрастания значения.
+        """
+        first = 0
+        if low is not None:
+            first = (bisect.bisect_left if low_inclusive else bisect.bisect_right)(self.keys, low)
+        last = len(self.keys)
+        if high is not None:
+            last = (bisect.bisect_right if high_inclusive else bisect.bisect_left)(self.keys, high)
+        if first >= last:
+            return []
+        return self.positions[self.starts[first]:self.starts[last]].tolist()
+
+    def _view(self, section: Dict[str, int], typecode: str) -> memoryview:
+        """Представление секции файла индекса массивом без копирования."""
+        start = self.data_start + section['offset']
+        view = memoryview(self.buffer)[start:start + section['length']].cast(typecode)
+        self._views.append(view)
+        return view
+
+    @staticmethod
+    def _write(path: str, header: Dict[str, Any], sections: Dict[str, bytes]) -> None:
+        """Атомарно записывает файл индекса: сигнатура, JSON-заголовок, выровненные секции."""
+        descriptions = {}
+        offset = 0
+        for name, data in sections.items():
+            descriptions[name] = {'offset': offset, 'length': len(data)}
+            offset = _align(offset + len(data))
+        header_bytes = json.dumps(dict(header, sections=descriptions)).encode('utf-8')
+        data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+        try:
+            with os.fdopen(fd, mode='wb') as indexfile:
+                indexfile.write(MAGIC)
+                indexfile.write(struct.pack('<Q', len(header_bytes)))
+                indexfile.write(header_bytes)
+                for name, data in sections.items():
+                    indexfile.write(b'\0' * (data_start + descriptions[name]['offset'] - indexfile.tell()))
+                    indexfile.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+class _StringKeys:
+    """Упорядоченные строковые ключи индекса с декодированием по требованию."""
+
+    def __init__(self, offsets: memoryview, buffer: mmap.mmap, start: int) -> None:
+        self.offsets = offsets
+        self.buffer = buffer
+        self.start = start
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, number: int) -> str:
+        begin, end = self.offsets[number], self.offsets[number + 1]
+        return self.buffer[self.start + begin:self.start + end].decode('utf-8')
+
+
+class IndexedReader:
+    """Чтение только тех записей CSV-файла, которые могут удовлетворять условию.
+
+    Если для полей условия есть актуальные индексы, по ним вычисляются
+    смещения записей-кандидатов, и читаются только эти записи. Кандидаты -
+    надмножество подходящих строк, поэтому условие затем проверяется как
+    обычно; стоимость запроса пропорциональна числу кандидатов, а не размеру
+    файла.
+    """
+
+    @staticmethod
+    def iter_rows(
+        file_path: str,
+        predicate: Predicate,
+        schema: Optional[Schema],
+        fields: Optional[Set[str]] = None
+    ) -> Optional[Iterator[Dict[str, Optional[str]]]]:
+        """Читает записи-кандидаты по индексам.
+
+        Args:
+            file_path: Путь к CSV-файлу.
+            predicate: Условие фильтрации.
+            schema: Схема запроса; индекс применяется к колонке, только если
+                ее тип в схеме совпадает с типом индекса.
+            fields: Поля, которые нужно прочитать. None - все поля.
+
+        Returns:
+            Итератор записей-кандидатов в порядке файла или None, если
+            подходящих индексов нет и файл нужно читать целиком.
+        """
+        found = IndexedReader.candidates(file_path, predicate, schema)
+        if found is None:
+            return None
+        return IndexedReader.iter_at(file_path, found[1], fields)
+
+    @staticmethod
+    def candidates(
+        file_path: str,
+        predicate: Predicate,
+        schema: Optional[Schema]
+    ) -> Optional[Tuple[List[str], List[int], int]]:
+        """Вычисляет смещения записей-кандидатов по индексам, не читая CSV-файл.
+
+        Аргументы те же, что у iter_rows.
+
+        Returns:
+            Тройка (поля с примененными индексами, отсортированные смещения
+            кандидатов, количество записей в этих индексах) или None, если файл
+            нужно читать целиком.
+        """
+        if schema is None:
+            return None
+        indexes = {}
+        for field in predicate.fields():
+            index = SecondaryIndex.open(file_path, field)
+            if index is not None:
+                if schema.column_type(field) == index.kind:
+                    indexes[field] = index
+                else:
+                    index.close()
+        if not indexes:
+            return None
+        try:
+            offsets = IndexedReader._lookup(predicate, indexes, schema)
+            rows = max(index.header['rows'] for index in indexes.values())
+        finally:
+            for index in indexes.values():
+                index.close()
+        if offsets is None:
+            return None
+        return sorted(indexes), sorted(offsets), rows
+
+    @staticmethod
+    def _lookup(predicate: Predicate, indexes: Dict[str, SecondaryIndex], schema: Schema) -> Optional[Set[int]]:
+        """Смещения записей-кандидатов или None, если условие нельзя вычислить по индексам.
+
+        Значения условия нормализуются преобразователем колонки из схемы
+        запроса, как в построчном фильтре.
+        """
+        if isinstance(predicate, And):
+            found = [IndexedReader._lookup(operand, indexes, schema) for operand in predicate.operands]
+            found = sorted((offsets for offsets in found if offsets is not None), key=len)
+            # Для конъюнкции достаточно одного индексированного условия; остальные
+            # сужают набор кандидатов
+            return set.intersection(*found) if found else None
+        if isinstance(predicate, Or):
+            found = [IndexedReader._lookup(operand, indexes, schema) for operand in predicate.operands]
+            return None if any(offsets is None for offsets in found) else set().union(*found)
+        if not isinstance(predicate, (Comparison, Between, InList)):
+            return None
+
+        index = indexes.get(predicate.field)
+        if index is None:
+            return None
+        convert = schema.converter(predicate.field)
+        if isinstance(predicate, InList):
+            values = [normalize_constant(value, convert) for value in predicate.values]
+            if not index.is_numeric and not all(isinstance(value, str) for value in values):
+                return None
+            return {offset for value in values for offset in index.equal(value)}
+        if isinstance(predicate, Between):
+            bounds = [normalize_constant(predicate.low, convert), normalize_constant(predicate.high, convert)]
+            if not index.is_numeric or any(isinstance(bound, str) for bound in bounds):
+                return None
+            return set(index.range(bounds[0], True, bounds[1], True))
+
+        value = normalize_constant(predicate.value, convert)
+        if predicate.operator == '=':
+            if not index.is_numeric and not isinstance(value, str):
+                # Числу равны разные записи строки ('123', '123.0'), их нет среди ключей
+                return None
+            return set(index.equal(value))
+        if predicate.operator == '!=' or not index.is_numeric or isinstance(value, str):
+            return None
+        match predicate.operator:
+            case '>': return set(index.range(low=value, low_inclusive=False))
+            case '>=': return set(index.range(low=value))
+            case '<': return set(index.range(high=value, high_inclusive=False))
+            case '<=': return set(index.range(high=value))
+
+    @staticmethod
+    def iter_at(
+        file_path: str,
+        offsets: List[int],
+        fields: Optional[Set[str]] = None
+    ) -> Iterator[Dict[str, Optional[str]]]:
+        """Читает записи, начинающиеся с указанных смещений (кандидатов из candidates)."""
+        if not offsets:
+            return
+        header, _ = read_header(file_path)
+        with open(file_path, mode='rb') as csvfile, \
+                mmap.mmap(csvfile.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for offset in offsets:
+                record = next(iter_records(buffer, offset, len(buffer), header, fields), None)
+                if record is not None:
+                    yield record
@@ -0,0 +1,180 @@
+import csv
+import io
+import mmap
+import os
+import re
+from typing import Collection, Iterator, List, Optional, Tuple, Union
+
+from project.model.row import Record, record_type
+
+# Поле CSV: кавычка открывает значение в кавычках только в начале поля ("" внутри -
+# экранированная кавычка), после закрывающей кавычки и в поле без кавычек
+# кавычки - обычные символы. Незакрытое значение продолжается до конца данных,
+# как в модуле csv
+_FIELD = rb'(?:"(?:[^"]|"")*(?:"|\Z))?[^,\n]*'
+
+# Запись CSV: поля через запятую до перевода строки вне кавычек
+RECORD_PATTERN = re.compile(_FIELD + rb'(?:,' + _FIELD + rb')*')
+
+
+def record_end(buffer: Union[mmap.mmap, bytes], start: int, end: int) -> int:
+    """Находит конец записи CSV по правилам кавычек модуля csv.
+
+    Args:
+        buffer: Буфер с содержимым файла (mmap или bytes).
+        start: Смещение начала записи.
+        end: Смещение конца данных.
+
+    Returns:
+        Смещение сразу после перевода строки, завершающего запись, или end.
+    """
+    stop = RECORD_PATTERN.match(buffer, start, end).end()
+    return stop + 1 if stop < end else stop
+
+
+def next_record_start(buffer: Union[mmap.mmap, bytes], start: int, target: int, end: int) -> int:
+    """Находит первое начало записи не раньше target.
+
+    Строки без кавычек пропускаются поиском перевода строки; по правилам
+    кавычек разбираются только записи, в которых кавычки есть.
+
+    Args:
+        buffer: Буфер с содержимым файла (mmap или bytes).
+        start: Смещение начала какой-либо записи не позже target.
+        target: Желаемое смещение.
+        end: Смещение конца данных.
+
+    Returns:
+        Смещение начала записи или end, если записей после target нет.
+    """
+    position = start
+    while position < target:
+        quote = buffer.find(b'"', position, end)
+        if quote == -1 or quote >= target:
+            # До target кавычек нет: запись, содержащая target, начинается после
+            # последнего перевода строки перед ним
+            position = buffer.rfind(b'\n', position, target) + 1 or position
+            return position if position == target else record_end(buffer, position, end)
+        line_start = buffer.rfind(b'\n', position, quote) + 1 or position
+        position = record_end(buffer, line_start, end)
+    return min(position, end)
+
+
+def read_header(file_path: str) -> Tuple[List[str], int]:
+    """Читает заголовок CSV-файла.
+
+    Args:
+        file_path: Путь к CSV-файлу.
+
+    Returns:
+        Кортеж (названия колонок, смещение начала данных в байтах).
+    """
+    with open(file_path, mode='rb') as csvfile:
+        header_bytes = csvfile.readline()
+        # Заголовок с переносом строки внутри кавычек занимает несколько строк файла
+        while b'"' in header_bytes and RECORD_PATTERN.match(header_bytes).end() == len(header_bytes):
+            line = csvfile.readline()
+            if not line:
+                break
+            header_bytes += line
+    header = next(csv.reader(io.StringIO(header_bytes.decode('utf-8'), newline='')), [])
+    return header, len(header_bytes)
+
+
+def iter_records(
+    buffer: mmap.mmap,
+    start: int,
+    end: int,
+    header: List[str],
+    fields: Optional[Collection[str]] = None
+) -> Iterator[Record]:
+    """Разбирает записи CSV в диапазоне байтов буфера.
+
+    Строка без кавычек делится по разделителю прямо в байтах, причем только до
+    последнего нужного поля; декодируются лишь нужные поля. Запись с кавычками
+    (в том числе с переводами строк внутри значений) выделяется по правилам
+    кавычек (record_end) и разбирается модулем csv.
+
+    Args:
+        buffer: Буфер с содержимым файла (mmap или bytes).
+        start: Смещение начала диапазона (начало записи).
+        end: Смещение конца диапазона (конец записи).
+        header: Названия колонок.
+        fields: Поля, которые нужно декодировать. None - все поля.
+
+    Yields:
+        Запись {поле: значение} только с нужными полями. Для коротких строк
+        отсутствующие значения равны None, как в csv.DictReader.
+    """
+    for _, record in iter_offset_records(buffer, start, end, header, fields):
+        yield record
+
+
+def iter_offset_records(
+    buffer: mmap.mmap,
+    start: int,
+    end: int,
+    header: List[str],
+    fields: Optional[Collection[str]] = None
+) -> Iterator[Tuple[int, Record]]:
+    """Разбирает записи CSV в диапазоне байтов буфера вместе с их смещениями.
+
+    Аргументы те же, что у iter_records.
+
+    Yields:
+        Пары (смещение начала записи в байтах, запись {поле: значение}).
+    """
+    wanted = [index for index, name in enumerate(header) if fields is None or name in fields]
+    make = record_type(tuple(header[index] for index in wanted))
+    maxsplit = wanted[-1] + 1 if wanted else 0
+    position = start
+    while position < end:
+        offset = position
+        newline = buffer.find(b'\n', position, end)
+        stop = end if newline == -1 else newline + 1
+        line = buffer[position:stop]
+        position = stop
+
+        if b'"' in line:
+            position = record_end(buffer, offset, end)
+            text = buffer[offset:position].decode('utf-8')
+            for values in csv.reader(io.StringIO(text, newline='')):
+                if values:
+                    yield offset, make([values[index] if index < len(values) else None for index in wanted])
+            continue
+
+        line = line.rstrip(b'\r\n')
+        if not line:
+            continue
+        parts = line.split(b',', maxsplit)
+        yield offset, make([parts[index].decode('utf-8') if index < len(parts) else None for index in wanted])
+
+
+class MMapReader:
+    """Чтение CSV-файла через отображение в память.
+
+    Файл не декодируется целиком: разбираются сырые байты, а в строки
+    превращаются только поля, на которые ссылается запрос. Остальные
+    колонки не материализуются.
+    """
+
+    @staticmethod
+    def iter_rows(
+        file_path: str,
+        fields: Optional[Collection[str]] = None
+    ) -> Iterator[Record]:
+        """Потоковое чтение CSV-файла с декодированием только нужных полей.
+
+        Args:
+            file_path: Путь к CSV-файлу.
+            fields: Поля, которые нужно прочитать. None - все поля.
+
+        Yields:
+            Запись {поле: значение} с запрошенными полями.
+        """
+        header, data_start = read_header(file_path)
+        with open(file_path, mode='rb') as csvfile:
+            if os.fstat(csvfile.fileno()).st_size <= data_start:
+                return
+            with mmap.mmap(csvfile.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield from iter_records(buffer, data_start, len(buffer), header, fields)
@@ -0,0 +1,276 @@
+import csv
+import heapq
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Collection, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from project.model.accumulators import Accumulator, validate_aggregate
+from project.model.compression import is_compressed, open_text
+from project.model.csv_parser import CSVParser
+from project.model.grouping import Groups, HashAggregate
+from project.model.mmap_reader import iter_records, next_record_start, read_header
+from project.model.predicates import Predicate
+from project.model.processors import Aggregate, Limit, OrderBy, Where
+from project.model.schema import Schema
+
+# Желаемый размер одной части файла: частей больше, чем процессов,
+# чтобы нагрузка распределялась равномерно, а память на процесс была ограничена
+TARGET_CHUNK_SIZE = 32 << 20
+
+Expression = Tuple[str, str, Union[int, float, str]]
+Condition = Union[Expression, Predicate]
+
+
+def find_chunk_boundaries(file_path: str, data_start: int, chunk_count: int) -> List[Tuple[int, int]]:
+    """Делит данные файла на диапазоны байтов, выровненные по концам записей.
+
+    Граница ставится только в начале записи по правилам кавычек модуля csv
+    (next_record_start), поэтому ни перевод строки внутри значения в кавычках,
+    ни кавычка внутри поля без кавычек не разрывают запись. Строки без кавычек
+    пропускаются поиском в отображенном в память файле.
+
+    Args:
+        file_path: Путь к CSV-файлу.
+        data_start: Смещение начала данных (после заголовка).
+        chunk_count: Желаемое количество частей.
+
+    Returns:
+        Список диапазонов (начало, конец) в байтах.
+    """
+    file_size = os.path.getsize(file_path)
+    if file_size <= data_start:
+        return []
+    step = max((file_size - data_start) // max(chunk_count, 1), 1)
+    boundaries = [data_start]
+
+    with open(file_path, mode='rb') as csvfile:
+        with mmap.mmap(csvfile.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            while boundaries[-1] < file_size:
+                target = max(data_start + step * len(boundaries), boundaries[-1] + 1)
+                if target >= file_size:
+                    break
+                boundaries.append(next_record_start(buffer, boundaries[-1], target, file_size))
+
+    boundaries.append(file_size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+def plan_chunks(
+    file_paths: Sequence[str],
+    workers: int
+) -> List[Tuple[str, Optional[int], Optional[int], List[str]]]:
+    """Делит один или несколько CSV-файлов на части для параллельной обработки.
+
+    Количество частей выбирается по общему объему данных и распределяется
+    между файлами пропорционально их размеру, но не меньше одной части на
+    непустой файл: мелкие файлы-шарды обрабатываются целиком, крупные делятся.
+    Сжатый файл нельзя разделить по смещениям, поэтому он всегда - одна часть.
+
+    Args:
+        file_paths: Пути к CSV-файлам.
+        workers: Количество процессов.
+
+    Returns:
+        Список частей (путь, начало, конец, заголовок файла). Для сжатого
+        файла начало и конец равны None.
+    """
+    compressed = {file_path for file_path in file_paths if is_compressed(file_path)}
+    headers = {file_path: read_header(file_path) for file_path in file_paths if file_path not in compressed}
+    sizes = {file_path: os.path.getsize(file_path) - data_start for file_path, (_, data_start) in headers.items()}
+    total_size = sum(sizes.values())
+    chunk_count = max(workers, -(-total_size // TARGET_CHUNK_SIZE))
+    chunks = []
+    for file_path in file_paths:
+        if file_path in compressed:
+            chunks.append((file_path, None, None, _read_compressed_header(file_path)))
+            continue
+        header, data_start = headers[file_path]
+        size = sizes[file_path]
+        if size <= 0:
+            continue
+        file_chunks = max(1, round(chunk_count * size / total_size))
+        chunks.extend(
+            (file_path, start, end, header)
+            for start, end in find_chunk_boundaries(file_path, data_start, file_chunks)
+        )
+    return chunks
+
+
+def _read_compressed_header(file_path: str) -> List[str]:
+    """Читает заголовок сжатого CSV-файла, распаковывая только его начало."""
+    with open_text(file_path, workers=1) as csvfile:
+        return next(csv.reader(csvfile), [])
+
+
+def _scan_chunk(
+    file_path: str,
+    start: Optional[int],
+    end: Optional[int],
+    header: List[str],
+    where: Optional[Condition],
+    order_by: Optional[Expression],
+    aggregates: Optional[List[Expression]],
+    group_by: Optional[str],
+    schema: Optional[Schema],
+    fields: Optional[Collection[str]],
+    limit: Optional[int]
+) -> Union[Dict[str, Accumulator], Groups, List[Dict[str, str]]]:
+    """Обрабатывает одну часть файла в отдельном процессе.
+
+    Часть файла читается через отображение в память, декодируются только
+    поля из fields. Сжатый файл (start равно None) распаковывается потоково.
+
+    Returns:
+        Частичные накопители по полям для агрегации, частичную таблицу групп
+        для группировки, отсортированный фрагмент для сортировки или
+        отфильтрованные строки.
+    """
+    if start is None:
+        rows = CSVParser.iter_rows(file_path, fields)
+        return _process_rows(rows, where, order_by, aggregates, group_by, schema, limit)
+    with open(file_path, mode='rb') as csvfile, \
+            mmap.mmap(csvfile.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        rows = iter_records(buffer, start, end, header, fields)
+        return _process_rows(rows, where, order_by, aggregates, group_by, schema, limit)
+
+
+def _process_rows(
+    rows: Iterable[Dict[str, str]],
+    where: Optional[Condition],
+    order_by: Optional[Expression],
+    aggregates: Optional[List[Expression]],
+    group_by: Optional[str],
+    schema: Optional[Schema],
+    limit: Optional[int]
+) -> Union[Dict[str, Accumulator], Groups, List[Dict[str, str]]]:
+    """Фильтрует строки части файла и частично агрегирует или сортирует их.
+
+    При заданном лимите каждая часть возвращает не больше limit строк: этого
+    достаточно, чтобы после слияния получить первые limit строк всего файла.
+    """
+    if where:
+        rows = Where.iter_filter(rows, where, schema)
+
+    if group_by:
+        return HashAggregate.accumulate(rows, group_by, aggregates, schema)
+
+    if aggregates:
+        return Aggregate.accumulate(rows, aggregates, schema)
+
+    if order_by:
+        return OrderBy.execute(rows, order_by, schema, limit)
+
+    return list(rows) if limit is None else Limit.execute(rows, limit)
+
+
+class ParallelScan:
+    """Параллельная обработка CSV-файлов по частям в нескольких процессах.
+
+    Файлы делятся на диапазоны байтов; каждый диапазон разбирается, фильтруется
+    и частично агрегируется или сортируется в ProcessPoolExecutor, после чего
+    частичные результаты объединяются. Несколько файлов (шарды одного набора
+    данных) обрабатываются одновременно, поэтому общее время определяется
+    самым крупным шардом, а не суммой всех.
+    """
+
+    @staticmethod
+    def execute(
+        file_path: Union[str, Sequence[str]],
+        workers: int,
+        where: Optional[Condition] = None,
+        order_by: Optional[Expression] = None,
+        aggregates: Optional[List[Expression]] = None,
+        group_by: Optional[str] = None,
+        schema: Optional[Schema] = None,
+        fields: Optional[Collection[str]] = None,
+        limit: Optional[int] = None
+    ) -> Union[List[Dict[str, str]], Dict[str, List[Any]]]:
+        """Выполняет запрос над файлом в несколько процессов.
+
+        Порядок обработки тот же, что у последовательного конвейера:
+        where -> order_by -> aggregate. Перед агрегацией сортировка не выполняется,
+        так как на результат агрегатов она не влияет; при группировке она задает
+        порядок групп. Все агрегаты считаются за
+        один проход по каждой части.
+
+        Args:
+            file_path: Путь к CSV-файлу или список путей к файлам с одинаковыми колонками.
+            workers: Количество процессов.
+            where: Условие фильтрации.
+            order_by: Условие сортировки.
+            aggregates: Список условий агрегации.
+            group_by: Поле группировки. Без aggregates считается количество строк групп.
+            schema: Схема с типами колонок.
+            fields: Поля, которые нужно декодировать. None - все поля.
+            limit: Максимальное количество строк результата.
+
+        Returns:
+            Результат в том же виде, что и у последовательного конвейера.
+
+        Raises:
+            ValueError: Если тип агрегации или направление сортировки некорректны
+                или группы сортируются не по полю группировки.
+        """
+        # Ошибки в выражениях обнаруживаются до запуска процессов
+        for _, _, aggregator_type in aggregates or ():
+            validate_aggregate(aggregator_type)
+        if order_by and order_by[2] not in ('asc', 'desc'):
+            raise ValueError("Направление сортировки должно быть 'asc' или 'desc'")
+        Limit.validate(limit)
+        if group_by and order_by:
+            HashAggregate.validate_order(group_by, order_by)
+        if group_by and not aggregates:
+            aggregates = [(group_by, '=', 'count')]
+        if aggregates and not group_by:
+            # Лимит относится к результату агрегации, а не к ее входу
+            limit = None
+
+        file_paths = [file_path] if isinstance(file_path, str) else list(file_path)
+        chunks = plan_chunks(file_paths, workers)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(
+                _scan_chunk,
+                *zip(*[
+                    (path, start, end, header, where, order_by, aggregates, group_by, schema, fields, limit)
+                    for path, start, end, header in chunks
+                ])
+            )) if chunks else []
+
+        if group_by:
+            # Частичные таблицы групп объединяются по ключам
+            groups: Groups = {}
+            for partial in partials:
+                HashAggregate.merge(groups, partial)
+            result = HashAggregate.result_table(
+                group_by, aggregates, HashAggregate.layout(aggregates), groups.items()
+            )
+            if order_by:
+                result = HashAggregate.order(result, order_by[2])
+            return Limit.execute_columns(result, limit)
+
+        if aggregates:
+            # Пустые накопители той же конфигурации, что и в частях файла
+            accumulators = Aggregate.accumulate((), aggregates, schema)
+            for partial in partials:
+                for field, accumulator in partial.items():
+                    accumulators[field].merge(accumulator)
+            values = [
+                Aggregate.convert_float_to_int_if_necessary(accumulators[field].result(aggregator_type))
+                for field, _, aggregator_type in aggregates
+            ]
+            return Aggregate.result_table(aggregates, values)
+
+        if order_by:
+            field, _, direction = order_by
+            # Отсортированные фрагменты сливаются без повторной сортировки
+            merged = heapq.merge(
+                *partials,
+                key=OrderBy.sort_key(field, schema),
+                reverse=(direction == 'desc')
+            )
+            return list(merged) if limit is None else Limit.execute(merged, limit)
+
+        rows = (row for partial in partials for row in partial)
+        return list(rows) if limit is None else Limit.execute(rows, limit)
@@ -0,0 +1,181 @@
+import os
+from typing import List, Optional, Set, Tuple
+
+from project.model.compression import is_compressed
+from project.model.grouping import HashAggregate
+from project.model.index import IndexedReader
+from project.model.predicates import Predicate
+from project.model.schema import Schema
+
+# Во сколько раз строки-записи в памяти больше своего текста в CSV-файле
+# (с общими объектами повторяющихся значений, см. compact_rows)
+ROW_MEMORY_FACTOR = 5
+
+# Бюджет памяти сортировки, если он не задан явно: при большей оценке сортируется внешне
+DEFAULT_SORT_MEMORY = 512 * 1024 * 1024
+
+# Доля записей-кандидатов, начиная с которой полный просмотр быстрее чтения по индексу:
+# запись по смещению читается примерно вдвое дольше, чем при последовательном просмотре
+INDEX_MAX_SELECTIVITY = 0.3
+
+Expression = Tuple[str, str, str]
+
+
+class QueryPlan:
+    """План выполнения запроса: этапы после перестановок и выбранные операторы.
+
+    Attributes:
+        predicate: Условие фильтрации или None.
+        order_by: Выражение сортировки или None, если сортировка не нужна; при
+            группировке - порядок групп по ключу.
+        group_by: Поле группировки или None.
+        aggregates: Выражения агрегатов или None, если выводятся строки.
+        select: Колонки результата или None, если выводятся все колонки.
+        limit: Лимит, применяемый после сортировки и агрегации; None, если его нет
+            или он выполняется сортировкой top-K.
+        fields: Поля, читаемые из файла; None - все поля.
+        access: Чтение данных: 'scan' - полный просмотр, 'index' - записи-кандидаты по индексам.
+        index_fields: Поля, индексы которых использует чтение по индексу.
+        offsets: Смещения записей-кандидатов для чтения по индексу.
+        index_rows: Количество записей в использованных индексах.
+        sort: Оператор сортировки: 'top_k' (ограниченная куча), 'external'
+            (внешняя сортировка слиянием) или 'memory'; None без сортировки.
+        sort_memory: Бюджет памяти внешней сортировки в байтах.
+        fused: Фильтр выполняется в цикле агрегации, без отдельного этапа.
+        rewrites: Описания примененных перестановок для --explain.
+    """
+
+    def __init__(
+        self,
+        predicate: Optional[Predicate],
+        order_by: Optional[Expression],
+        group_by: Optional[str],
+        aggregates: Optional[List[Expression]],
+        limit: Optional[int],
+        select: Optional[List[str]] = None
+    ) -> None:
+        self.predicate = predicate
+        self.order_by = order_by
+        self.group_by = group_by
+        self.aggregates = aggregates
+        self.limit = limit
+        self.select = select
+        self.fields: Optional[Set[str]] = None
+        self.access = 'scan'
+        self.index_fields: List[str] = []
+        self.offsets: Optional[List[int]] = None
+        self.index_rows = 0
+        self.sort: Optional[str] = None
+        self.sort_memory: Optional[int] = None
+        self.fused = False
+        self.rewrites: List[str] = []
+
+
+class QueryPlanner:
+    """Оптимизатор запроса: переставляет и объединяет этапы конвейера.
+
+    Логический порядок запроса - where -> order_by -> group_by/aggregate ->
+    limit. Планировщик удаляет сортировку перед агрегацией (агрегаты не
+    зависят от порядка строк, а порядок групп задается после группировки),
+    опускает проекцию и фильтр в чтение файла (только нужные поля, записи-
+    кандидаты по индексу), объединяет фильтр с агрегацией в один цикл и
+    выбирает операторы по размеру файла и статистикам индексов.
+    """
+
+    @staticmethod
+    def plan(
+        predicate: Optional[Predicate],
+        order_by: Optional[Expression],
+        group_by: Optional[str],
+        aggregates: Optional[List[Expression]],
+        limit: Optional[int],
+        schema: Optional[Schema] = None,
+        file_path: Optional[str] = None,
+        sort_memory: Optional[int] = None,
+        use_index: bool = False,
+        select: Optional[List[str]] = None
+    ) -> QueryPlan:
+        """Составляет план запроса.
+
+        Args:
+            predicate: Условие фильтрации или None.
+            order_by: Выражение сортировки (поле, оператор, направление) или None.
+            group_by: Поле группировки или None.
+            aggregates: Выражения агрегатов; для группировки без агрегатов - count ключа.
+            limit: Количество строк результата или None.
+            schema: Схема с типами колонок; без нее индексы не применяются.
+            file_path: CSV-файл, строки которого читаются потоково. None - данные
+                уже в памяти (колоночная таблица), сортировка выполняется в памяти.
+            sort_memory: Заданный бюджет памяти сортировки в байтах.
+            use_index: Выбирать чтение по индексам условия.
+            select: Колонки результата для вывода строк. None - все колонки.
+
+        Returns:
+            План запроса.
+
+        Raises:
+            ValueError: Если колонки результата заданы вместе с агрегацией или
+                группы сортируются не по полю группировки.
+        """
+        if select is not None and aggregates:
+            raise ValueError("Выбор колонок результата несовместим с агрегацией")
+        plan = QueryPlan(predicate, order_by, group_by, aggregates, limit, select)
+        if order_by is not None and group_by:
+            HashAggregate.validate_order(group_by, order_by)
+            plan.rewrites.append(f"сортировка по {order_by[0]} применяется к группам после агрегации")
+        elif order_by is not None and aggregates:
+            plan.order_by = None
+            plan.rewrites.append(f"сортировка по {order_by[0]} удалена: агрегаты не зависят от порядка строк")
+
+        if aggregates:
+            # Для агрегата нужны только поля запроса; строки выводятся целиком
+            plan.fields = predicate.fields() if predicate is not None else set()
+            if group_by:
+                plan.fields.add(group_by)
+            plan.fields |= {field for field, _, _ in aggregates}
+        elif select is not None:
+            # Поля условия и сортировки читаются, но в результат не попадают
+            plan.fields = set(select) | (predicate.fields() if predicate is not None else set())
+            if order_by is not None:
+                plan.fields.add(order_by[0])
+
+        streaming = file_path is not None
+        input_size = os.path.getsize(file_path) if streaming and os.path.isfile(file_path) else None
+        if use_index and streaming and predicate is not None and input_size is not None:
+            QueryPlanner._choose_access(plan, file_path, schema)
+            if plan.access == 'index':
+                rows = plan.index_rows or 1
+                input_size = input_size * min(1.0, len(plan.offsets) / rows)
+
+        if plan.order_by is not None and not group_by:
+            if limit is not None:
+                plan.sort, plan.limit = 'top_k', None
+            elif streaming and sort_memory:
+                plan.sort, plan.sort_memory = 'external', sort_memory
+            elif streaming and input_size is not None and input_size * ROW_MEMORY_FACTOR > DEFAULT_SORT_MEMORY:
+                plan.sort, plan.sort_memory = 'external', DEFAULT_SORT_MEMORY
+                plan.rewrites.append(
+                    f"внешняя сортировка: строки файла займут в памяти больше {DEFAULT_SORT_MEMORY >> 20} МБ"
+                )
+            else:
+                plan.sort = 'memory'
+
+        # Отдельный этап фильтра потока стоил бы лишнего итератора на каждую строку
+        plan.fused = streaming and predicate is not None and bool(aggregates)
+        return plan
+
+    @staticmethod
+    def _choose_access(plan: QueryPlan, file_path: str, schema: Optional[Schema]) -> None:
+        """Выбирает чтение по индексам, если кандидатов достаточно мало."""
+        if is_compressed(file_path):
+            return
+        found = IndexedReader.candidates(file_path, plan.predicate, schema)
+        if found is None:
+            return
+        index_fields, offsets, rows = found
+        if rows and len(offsets) > INDEX_MAX_SELECTIVITY * rows:
+            plan.rewrites.append(
+                f"индекс {', '.join(index_fields)} не используется: кандидатов {len(offsets)} из {rows}"
+            )
+            return
+        plan.access, plan.index_fields, plan.offsets, plan.index_rows = 'index', index_fields, offsets, rows
@@ -0,0 +1,706 @@
+import operator
+import re
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from project.model.schema import Schema
+from project.model.table import COMPARATORS, Table
+from project.model.util import ExpressionParser, convert_to_number_if_possible
+
+try:
+    import numpy as np
+except ImportError:  # NumPy - необязательная зависимость
+    np = None
+
+# Функция преобразования строкового значения ячейки
+Converter = Callable[[str], Union[int, float, str]]
+
+# Скомпилированное условие над строкой-словарем
+RowTest = Callable[[Dict[str, str]], bool]
+
+Value = Union[int, float, str]
+
+# Количество запоминаемых нормализованных значений одного поля
+NORMALIZED_CACHE_SIZE = 1 << 12
+
+# Признак значения, которое еще не нормализовано
+_MISSING = object()
+
+# Ключевые слова языка условий (регистр не важен)
+KEYWORDS = ('AND', 'OR', 'NOT', 'IN', 'BETWEEN', 'LIKE')
+
+# Лексемы: строка в кавычках, оператор сравнения, скобка или запятая, слово
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<string>'(?:[^']|'')*'|"(?:[^"]|"")*")
+      | (?P<operator>!=|>=|<=|=|>|<)
+      | (?P<punct>[(),])
+      | (?P<word>[^\s=!<>(),'"]+)
+    )""", re.VERBOSE)
+
+
+def normalize_constant(value: Value, convert: Converter = convert_to_number_if_possible) -> Value:
+    """Нормализует значение условия так же, как значения поля.
+
+    Строка преобразуется функцией поля (по схеме или с угадыванием числа) и
+    приводится к нижнему регистру без крайних пробелов.
+    """
+    value = convert(value) if isinstance(value, str) else value
+    return value.strip().lower() if isinstance(value, str) else value
+
+
+def _converter(field: str, schema: Optional[Schema]) -> Converter:
+    """Функция преобразования значений поля: по схеме или с угадыванием числа."""
+    return schema.converter(field) if schema else convert_to_number_if_possible
+
+
+def _field_reader(convert: Converter, field: str) -> Callable[[Dict[str, str]], Optional[Value]]:
+    """Создает функцию чтения нормализованного значения поля из строки.
+
+    Строковые значения приводятся к нижнему регистру без крайних пробелов;
+    для отсутствующего поля возвращается None. Нормализованные значения
+    запоминаются (не больше NORMALIZED_CACHE_SIZE): у колонки с небольшим
+    числом различных значений каждое значение нормализуется один раз. Если
+    к моменту заполнения запомненные значения почти не повторялись (колонка
+    уникальных значений), запоминание отключается.
+    """
+    normalized: Dict[Optional[str], Optional[Value]] = {None: None}
+    capacity = NORMALIZED_CACHE_SIZE
+    hits = 0
+
+    def read(row: Dict[str, str]) -> Optional[Value]:
+        nonlocal capacity, hits
+        raw = row.get(field)
+        value = normalized.get(raw, _MISSING)
+        if value is not _MISSING:
+            hits += 1
+            return value
+        value = convert(raw)
+        if isinstance(value, str):
+            value = value.strip().lower()
+        if len(normalized) < capacity:
+            normalized[raw] = value
+        elif capacity and hits < capacity:
+            normalized.clear()
+            normalized[None] = None
+            capacity = 0
+        return value
+
+    return read
+
+
+class Predicate(ABC):
+    """Узел дерева условия фильтрации.
+
+    Условие один раз компилируется в замыкание над строкой (compile) или
+    вычисляется над колоночной таблицей, сужая набор индексов строк
+    (filter_indices). В AND и OR дешевые проверки выполняются первыми, а
+    вычисление прекращается, как только результат известен.
+    """
+    __slots__ = ()
+
+    # Относительная стоимость проверки одной строки
+    cost = 1
+
+    @abstractmethod
+    def compile(self, schema: Optional[Schema] = None) -> RowTest:
+        """Компилирует условие в функцию проверки строки."""
+
+    @abstractmethod
+    def filter_indices(
+        self, table: Table, candidates: Optional[Sequence[int]] = None, schema: Optional[Schema] = None
+    ) -> Sequence[int]:
+        """Отбирает из кандидатов индексы строк таблицы, удовлетворяющих условию.
+
+        Args:
+            table: Колоночная таблица.
+            candidates: Индексы строк-кандидатов по возрастанию. None - все строки.
+            schema: Схема с типами колонок: значения условия преобразуются ее
+                преобразователями, как в compile.
+
+        Returns:
+            Индексы подходящих строк по возрастанию.
+        """
+
+    @abstractmethod
+    def fields(self) -> Set[str]:
+        """Возвращает поля, на которые ссылается условие."""
+
+    def text_fields(self) -> Set[str]:
+        """Возвращает поля, значения которых проверяются в записи из CSV (LIKE)."""
+        return set()
+
+    @abstractmethod
+    def key(self) -> str:
+        """Каноническая запись условия: одинакова для условий, записанных по-разному.
+
+        Значения приводятся к нижнему регистру без крайних пробелов, операнды
+        AND и OR упорядочиваются.
+        """
+
+    def implies(self, other: 'Predicate', schema: Optional[Schema] = None) -> bool:
+        """Проверяет, что каждая строка, удовлетворяющая условию, удовлетворяет и other.
+
+        Проверка консервативна: False означает, что следование не доказано.
+        Диапазоны сравниваются только для числовых значений полей, которые по
+        схеме не строковые.
+
+        Args:
+            other: Другое условие.
+            schema: Схема с типами колонок.
+
+        Returns:
+            True, если из условия следует other.
+        """
+        if self.key() == other.key():
+            return True
+        if isinstance(other, And):
+            return all(self.implies(operand, schema) for operand in other.operands)
+        if isinstance(self, Or):
+            return all(operand.implies(other, schema) for operand in self.operands)
+        if isinstance(self, And):
+            return any(operand.implies(other, schema) for operand in self.operands)
+        if isinstance(other, Or):
+            return any(self.implies(operand, schema) for operand in other.operands)
+        return _range_implies(self, other, schema)
+
+    @staticmethod
+    def of(expression: Union['Predicate', Tuple[str, str, Value]]) -> 'Predicate':
+        """Приводит кортеж (поле, оператор, значение) к условию."""
+        if isinstance(expression, Predicate):
+            return expression
+        return Comparison(*expression)
+
+
+class Comparison(Predicate):
+    """Сравнение поля со значением: =, !=, >, <, >=, <=."""
+    __slots__ = ('field', 'operator', 'value')
+
+    def __init__(self, field: str, operator_: str, value: Value) -> None:
+        if operator_ not in COMPARATORS:
+            raise ValueError(f"Unsupported operator: {operator_}")
+        self.field = field
+        self.operator = operator_
+        self.value = value
+
+    def compile(self, schema: Optional[Schema] = None) -> RowTest:
+        convert = _converter(self.field, schema)
+        read = _field_reader(convert, self.field)
+        compare = COMPARATORS[self.operator]
+        # Ожидаемое значение нормализуется один раз, а не для каждой строки
+        expected = normalize_constant(self.value, convert)
+
+        def test(row: Dict[str, str]) -> bool:
+            value = read(row)
+            return value is not None and compare(value, expected)
+
+        return test
+
+    def filter_indices(
+        self, table: Table, candidates: Optional[Sequence[int]] = None, schema: Optional[Schema] = None
+    ) -> Sequence[int]:
+        return table.filter_indices(self.field, self.operator, self.value, candidates, _converter(self.field, schema))
+
+    def fields(self) -> Set[str]:
+        return {self.field}
+
+    def key(self) -> str:
+        return f"{self.field} {self.operator} {_key_value(self.value)}"
+
+
+class Between(Predicate):
+    """Принадлежность поля отрезку: field BETWEEN low AND high (границы включены)."""
+    __slots__ = ('field', 'low', 'high')
+
+    cost = 2
+
+    def __init__(self, field: str, low: Value, high: Value) -> None:
+        self.field = field
+        self.low = low
+        self.high = high
+
+    def compile(self, schema: Optional[Schema] = None) -> RowTest:
+        convert = _converter(self.field, schema)
+        read = _field_reader(convert, self.field)
+        low, high = normalize_constant(self.low, convert), normalize_constant(self.high, convert)
+
+        def test(row: Dict[str, str]) -> bool:
+            value = read(row)
+            return value is not None and low <= value <= high
+
+        return test
+
+    def filter_indices(
+        self, table: Table, candidates: Optional[Sequence[int]] = None, schema: Optional[Schema] = None
+    ) -> Sequence[int]:
+        return table.filter_range(self.field, self.low, self.high, candidates, _converter(self.field, schema))
+
+    def fields(self) -> Set[str]:
+        return {self.field}
+
+    def key(self) -> str:
+        return f"{self.field} BETWEEN {_key_value(self.low)} AND {_key_value(self.high)}"
+
+
+class InList(Predicate):
+    """Принадлежность поля списку значений: field IN (a, b, ...)."""
+    __slots__ = ('field', 'values')
+
+    cost = 2
+
+    def __init__(self, field: str, values: Iterable[Value]) -> None:
+        self.field = field
+        self.values = tuple(values)
+
+    def compile(self, schema: Optional[Schema] = None) -> RowTest:
+        convert = _converter(self.field, schema)
+        read = _field_reader(convert, self.field)
+        expected = frozenset(normalize_constant(value, convert) for value in self.values)
+
+        def test(row: Dict[str, str]) -> bool:
+            return read(row) in expected
+
+        return test
+
+    def filter_indices(
+        self, table: Table, candidates: Optional[Sequence[int]] = None, schema: Optional[Schema] = None
+    ) -> Sequence[int]:
+        convert = _converter(self.field, schema)
+        expected = frozenset(normalize_constant(value, convert) for value in self.values)
+        column = table.columns.get(self.field)
+        if np is not None and column is not None and column.is_numeric and isinstance(column.values, np.ndarray):
+            numbers = [value for value in expected if not isinstance(value, str)]
+            # Для числовой колонки NumPy проверяет вхождение всего массива сразу
+            return table.match_indices(self.field, lambda values: np.isin(values, numbers), candidates, 0)
+        # Если все значения - строки, значения колонки сравниваются как текст, без угадывания числа
+        text = '' if all(isinstance(value, str) for value in expected) else None
+        return table.match_indices(self.field, expected.__contains__, candidates, text)
+
+    def fields(self) -> Set[str]:
+        return {self.field}
+
+    def key(self) -> str:
+        return f"{self.field} IN ({', '.join(sorted(set(map(_key_value, self.values))))})"
+
+
+class Like(Predicate):
+    """Сопоставление с шаблоном SQL LIKE: % - любая подстрока, _ - один символ.
+
+    Сравнение выполняется без учета регистра и крайних пробелов.
+    """
+    __slots__ = ('field', 'pattern')
+
+    cost = 4
+
+    def __init__(self, field: str, pattern: str) -> None:
+        self.field = field
+        self.pattern = pattern
+
+    def regex(self) -> 're.Pattern[str]':
+        """Компилирует шаблон LIKE в регулярное выражение."""
+        parts = {'%': '.*', '_': '.'}
+        body = ''.join(parts.get(char) or re.escape(char) for char in str(self.pattern).strip())
+        return re.compile(body, re.IGNORECASE | re.DOTALL)
+
+    def compile(self, schema: Optional[Schema] = None) -> RowTest:
+        field, match = self.field, self.regex().fullmatch
+
+        def test(row: Dict[str, str]) -> bool:
+            value = row.get(field)
+            return value is not None and match(value.strip()) is not None
+
+        return test
+
+    def filter_indices(
+        self, table: Table, candidates: Optional[Sequence[int]] = None, schema: Optional[Schema] = None
+    ) -> Sequence[int]:
+        match = self.regex().fullmatch
+        # Числа сопоставляются в записи из CSV, как в построчном фильтре
+        return table.match_indices(
+            self.field, lambda value: match(value) is not None, candidates, self.pattern, as_text=True
+        )
+
+    def fields(self) -> Set[str]:
+        return {self.field}
+
+    def text_fields(self) -> Set[str]:
+        return {self.field}
+
+    def key(self) -> str:
+        return f"{self.field} LIKE {_key_value(self.pattern)}"
+
+
+class Not(Predicate):
+    """Отрицание условия."""
+    __slots__ = ('operand',)
+
+    def __init__(self, operand: Predicate) -> None:
+        self.operand = operand
+
+    @property
+    def cost(self) -> int:
+        return self.operand.cost
+
+    def compile(self, schema: Optional[Schema] = None) -> RowTest:
+        test = self.operand.compile(schema)
+        return lambda row: not test(row)
+
+    def filter_indices(
+        self, table: Table, candidates: Optional[Sequence[int]] = None, schema: Optional[Schema] = None
+    ) -> Sequence[int]:
+        return _difference(table, candidates, self.operand.filter_indices(table, candidates, schema))
+
+    def fields(self) -> Set[str]:
+        return self.operand.fields()
+
+    def text_fields(self) -> Set[str]:
+        return self.operand.text_fields()
+
+    def key(self) -> str:
+        return f"NOT ({self.operand.key()})"
+
+
+class And(Predicate):
+    """Конъюнкция условий с сокращенным вычислением."""
+    __slots__ = ('operands',)
+
+    def __init__(self, operands: List[Predicate]) -> None:
+        self.operands = operands
+
+    @property
+    def cost(self) -> int:
+        return sum(operand.cost for operand in self.operands)
+
+    def compile(self, schema: Optional[Schema] = None) -> RowTest:
+        tests = [operand.compile(schema) for operand in _cheapest_first(self.operands)]
+        if len(tests) == 2:
+            first, second = tests
+            return lambda row: first(row) and second(row)
+        return lambda row: all(test(row) for test in tests)
+
+    def filter_indices(
+        self, table: Table, candidates: Optional[Sequence[int]] = None, schema: Optional[Schema] = None
+    ) -> Sequence[int]:
+        # Каждое следующее условие проверяется только на строках, прошедших предыдущие
+        for operand in _cheapest_first(self.operands):
+            candidates = operand.filter_indices(table, candidates, schema)
+            if not len(candidates):
+                break
+        return candidates
+
+    def fields(self) -> Set[str]:
+        return set().union(*(operand.fields() for operand in self.operands))
+
+    def text_fields(self) -> Set[str]:
+        return set().union(*(operand.text_fields() for operand in self.operands))
+
+    def key(self) -> str:
+        return ' AND '.join(sorted(f"({operand.key()})" for operand in self.operands))
+
+
+class Or(Predicate):
+    """Дизъюнкция условий с сокращенным вычислением."""
+    __slots__ = ('operands',)
+
+    def __init__(self, operands: List[Predicate]) -> None:
+        self.operands = operands
+
+    @property
+    def cost(self) -> int:
+        return sum(operand.cost for operand in self.operands)
+
+    def compile(self, schema: Optional[Schema] = None) -> RowTest:
+        tests = [operand.compile(schema) for operand in _cheapest_first(self.operands)]
+        if len(tests) == 2:
+            first, second = tests
+            return lambda row: first(row) or second(row)
+        return lambda row: any(test(row) for test in tests)
+
+    def filter_indices(
+        self, table: Table, candidates: Optional[Sequence[int]] = None, schema: Optional[Schema] = None
+    ) -> Sequence[int]:
+        # Следующее условие проверяется только на строках, не подошедших под предыдущие
+        matched = []
+        remaining = candidates
+        for operand in _cheapest_first(self.operands):
+            found = operand.filter_indices(table, remaining, schema)
+            matched.append(found)
+            remaining = _difference(table, remaining, found)
+            if not len(remaining):
+                break
+        return _union(matched)
+
+    def fields(self) -> Set[str]:
+        return set().union(*(operand.fields() for operand in self.operands))
+
+    def text_fields(self) -> Set[str]:
+        return set().union(*(operand.text_fields() for operand in self.operands))
+
+    def key(self) -> str:
+        return ' OR '.join(sorted(f"({operand.key()})" for operand in self.operands))
+
+
+def _key_value(value: Value) -> str:
+    """Запись значения в канонической форме условия."""
+    return repr(str(value).strip().lower())
+
+
+def _bounds(predicate: Predicate, convert: Converter) -> Optional[Tuple[Value, bool, Value, bool]]:
+    """Числовой диапазон условия над одним полем: (нижняя, включена, верхняя, включена).
+
+    Отсутствующая граница - None. Возвращает None, если условие не задает
+    диапазон числовых значений.
+    """
+    if isinstance(predicate, Between):
+        low, high = normalize_constant(predicate.low, convert), normalize_constant(predicate.high, convert)
+        bounds = (low, True, high, True)
+    elif isinstance(predicate, Comparison) and predicate.operator != '!=':
+        value = normalize_constant(predicate.value, convert)
+        match predicate.operator:
+            case '=': bounds = (value, True, value, True)
+            case '>': bounds = (value, False, None, False)
+            case '>=': bounds = (value, True, None, False)
+            case '<': bounds = (None, False, value, False)
+            case '<=': bounds = (None, False, value, True)
+    else:
+        return None
+    if any(isinstance(bound, str) for bound in (bounds[0], bounds[2])):
+        return None
+    return bounds
+
+
+def _range_implies(predicate: Predicate, other: Predicate, schema: Optional[Schema]) -> bool:
+    """Следование для условий над одним полем: вложенность числовых диапазонов и списков значений."""
+    field = getattr(predicate, 'field', None)
+    if field is None or field != getattr(other, 'field', None):
+        return False
+    convert = _converter(field, schema)
+    if isinstance(predicate, InList):
+        # Список значений следует из каждого своего значения
+        return all(Comparison(field, '=', value).implies(other, schema) for value in predicate.values)
+    if isinstance(other, InList):
+        if not (isinstance(predicate, Comparison) and predicate.operator == '='):
+            return False
+        return normalize_constant(predicate.value, convert) in {
+            normalize_constant(value, convert) for value in other.values
+        }
+    if schema is not None and schema.column_type(field) == 'str':
+        # Строки сравниваются лексикографически, диапазоны чисел к ним неприменимы
+        return False
+    inner, outer = _bounds(predicate, convert), _bounds(other, convert)
+    if inner is None or outer is None:
+        return False
+    low, low_inclusive, high, high_inclusive = inner
+    outer_low, outer_low_inclusive, outer_high, outer_high_inclusive = outer
+    if outer_low is not None and (low is None or low < outer_low or
+                                  (low == outer_low and low_inclusive and not outer_low_inclusive)):
+        return False
+    if outer_high is not None and (high is None or high > outer_high or
+                                   (high == outer_high and high_inclusive and not outer_high_inclusive)):
+        return False
+    return True
+
+
+def _cheapest_first(operands: List[Predicate]) -> List[Predicate]:
+    """Упорядочивает условия по возрастанию стоимости (порядок равных сохраняется)."""
+    return sorted(operands, key=operator.attrgetter('cost'))
+
+
+def _difference(table: Table, candidates: Optional[Sequence[int]], matched: Sequence[int]) -> Sequence[int]:
+    """Кандидаты без подошедших строк (matched - подмножество кандидатов)."""
+    rows = range(len(table)) if candidates is None else candidates
+    if np is not None and (isinstance(rows, np.ndarray) or isinstance(matched, np.ndarray)):
+        return np.setdiff1d(np.asarray(rows, dtype=np.intp), np.asarray(matched, dtype=np.intp), assume_unique=True)
+    excluded = set(matched)
+    return [index for index in rows if index not in excluded]
+
+
+def _union(parts: List[Sequence[int]]) -> Sequence[int]:
+    """Объединяет непересекающиеся наборы индексов в один упорядоченный."""
+    if np is not None and any(isinstance(part, np.ndarray) for part in parts):
+        return np.sort(np.concatenate([np.asarray(part, dtype=np.intp) for part in parts]))
+    return sorted(index for part in parts for index in part)
+
+
+class PredicateParser:
+    """Разбор условий фильтрации.
+
+    Грамматика (по убыванию приоритета связок NOT, AND, OR):
+
+        условие   := дизъюнкт (OR дизъюнкт)*
+        дизъюнкт  := отрицание (AND отрицание)*
+        отрицание := NOT отрицание | ( условие ) | сравнение
+        сравнение := поле оператор значение
+                   | поле [NOT] IN ( значение, ... )
+                   | поле [NOT] BETWEEN значение AND значение
+                   | поле [NOT] LIKE шаблон
+
+    Значение - число, строка в кавычках или несколько слов без кавычек
+    (например, name=Galaxy S23).
+
+    Строка, которая не разбирается по грамматике, разбирается как раньше -
+    одним сравнением (ExpressionParser.parse_expression): поле до первого
+    оператора, значение - остаток строки. Так по-прежнему принимаются
+    значения с ключевыми словами (brand=Black and Decker), апострофами
+    (name=O'Brien) и вторым оператором (note=a=b), а также поля с
+    пробелами. Поле при этом не должно содержать скобок, кавычек и
+    ключевых слов, иначе это ошибка в составном условии.
+    """
+
+    @staticmethod
+    def parse(text: str) -> Predicate:
+        """Разбирает строку условия в дерево условия.
+
+        Args:
+            text: Строка условия, например "brand IN (apple, xiaomi) AND price>500".
+
+        Returns:
+            Корень дерева условия.
+
+        Raises:
+            ValueError: Если условие синтаксически некорректно.
+        """
+        try:
+            parser = _Parser(PredicateParser.tokenize(text), text)
+            predicate = parser.parse_or()
+            if parser.peek() is not None:
+                parser.fail()
+            return predicate
+        except ValueError:
+            legacy = PredicateParser._parse_legacy(text)
+            if legacy is None:
+                raise
+            return legacy
+
+    @staticmethod
+    def _parse_legacy(text: str) -> Optional[Predicate]:
+        """Разбирает условие одним сравнением, как до появления составных условий.
+
+        Returns:
+            Сравнение или None, если в строке нет оператора или поле похоже на
+            часть составного условия.
+        """
+        try:
+            field, operator_, _ = ExpressionParser.parse_expression(text)
+        except ValueError:
+            return None
+        words = field.upper().split()
+        if not field or any(char in field for char in '()\'"') or any(word in KEYWORDS for word in words):
+            return None
+        # Значение остается строкой, как у значений без кавычек в грамматике
+        return Comparison(field, operator_, text.split(operator_, 1)[1].strip())
+
+    @staticmethod
+    def tokenize(text: str) -> List[Tuple[str, str]]:
+        """Разбивает строку условия на лексемы (вид, текст).
+
+        Raises:
+            ValueError: Если в строке есть недопустимые символы.
+        """
+        tokens = []
+        position = 0
+        text = text.rstrip()
+        while position < len(text):
+            match = TOKEN_PATTERN.match(text, position)
+            if match is None:
+                raise ValueError(f"Некорректное условие фильтрации: {text}")
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind == 'word' and value.upper() in KEYWORDS:
+                kind, value = 'keyword', value.upper()
+            tokens.append((kind, value))
+            position = match.end()
+        return tokens
+
+
+class _Parser:
+    """Рекурсивный спуск по списку лексем."""
+
+    def __init__(self, tokens: List[Tuple[str, str]], text: str) -> None:
+        self.tokens = tokens
+        self.position = 0
+        self.text = text
+
+    def peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def accept(self, kind: str, value: Optional[str] = None) -> Optional[str]:
+        token = self.peek()
+        if token is not None and token[0] == kind and (value is None or token[1] == value):
+            self.position += 1
+            return token[1]
+        return None
+
+    def expect(self, kind: str, value: Optional[str] = None) -> str:
+        accepted = self.accept(kind, value)
+        if accepted is None:
+            self.fail()
+        return accepted
+
+    def fail(self) -> None:
+        raise ValueError(f"Некорректное условие фильтрации: {self.text}")
+
+    def parse_or(self) -> Predicate:
+        operands = [self.parse_and()]
+        while self.accept('keyword', 'OR'):
+            operands.append(self.parse_and())
+        return operands[0] if len(operands) == 1 else Or(operands)
+
+    def parse_and(self) -> Predicate:
+        operands = [self.parse_not()]
+        while self.accept('keyword', 'AND'):
+            operands.append(self.parse_not())
+        return operands[0] if len(operands) == 1 else And(operands)
+
+    def parse_not(self) -> Predicate:
+        if self.accept('keyword', 'NOT'):
+            return Not(self.parse_not())
+        if self.accept('punct', '('):
+            predicate = self.parse_or()
+            self.expect('punct', ')')
+            return predicate
+        return self.parse_comparison()
+
+    def parse_comparison(self) -> Predicate:
+        field = self.accept('string')
+        field = _unquote(field) if field is not None else self.expect('word')
+        operator_ = self.accept('operator')
+        if operator_ is not None:
+            return Comparison(field, operator_, self.parse_value(allow_empty=True))
+
+        negated = bool(self.accept('keyword', 'NOT'))
+        if self.accept('keyword', 'IN'):
+            self.expect('punct', '(')
+            values = [self.parse_value()]
+            while self.accept('punct', ','):
+                values.append(self.parse_value())
+            self.expect('punct', ')')
+            predicate: Predicate = InList(field, values)
+        elif self.accept('keyword', 'BETWEEN'):
+            low = self.parse_value()
+            self.expect('keyword', 'AND')
+            predicate = Between(field, low, self.parse_value())
+        elif self.accept('keyword', 'LIKE'):
+            predicate = Like(field, str(self.parse_value()))
+        else:
+            self.fail()
+        return Not(predicate) if negated else predicate
+
+    def parse_value(self, allow_empty: bool = False) -> Value:
+        quoted = self.accept('string')
+        if quoted is not None:
+            return _unquote(quoted)
+        words = []
+        while (word := self.accept('word')) is not None:
+            words.append(word)
+        if not words and not allow_empty:
+            self.fail()
+        # Значение без кавычек остается строкой: число из него получает
+        # преобразователь колонки (по схеме или с угадыванием числа)
+        return ' '.join(words)
+
+
+def _unquote(token: str) -> str:
+    """Снимает кавычки со строковой лексемы; удвоенная кавычка означает саму кавычку."""
+    quote = token[0]
+    return token[1:-1].replace(quote * 2, quote)
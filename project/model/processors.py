@@ -1,19 +1,46 @@
-from typing import Dict, List, Union, Tuple
+import heapq
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union, Tuple
+from project.model.accumulators import Accumulator, quantile_level, validate_aggregate
+from project.model.predicates import Predicate
+from project.model.row import compact_rows, record_type
+from project.model.schema import Schema
+from project.model.selection import P2Quantile, median, quantile
+from project.model.table import Table
 from project.model.util import convert_to_number_if_possible, ExpressionParser
 
+# Функция преобразования строкового значения ячейки
+Converter = Callable[[str], Union[int, float, str]]
+
+def _ignore_value(value: Optional[str]) -> int:
+    """Заменяет значение нулем там, где учитывается только количество строк."""
+    return 0
+
 class Aggregate:
     """Класс для выполнения агрегатных функций над данными."""
 
     @staticmethod
     def execute(
-        csv_obj: List[Dict[str, str]],
-        expression: Tuple[str, str, str]
+        csv_obj: Iterable[Dict[str, str]],
+        expression: Tuple[str, str, str],
+        schema: Optional[Schema] = None,
+        approximate: bool = False
     ) -> Union[int, float]:
         """Выполняет агрегатную функцию по заданному выражению.
 
+        min, max и avg обрабатывают данные за один проход и принимают любой
+        итерируемый объект, в том числе потоковый итератор строк. Для колоночной
+        таблицы агрегат вычисляется сразу над типизированной колонкой.
+
+        Кроме median поддерживаются квантили вида p50, p90, p99.9. Точные квантили
+        находятся выбором за линейное время; в приближенном режиме они оцениваются
+        потоково алгоритмом P² без хранения значений.
+
         Args:
             csv_obj: Данные для агрегации.
             expression: Кортеж (поле, оператор, тип_агрегации).
+            schema: Схема с типами колонок для преобразования значений без угадывания.
+            approximate: Оценивать median и квантили приближенно, в постоянной памяти.
 
         Returns:
             Результат агрегации.
@@ -22,12 +49,128 @@ class Aggregate:
             ValueError: Если тип агрегации неизвестен или данные строковые.
         """
         field, _, aggregator_type = expression
+        if isinstance(csv_obj, Table):
+            result = csv_obj.column(field).aggregate(aggregator_type)
+            return Aggregate.convert_float_to_int_if_necessary(result)
+        convert = schema.converter(field) if schema else convert_to_number_if_possible
         match aggregator_type:
-            case 'min': return Aggregate._agr_min(csv_obj, field)
-            case 'max': return Aggregate._agr_max(csv_obj, field)
-            case 'avg': return Aggregate._agr_avg(csv_obj, field)
-            case 'median': return Aggregate._agr_median(csv_obj, field)
-            case _: raise ValueError(f"Неизвестный тип агрегации: {aggregator_type}")
+            case 'min': return Aggregate._agr_min(csv_obj, field, convert)
+            case 'max': return Aggregate._agr_max(csv_obj, field, convert)
+            case 'avg': return Aggregate._agr_avg(csv_obj, field, convert)
+            case 'median' if not approximate: return Aggregate._agr_median(csv_obj, field, convert)
+            case 'sum' | 'count':
+                accumulator = Aggregate.accumulate(csv_obj, [expression], schema)[field]
+                return Aggregate.convert_float_to_int_if_necessary(accumulator.result(aggregator_type))
+        level = quantile_level(aggregator_type)
+        if level is None:
+            raise ValueError(f"Неизвестный тип агрегации: {aggregator_type}")
+        return Aggregate._agr_quantile(csv_obj, field, level, convert, approximate)
+
+    @staticmethod
+    def execute_many(
+        csv_obj: Iterable[Dict[str, str]],
+        expressions: List[Tuple[str, str, str]],
+        schema: Optional[Schema] = None,
+        approximate: bool = False,
+        where: Optional[Predicate] = None
+    ) -> Dict[str, List[Union[int, float]]]:
+        """Вычисляет несколько агрегатов за один проход по данным.
+
+        Для каждого поля заводится один общий накопитель: count, sum, min и max
+        считаются один раз и используются всеми агрегатами этого поля, а
+        значение ячейки преобразуется в число тоже один раз. Условие where
+        проверяется в том же цикле, без отдельного этапа фильтрации.
+
+        Args:
+            csv_obj: Данные для агрегации (список, потоковый итератор или колоночная таблица).
+            expressions: Список кортежей (поле, оператор, тип_агрегации).
+            schema: Схема с типами колонок.
+            approximate: Оценивать median и квантили приближенно, в постоянной памяти.
+            where: Условие отбора агрегируемых строк. None - все строки.
+
+        Returns:
+            Таблица из одной строки: {название агрегата: [значение]}. Если все
+            агрегаты относятся к одному полю, название - тип агрегации, иначе
+            "поле_тип".
+
+        Raises:
+            ValueError: Если тип агрегации неизвестен или данные строковые.
+        """
+        for _, _, aggregator_type in expressions:
+            validate_aggregate(aggregator_type)
+        if isinstance(csv_obj, Table):
+            if where is not None:
+                csv_obj = csv_obj.take(where.filter_indices(csv_obj, schema=schema))
+            values = [Aggregate.execute(csv_obj, expression) for expression in expressions]
+        else:
+            if where is not None:
+                csv_obj = filter(where.compile(schema), csv_obj)
+            accumulators = Aggregate.accumulate(csv_obj, expressions, schema, approximate)
+            values = [
+                Aggregate.convert_float_to_int_if_necessary(accumulators[field].result(aggregator_type))
+                for field, _, aggregator_type in expressions
+            ]
+        return Aggregate.result_table(expressions, values)
+
+    @staticmethod
+    def accumulate(
+        csv_obj: Iterable[Dict[str, str]],
+        expressions: List[Tuple[str, str, str]],
+        schema: Optional[Schema] = None,
+        approximate: bool = False
+    ) -> Dict[str, Accumulator]:
+        """Собирает накопители по полям агрегатов за один проход.
+
+        Args:
+            csv_obj: Данные для агрегации.
+            expressions: Список кортежей (поле, оператор, тип_агрегации).
+            schema: Схема с типами колонок.
+            approximate: Оценивать квантили потоково вместо хранения всех значений.
+
+        Returns:
+            Словарь {поле: накопитель}.
+
+        Raises:
+            ValueError: Если поле содержит строковые значения.
+        """
+        types_by_field: Dict[str, List[str]] = {}
+        for field, _, aggregator_type in expressions:
+            types_by_field.setdefault(field, []).append(aggregator_type)
+        accumulators = {
+            field: Accumulator.for_aggregates(types, approximate)
+            for field, types in types_by_field.items()
+        }
+        plan = [
+            (field, Aggregate.value_converter(field, types_by_field[field], schema), accumulator.add)
+            for field, accumulator in accumulators.items()
+        ]
+        for row in csv_obj:
+            for field, convert, add in plan:
+                add(convert(row.get(field)))
+        return accumulators
+
+    @staticmethod
+    def value_converter(field: str, aggregator_types: Iterable[str], schema: Optional[Schema]) -> Converter:
+        """Выбирает преобразование значений поля для накопителя.
+
+        Для count важно только количество строк, поэтому значения не
+        преобразуются и могут быть строковыми.
+        """
+        if all(aggregator_type == 'count' for aggregator_type in aggregator_types):
+            return _ignore_value
+        return schema.converter(field) if schema else convert_to_number_if_possible
+
+    @staticmethod
+    def result_table(
+        expressions: List[Tuple[str, str, str]],
+        values: List[Union[int, float]]
+    ) -> Dict[str, List[Union[int, float]]]:
+        """Формирует таблицу результатов агрегации из одной строки."""
+        qualified = len({field for field, _, _ in expressions}) > 1
+        return {
+            f"{field}_{aggregator_type}" if qualified else aggregator_type: [value]
+            for (field, _, aggregator_type), value in zip(expressions, values)
+        }
 
     @staticmethod
     def convert_float_to_int_if_necessary(value: Union[int, float]) -> Union[int, float]:
@@ -44,12 +187,17 @@ class Aggregate:
         return value
 
     @staticmethod
-    def _agr_min(csv_obj: List[Dict[str, str]], field: str) -> Union[int, float]:
+    def _agr_min(
+        csv_obj: Iterable[Dict[str, str]],
+        field: str,
+        convert: Converter = convert_to_number_if_possible
+    ) -> Union[int, float]:
         """Вычисляет минимальное значение в указанном поле.
 
         Args:
             csv_obj: Данные для обработки.
             field: Поле для поиска минимума.
+            convert: Функция преобразования значения поля.
 
         Returns:
             Минимальное значение.
@@ -59,19 +207,24 @@ class Aggregate:
         """
         min_value = float('inf')
         for row in csv_obj:
-            actual_value = convert_to_number_if_possible(row.get(field))
+            actual_value = convert(row.get(field))
             if isinstance(actual_value, str):
                 raise ValueError("Агрегация для строк не предусмотрена")
             min_value = min(min_value, actual_value)
         return Aggregate.convert_float_to_int_if_necessary(min_value)
 
     @staticmethod
-    def _agr_max(csv_obj: List[Dict[str, str]], field: str) -> Union[int, float]:
+    def _agr_max(
+        csv_obj: Iterable[Dict[str, str]],
+        field: str,
+        convert: Converter = convert_to_number_if_possible
+    ) -> Union[int, float]:
         """Вычисляет максимальное значение в указанном поле.
 
         Args:
             csv_obj: Данные для обработки.
             field: Поле для поиска максимума.
+            convert: Функция преобразования значения поля.
 
         Returns:
             Максимальное значение.
@@ -81,7 +234,7 @@ class Aggregate:
         """
         max_value = float('-inf')
         for row in csv_obj:
-            actual_value = convert_to_number_if_possible(row.get(field))
+            actual_value = convert(row.get(field))
             if isinstance(actual_value, str):
                 raise ValueError("Агрегация для строк не предусмотрена")
             if actual_value > max_value:
@@ -89,12 +242,17 @@ class Aggregate:
         return Aggregate.convert_float_to_int_if_necessary(max_value)
 
     @staticmethod
-    def _agr_avg(csv_obj: List[Dict[str, str]], field: str) -> Union[int, float]:
+    def _agr_avg(
+        csv_obj: Iterable[Dict[str, str]],
+        field: str,
+        convert: Converter = convert_to_number_if_possible
+    ) -> Union[int, float]:
         """Вычисляет среднее значение в указанном поле.
 
         Args:
             csv_obj: Данные для обработки.
             field: Поле для вычисления среднего.
+            convert: Функция преобразования значения поля.
 
         Returns:
             Среднее значение.
@@ -102,29 +260,38 @@ class Aggregate:
         Raises:
             ValueError: Если поле содержит строковые значения.
         """
-        if not csv_obj:
-            return 0
-
         total = 0
+        count = 0
         for row in csv_obj:
-            actual_value = convert_to_number_if_possible(row.get(field))
+            actual_value = convert(row.get(field))
             if isinstance(actual_value, str):
                 raise ValueError("Агрегация для строк не предусмотрена")
             total += actual_value
+            count += 1
 
-        avg = total / len(csv_obj)
+        if not count:
+            return 0
+
+        avg = total / count
         return Aggregate.convert_float_to_int_if_necessary(avg)
 
     @staticmethod
-    def _agr_median(csv_obj: List[Dict[str, str]], field: str) -> Union[int, float]:
+    def _agr_median(
+        csv_obj: Iterable[Dict[str, str]],
+        field: str,
+        convert: Converter = convert_to_number_if_possible
+    ) -> Union[int, float]:
         """Вычисляет медиану значений в указанном поле.
 
         Медиана - среднее значение в отсортированном списке. Для четного числа элементов -
-        среднее двух центральных элементов.
+        среднее двух центральных элементов. В отличие от остальных агрегатов требует
+        хранения всех значений поля в памяти, но не их сортировки: центральные
+        элементы находятся выбором за линейное время.
 
         Args:
             csv_obj: Данные для обработки.
             field: Поле для вычисления медианы.
+            convert: Функция преобразования значения поля.
 
         Returns:
             Медианное значение.
@@ -134,22 +301,49 @@ class Aggregate:
         """
         values = []
         for row in csv_obj:
-            actual_value = convert_to_number_if_possible(row.get(field))
+            actual_value = convert(row.get(field))
             if isinstance(actual_value, str):
                 raise ValueError("Агрегация для строк не предусмотрена")
             values.append(actual_value)
 
-        if not values:
-            return 0
+        return Aggregate.convert_float_to_int_if_necessary(median(values))
 
-        values.sort()
-        n = len(values)
-        if n % 2 == 1:
-            median = values[n//2]
-        else:
-            median = (values[n//2 - 1] + values[n//2]) / 2
+    @staticmethod
+    def _agr_quantile(
+        csv_obj: Iterable[Dict[str, str]],
+        field: str,
+        level: float,
+        convert: Converter = convert_to_number_if_possible,
+        approximate: bool = False
+    ) -> Union[int, float]:
+        """Вычисляет квантиль значений в указанном поле.
 
-        return Aggregate.convert_float_to_int_if_necessary(median)
+        Args:
+            csv_obj: Данные для обработки.
+            field: Поле для вычисления квантиля.
+            level: Уровень квантиля от 0 до 1.
+            convert: Функция преобразования значения поля.
+            approximate: Оценить квантиль потоково (P²) вместо хранения всех значений.
+
+        Returns:
+            Значение квантиля.
+
+        Raises:
+            ValueError: Если поле содержит строковые значения.
+        """
+        estimator = P2Quantile(level) if approximate else None
+        values = []
+        for row in csv_obj:
+            actual_value = convert(row.get(field))
+            if isinstance(actual_value, str):
+                raise ValueError("Агрегация для строк не предусмотрена")
+            if estimator:
+                estimator.add(actual_value)
+            else:
+                values.append(actual_value)
+
+        result = estimator.result() if estimator else quantile(values, level)
+        return Aggregate.convert_float_to_int_if_necessary(result)
 
 
 class Where:
@@ -157,68 +351,48 @@ class Where:
 
     @staticmethod
     def execute(
-        csv_obj: List[Dict[str, str]],
-        expression: Tuple[str, str, Union[int, float, str]]
-    ) -> List[Dict[str, str]]:
+        csv_obj: Union[Iterable[Dict[str, str]], Table],
+        expression: Union[Tuple[str, str, Union[int, float, str]], Predicate],
+        schema: Optional[Schema] = None
+    ) -> Union[List[Dict[str, str]], Table]:
         """Фильтрует данные по заданному условию.
 
+        Колоночная таблица фильтруется целиком по колонкам, результатом
+        также будет таблица.
+
         Args:
             csv_obj: Данные для фильтрации.
-            expression: Кортеж (поле, оператор, значение) для фильтрации.
+            expression: Кортеж (поле, оператор, значение) или составное условие.
+            schema: Схема с типами колонок для преобразования значений без угадывания.
 
         Returns:
             Отфильтрованные данные.
         """
-
-        field, operator, expected_value = expression
-        filtered_rows = []
-
-        expected_value = convert_to_number_if_possible(expected_value)
-        for row in csv_obj:
-            field_value = row.get(field)
-            if field_value is None:
-                continue
-
-            field_value = convert_to_number_if_possible(field_value)
-
-            # Нормализация строк для сравнения
-            if isinstance(field_value, str) and isinstance(expected_value, str):
-                field_value = field_value.strip().lower()
-                expected_value = expected_value.strip().lower()
-
-            if Where._compare_values(field_value, operator, expected_value):
-                filtered_rows.append(row)
-
-        return filtered_rows
+        if isinstance(csv_obj, Table):
+            return csv_obj.take(Predicate.of(expression).filter_indices(csv_obj, schema=schema))
+        return list(Where.iter_filter(csv_obj, expression, schema))
 
     @staticmethod
-    def _compare_values(
-        field_value: Union[int, float, str],
-        operator: str,
-        expected_value: Union[int, float, str]
-    ) -> bool:
-        """Сравнивает значения согласно оператору.
+    def iter_filter(
+        csv_obj: Iterable[Dict[str, str]],
+        expression: Union[Tuple[str, str, Union[int, float, str]], Predicate],
+        schema: Optional[Schema] = None
+    ) -> Iterator[Dict[str, str]]:
+        """Лениво фильтрует данные: подходящие строки выдаются по мере чтения.
 
-        Args:
-            field_value: Значение из данных.
-            operator: Оператор сравнения.
-            expected_value: Ожидаемое значение.
+        Условие компилируется один раз в функцию проверки строки с заранее
+        нормализованными константами.
 
-        Returns:
-            Результат сравнения (True/False).
+        Args:
+            csv_obj: Данные для фильтрации (список или потоковый итератор).
+            expression: Кортеж (поле, оператор, значение) или составное условие.
+            schema: Схема с типами колонок для преобразования значений без угадывания.
 
-        Raises:
-            ValueError: Если оператор не поддерживается.
+        Yields:
+            Строки, удовлетворяющие условию.
         """
-    
-        match operator:
-            case '=': return field_value == expected_value
-            case '!=': return field_value != expected_value
-            case '>': return field_value > expected_value
-            case '<': return field_value < expected_value
-            case '>=': return field_value >= expected_value
-            case '<=': return field_value <= expected_value
-            case _: raise ValueError(f"Unsupported operator: {operator}")
+        test = Predicate.of(expression).compile(schema)
+        yield from filter(test, csv_obj)
 
 
 class OrderBy:
@@ -226,14 +400,27 @@ class OrderBy:
 
     @staticmethod
     def execute(
-        data: List[Dict[str, str]],
-        expression: Tuple[str, str, str]
-    ) -> List[Dict[str, str]]:
+        data: Union[Iterable[Dict[str, str]], Table],
+        expression: Tuple[str, str, str],
+        schema: Optional[Schema] = None,
+        limit: Optional[int] = None
+    ) -> Union[List[Dict[str, str]], Table]:
         """Сортирует данные по заданному полю в указанном направлении.
 
+        Сортировке нужен весь набор строк, поэтому итератор на входе
+        материализуется в список; повторяющиеся значения колонок в нем
+        хранятся одним объектом (compact_rows). Колоночная таблица
+        сортируется по индексам ключевой колонки и остается таблицей.
+
+        Если задан limit, возвращаются только первые limit строк, а вместо полной
+        сортировки используется ограниченная куча: O(n log k) по времени и O(k)
+        по памяти, в том числе для потокового итератора.
+
         Args:
             data: Данные для сортировки.
             expression: Кортеж (поле, оператор, направление).
+            schema: Схема с типами колонок для преобразования значений без угадывания.
+            limit: Количество первых строк результата. None - все строки.
 
         Returns:
             Отсортированные данные.
@@ -246,16 +433,147 @@ class OrderBy:
         if direction not in ('asc', 'desc'):
             raise ValueError("Направление сортировки должно быть 'asc' или 'desc'")
 
-        sorted_data = data.copy()
+        Limit.validate(limit)
+
+        if isinstance(data, Table):
+            return data.take(data.argsort(field, descending=(direction == 'desc'), limit=limit))
+
+        if limit is not None:
+            # Результат совпадает с sorted(...)[:limit], включая порядок равных ключей
+            select = heapq.nlargest if direction == 'desc' else heapq.nsmallest
+            return select(limit, data, key=OrderBy.sort_key(field, schema))
+
+        return sorted(
+            compact_rows(data),
+            key=OrderBy.sort_key(field, schema),
+            reverse=(direction == 'desc')
+        )
+
+    @staticmethod
+    def sort_key(
+        field: str,
+        schema: Optional[Schema] = None
+    ) -> Callable[[Dict[str, str]], Union[int, float, str]]:
+        """Создает функцию получения ключа сортировки строки.
+
+        Args:
+            field: Поле сортировки.
+            schema: Схема с типами колонок.
+
+        Returns:
+            Функция, возвращающая значение поля, приведенное к типу колонки.
+        """
+        convert = schema.converter(field) if schema else convert_to_number_if_possible
 
         def get_key(row: Dict[str, str]) -> Union[int, float, str]:
             """Вспомогательная функция для получения значения ключа сортировки."""
             value = row.get(field)
-            return convert_to_number_if_possible(value)
+            return convert(value)
 
-        sorted_data.sort(
-            key=get_key,
-            reverse=(direction == 'desc')
-        )
+        return get_key
+
+
+class Select:
+    """Класс для выбора колонок результата."""
+
+    @staticmethod
+    def execute(
+        data: Union[Iterable[Dict[str, str]], Table],
+        fields: List[str]
+    ) -> Union[List[Dict[str, str]], Table]:
+        """Оставляет в данных только указанные колонки в заданном порядке.
+
+        Args:
+            data: Данные (список, потоковый итератор или колоночная таблица).
+            fields: Колонки результата.
+
+        Returns:
+            Данные только с указанными колонками.
+
+        Raises:
+            ValueError: Если колонки нет в колоночной таблице.
+        """
+        if isinstance(data, Table):
+            return data.select(fields)
+        return list(Select.iter_project(data, fields))
+
+    @staticmethod
+    def iter_project(data: Iterable[Dict[str, str]], fields: List[str]) -> Iterator[Dict[str, str]]:
+        """Лениво оставляет в строках только указанные колонки.
 
-        return sorted_data
+        Args:
+            data: Данные (список или потоковый итератор).
+            fields: Колонки результата.
+
+        Yields:
+            Записи с колонками fields в заданном порядке.
+        """
+        make = record_type(tuple(fields))
+        for row in data:
+            yield make(map(row.get, fields))
+
+
+class Limit:
+    """Класс для ограничения количества строк результата."""
+
+    @staticmethod
+    def execute(
+        data: Union[Iterable[Dict[str, str]], Table],
+        limit: int
+    ) -> Union[List[Dict[str, str]], Table]:
+        """Возвращает первые limit строк данных.
+
+        Args:
+            data: Данные (список, потоковый итератор или колоночная таблица).
+            limit: Количество строк.
+
+        Returns:
+            Первые строки данных.
+
+        Raises:
+            ValueError: Если лимит отрицательный.
+        """
+        Limit.validate(limit)
+        if isinstance(data, Table):
+            return data.take(range(min(limit, len(data))))
+        return list(Limit.iter_limit(data, limit))
+
+    @staticmethod
+    def execute_columns(columns: Dict[str, List[Any]], limit: Optional[int]) -> Dict[str, List[Any]]:
+        """Оставляет первые limit строк результата, разложенного по колонкам.
+
+        Args:
+            columns: Результат в виде {колонка: [значения]}.
+            limit: Количество строк. None - без ограничения.
+
+        Returns:
+            Первые строки результата.
+        """
+        Limit.validate(limit)
+        if limit is None:
+            return columns
+        return {name: values[:limit] for name, values in columns.items()}
+
+    @staticmethod
+    def iter_limit(data: Iterable[Dict[str, str]], limit: int) -> Iterator[Dict[str, str]]:
+        """Лениво выдает первые limit строк; остаток источника не читается.
+
+        Args:
+            data: Данные (список или потоковый итератор).
+            limit: Количество строк.
+
+        Yields:
+            Первые строки данных.
+        """
+        Limit.validate(limit)
+        yield from islice(data, limit)
+
+    @staticmethod
+    def validate(limit: Optional[int]) -> None:
+        """Проверяет значение лимита.
+
+        Raises:
+            ValueError: Если лимит отрицательный.
+        """
+        if limit is not None and limit < 0:
+            raise ValueError("Лимит строк должен быть неотрицательным")
@@ -0,0 +1,193 @@
+import time
+import tracemalloc
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from project.model.table import Table
+
+# Количество строк, получаемых ленивым этапом за один замер
+PROFILE_BATCH = 1024
+
+
+class StageProfile:
+    """Накопленные показатели одного этапа конвейера."""
+    __slots__ = ('name', 'wall', 'cpu', 'child_wall', 'child_cpu', 'rows', 'bytes_read', 'peak_memory')
+
+    def __init__(self, name: str, bytes_read: Optional[int] = None) -> None:
+        self.name = name
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.child_wall = 0.0
+        self.child_cpu = 0.0
+        self.rows: Optional[int] = None
+        self.bytes_read = bytes_read
+        self.peak_memory = 0
+
+
+class Profiler:
+    """Замер этапов конвейера: время, строки и память.
+
+    Этапы потокового конвейера - ленивые итераторы, вложенные друг в друга:
+    каждый этап получает строки, запрашивая их у предыдущего. Поэтому время
+    этапа считается собственным: из времени внутри этапа вычитается время,
+    проведенное в вызванных им этапах. Пиковая память (tracemalloc)
+    приписывается этапу, который выполнялся в момент выделения.
+
+    Выключенный профилировщик возвращает данные без обертки и ничего не
+    замеряет, поэтому конвейер вызывает его без проверок.
+    """
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = True) -> None:
+        """
+        Args:
+            enabled: Замерять этапы. False - профилировщик ничего не делает.
+            trace_memory: Отслеживать выделения памяти через tracemalloc
+                (замедляет выполнение в несколько раз).
+        """
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.stages: List[StageProfile] = []
+        self._stack: List[StageProfile] = []
+        self._entered: List[tuple] = []
+        self._started: Optional[tuple] = None
+        self._total: Optional[tuple] = None
+
+    def start(self) -> None:
+        """Начинает замер всего запроса."""
+        if not self.enabled:
+            return
+        if self.trace_memory:
+            tracemalloc.start()
+        self._started = (time.perf_counter(), time.process_time())
+
+    def stop(self) -> None:
+        """Завершает замер всего запроса."""
+        if not self.enabled or self._started is None:
+            return
+        peak = 0
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        peak = max([peak] + [stage.peak_memory for stage in self.stages])
+        self._total = (time.perf_counter() - self._started[0], time.process_time() - self._started[1], peak)
+
+    def iterate(self, name: str, rows: Iterable[Any], bytes_read: Optional[int] = None) -> Iterable[Any]:
+        """Оборачивает ленивый этап: замеряется получение строк пачками по PROFILE_BATCH.
+
+        Args:
+            name: Название этапа.
+            rows: Итератор строк этапа.
+            bytes_read: Количество байтов, читаемых этапом из файла.
+
+        Returns:
+            Итератор тех же строк.
+        """
+        if not self.enabled:
+            return rows
+        stage = self._add(name, bytes_read)
+        stage.rows = 0
+        return self._iterate(stage, iter(rows))
+
+    def call(self, name: str, function: Callable[..., Any], *args: Any,
+             bytes_read: Optional[int] = None, **kwargs: Any) -> Any:
+        """Выполняет и замеряет этап, вычисляющий результат целиком.
+
+        Args:
+            name: Название этапа.
+            function: Функция этапа.
+            bytes_read: Количество байтов, читаемых этапом из файла.
+
+        Returns:
+            Результат функции.
+        """
+        if not self.enabled:
+            return function(*args, **kwargs)
+        stage = self._add(name, bytes_read)
+        self._enter(stage)
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            self._exit(stage)
+        stage.rows = _result_rows(result)
+        return result
+
+    def report(self) -> Dict[str, Any]:
+        """Возвращает показатели этапов и всего запроса.
+
+        Входные строки этапа - выходные строки предыдущего этапа.
+
+        Returns:
+            Словарь {'stages': [...], 'total': {...}}; время в секундах, память в байтах.
+        """
+        stages = []
+        rows_in = None
+        for stage in self.stages:
+            stages.append({
+                'stage': stage.name,
+                'wall': stage.wall - stage.child_wall,
+                'cpu': stage.cpu - stage.child_cpu,
+                'rows_in': rows_in,
+                'rows_out': stage.rows,
+                'bytes_read': stage.bytes_read,
+                'peak_memory': stage.peak_memory if self.trace_memory else None,
+            })
+            rows_in = stage.rows if stage.rows is not None else rows_in
+        wall, cpu, peak = self._total or (None, None, None)
+        return {
+            'stages': stages,
+            'total': {'wall': wall, 'cpu': cpu, 'peak_memory': peak if self.trace_memory else None},
+        }
+
+    def _add(self, name: str, bytes_read: Optional[int]) -> StageProfile:
+        stage = StageProfile(name, bytes_read)
+        self.stages.append(stage)
+        return stage
+
+    def _iterate(self, stage: StageProfile, rows: Iterator[Any]) -> Iterator[Any]:
+        while True:
+            # Строки запрашиваются пачками: замер каждой строки стоил бы дороже самих этапов
+            self._enter(stage)
+            try:
+                batch = list(islice(rows, PROFILE_BATCH))
+            finally:
+                self._exit(stage)
+            if not batch:
+                return
+            stage.rows += len(batch)
+            yield from batch
+
+    def _enter(self, stage: StageProfile) -> None:
+        """Начинает интервал выполнения этапа; память до него приписывается вызвавшему этапу."""
+        if self.trace_memory:
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak_memory = max(parent.peak_memory, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self._stack.append(stage)
+        self._entered.append((time.perf_counter(), time.process_time()))
+
+    def _exit(self, stage: StageProfile) -> None:
+        """Завершает интервал этапа и переносит его время во вложенное время вызвавшего этапа."""
+        wall_start, cpu_start = self._entered.pop()
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        self._stack.pop()
+        stage.wall += wall
+        stage.cpu += cpu
+        if self._stack:
+            self._stack[-1].child_wall += wall
+            self._stack[-1].child_cpu += cpu
+        if self.trace_memory:
+            stage.peak_memory = max(stage.peak_memory, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+
+
+def _result_rows(result: Any) -> Optional[int]:
+    """Количество строк результата этапа или None, если его нельзя определить без чтения."""
+    if isinstance(result, Table):
+        return len(result)
+    if isinstance(result, dict):
+        return max((len(values) for values in result.values()), default=0)
+    if isinstance(result, list):
+        return len(result)
+    return None
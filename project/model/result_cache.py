@@ -0,0 +1,272 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from project.model.predicates import Predicate
+from project.model.processors import Where
+from project.model.schema import Schema
+from project.model.table import Table
+from project.model.table_cache import evict_least_recent
+
+Result = Union[List[Dict[str, Any]], Dict[str, List[Any]]]
+
+# Количество результатов и отфильтрованных наборов, хранимых в памяти
+DEFAULT_ENTRIES = 256
+
+# Размер дискового хранилища результатов по умолчанию
+DEFAULT_RESULT_CACHE_SIZE = 256 << 20
+
+# Результаты и отфильтрованные наборы строк большего размера не кэшируются
+MAX_CACHED_ROWS = 100_000
+
+# Расширение файлов результатов на диске
+RESULT_SUFFIX = '.wmresult'
+
+
+def file_source(file_path: str) -> Tuple[str, int, int]:
+    """Идентичность файла для ключей кэша: абсолютный путь, размер и время изменения."""
+    stat = os.stat(file_path)
+    return os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns
+
+
+class ResultCache:
+    """Кэш результатов запросов.
+
+    Ключ результата - отпечаток нормализованного запроса (разобранных
+    выражений) и идентичности файла, поэтому изменение файла делает старые
+    записи недостижимыми. Результаты хранятся в памяти процесса с вытеснением
+    LRU и, если задан каталог, на диске с ограничением размера и времени жизни.
+
+    Кроме готовых результатов в памяти хранятся отфильтрованные наборы строк
+    (индексы строк для колоночной таблицы): если новое условие уже старого
+    (price>500 и price>300), фильтруется сохраненный набор, а не весь файл.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_ENTRIES,
+        cache_dir: Optional[str] = None,
+        max_size: int = DEFAULT_RESULT_CACHE_SIZE,
+        ttl: Optional[float] = None,
+        max_rows: int = MAX_CACHED_ROWS
+    ) -> None:
+        """
+        Args:
+            max_entries: Максимальное количество записей каждого вида в памяти.
+            cache_dir: Каталог дискового хранилища результатов. None - только память.
+            max_size: Максимальный суммарный размер файлов результатов в байтах.
+            ttl: Время жизни записи в секундах. None - без ограничения.
+            max_rows: Максимальное количество строк кэшируемого результата или набора.
+
+        Raises:
+            ValueError: Если параметры некорректны.
+        """
+        if max_entries < 1 or max_rows < 0 or (ttl is not None and ttl <= 0):
+            raise ValueError("Некорректные параметры кэша результатов")
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._results: 'OrderedDict[str, Tuple[float, Result]]' = OrderedDict()
+        self._filters: 'OrderedDict[Tuple[Any, ...], Tuple[float, Predicate, Optional[Collection[str]], Any]]' = \
+            OrderedDict()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def fingerprint(file_path: Union[str, Sequence[str]], query: Dict[str, Any]) -> str:
+        """Вычисляет ключ результата запроса к файлу.
+
+        Args:
+            file_path: Путь к CSV-файлу или список путей к файлам-шардам.
+            query: Нормализованный запрос (сериализуемый в JSON).
+
+        Returns:
+            Шестнадцатеричный отпечаток.
+        """
+        file_paths = [file_path] if isinstance(file_path, str) else file_path
+        payload = json.dumps([[file_source(path) for path in file_paths], query], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+    def get(self, key: str) -> Optional[Result]:
+        """Возвращает результат из памяти или с диска.
+
+        Returns:
+            Результат или None, если записи нет или ее время жизни истекло.
+        """
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is not None:
+                if self._alive(entry[0]):
+                    self._results.move_to_end(key)
+                    return entry[1]
+                del self._results[key]
+        if not self.cache_dir:
+            return None
+        path = self._entry_path(key)
+        try:
+            with open(path, mode='rb') as entry_file:
+                created, result = pickle.load(entry_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            # Поврежденная запись считается отсутствующей
+            return None
+        if not self._alive(created):
+            _remove(path)
+            return None
+        # Время доступа к записи - основа вытеснения LRU
+        os.utime(path)
+        self._remember(key, created, result)
+        return result
+
+    def put(self, key: str, result: Result) -> None:
+        """Сохраняет результат, если он не больше max_rows строк."""
+        if _result_rows(result) > self.max_rows:
+            return
+        created = time.time()
+        self._remember(key, created, result)
+        if not self.cache_dir:
+            return
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, mode='wb') as entry_file:
+                pickle.dump((created, result), entry_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self._entry_path(key))
+        except BaseException:
+            _remove(temp_path)
+            raise
+        evict_least_recent(self.cache_dir, RESULT_SUFFIX, self.max_size)
+
+    def filter(
+        self,
+        data: Union[Iterable[Dict[str, str]], Table],
+        predicate: Predicate,
+        file_path: str,
+        schema: Optional[Schema] = None,
+        fields: Optional[Collection[str]] = None
+    ) -> Union[Iterator[Dict[str, str]], Table]:
+        """Фильтрует данные файла, используя сохраненные наборы более широких условий.
+
+        Если сохранен набор условия, из которого следует predicate, фильтруется
+        он; иначе фильтруются все данные. Полученный набор сохраняется для
+        следующих запросов (строки - только если поток прочитан до конца).
+
+        Args:
+            data: Данные файла: потоковый итератор строк или колоночная таблица.
+            predicate: Условие фильтрации.
+            file_path: Путь к CSV-файлу, из которого получены данные.
+            schema: Схема с типами колонок.
+            fields: Поля, прочитанные в строки data. None - все поля.
+
+        Returns:
+            Отфильтрованные данные того же вида, что и у Where.
+        """
+        source = file_source(file_path)
+        if isinstance(data, Table):
+            kinds = Schema({name: column.kind for name, column in data.columns.items()}, data.column_names)
+            candidates = self._find_filter(source, True, predicate, kinds, None)
+            indices = predicate.filter_indices(data, candidates, schema)
+            self._remember_filter(source, True, predicate, None, indices)
+            return data.take(indices)
+        rows = self._find_filter(source, False, predicate, schema, fields)
+        filtered = Where.iter_filter(data if rows is None else rows, predicate, schema)
+        return self._capture(filtered, lambda buffer: self._remember_filter(source, False, predicate, fields, buffer))
+
+    def _find_filter(
+        self,
+        source: Tuple[str, int, int],
+        columnar: bool,
+        predicate: Predicate,
+        schema: Optional[Schema],
+        fields: Optional[Collection[str]]
+    ) -> Any:
+        """Находит наименьший сохраненный набор, из условия которого следует predicate."""
+        best = None
+        with self._lock:
+            entries = list(self._filters.items())
+        for key, (created, cached_predicate, cached_fields, data) in entries:
+            if key[:2] != (source, columnar) or not self._alive(created):
+                continue
+            # В строках набора должны быть все поля, нужные запросу
+            if cached_fields is not None and (fields is None or not set(fields) <= set(cached_fields)):
+                continue
+            if (best is None or len(data) < len(best[1])) and predicate.implies(cached_predicate, schema):
+                best = (key, data)
+        if best is None:
+            return None
+        with self._lock:
+            if best[0] in self._filters:
+                self._filters.move_to_end(best[0])
+        return best[1]
+
+    def _remember_filter(
+        self,
+        source: Tuple[str, int, int],
+        columnar: bool,
+        predicate: Predicate,
+        fields: Optional[Collection[str]],
+        data: Sequence[Any]
+    ) -> None:
+        """Сохраняет отфильтрованный набор в памяти."""
+        key = (source, columnar, predicate.key(), None if fields is None else tuple(sorted(fields)))
+        with self._lock:
+            self._filters[key] = (time.time(), predicate, fields, data)
+            self._filters.move_to_end(key)
+            while len(self._filters) > self.max_entries:
+                self._filters.popitem(last=False)
+
+    def _capture(
+        self,
+        rows: Iterable[Dict[str, str]],
+        store: Callable[[List[Dict[str, str]]], None]
+    ) -> Iterator[Dict[str, str]]:
+        """Выдает строки, запоминая их; после полного чтения не больше max_rows строк сохраняет."""
+        buffer: Optional[List[Dict[str, str]]] = []
+        for row in rows:
+            if buffer is not None:
+                buffer.append(row)
+                if len(buffer) > self.max_rows:
+                    buffer = None
+            yield row
+        if buffer is not None:
+            store(buffer)
+
+    def _remember(self, key: str, created: float, result: Result) -> None:
+        """Сохраняет результат в памяти, вытесняя давно не использованные."""
+        with self._lock:
+            self._results[key] = (created, result)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def _alive(self, created: float) -> bool:
+        """Проверяет, что время жизни записи не истекло."""
+        return self.ttl is None or time.time() - created < self.ttl
+
+    def _entry_path(self, key: str) -> str:
+        """Путь к файлу результата."""
+        return os.path.join(self.cache_dir, key + RESULT_SUFFIX)
+
+
+def _result_rows(result: Result) -> int:
+    """Количество строк результата: список строк или таблица {колонка: значения}."""
+    if isinstance(result, dict):
+        return max((len(values) for values in result.values()), default=0)
+    return len(result)
+
+
+def _remove(path: str) -> None:
+    """Удаляет файл, если он существует."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,156 @@
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Количество различных значений колонки, которые compact_rows заменяет общими объектами
+SHARED_MAX_DISTINCT = 1 << 16
+
+
+class Record(tuple):
+    """Строка CSV: значения хранятся кортежем, названия колонок - общие для всех строк файла.
+
+    Словарь на каждую строку хранит ключи и хэш-таблицу заново; запись хранит
+    только ссылки на значения, а заголовок и позиции колонок разделяют все
+    записи одного типа (record_type). Запись читается как словарь: get, [],
+    in, keys, items и итерация по названиям колонок, поэтому обработчики
+    работают с ней так же, как со строкой csv.DictReader. В словарь запись
+    превращается только при выводе.
+    """
+    __slots__ = ()
+    fields: Tuple[str, ...] = ()
+    positions: Dict[str, int] = {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        position = self.positions.get(key)
+        return default if position is None else tuple.__getitem__(self, position)
+
+    def __getitem__(self, key: str) -> Any:
+        return tuple.__getitem__(self, self.positions[key])
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.fields)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.fields
+
+    def values(self) -> Tuple[Any, ...]:
+        return tuple.__getitem__(self, slice(None))
+
+    def items(self) -> Tuple[Tuple[str, Any], ...]:
+        return tuple(zip(self.fields, self.values()))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Record):
+            return self.fields == other.fields and tuple.__eq__(self, other)
+        if isinstance(other, Mapping):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    def __ne__(self, other: object) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def __reduce__(self) -> tuple:
+        # Тип записи создается динамически, поэтому сохраняются заголовок и значения
+        return make_record, (self.fields, self.values())
+
+
+Mapping.register(Record)
+
+
+@lru_cache(maxsize=256)
+def record_type(fields: Tuple[str, ...]) -> type:
+    """Возвращает тип записей с указанными колонками; для одного заголовка - один и тот же тип.
+
+    Args:
+        fields: Названия колонок в порядке значений записи.
+
+    Returns:
+        Подкласс Record; запись создается вызовом типа с последовательностью значений.
+    """
+    positions = {name: position for position, name in enumerate(fields)}
+    return type('Record', (Record,), {'__slots__': (), 'fields': fields, 'positions': positions})
+
+
+def make_record(fields: Sequence[str], values: Iterable[Any]) -> Record:
+    """Создает запись по названиям колонок и значениям."""
+    return record_type(tuple(fields))(values)
+
+
+class _SharedValues(dict):
+    """Встреченные значения колонки: повторное значение заменяется первым таким объектом."""
+
+    def __init__(self, max_distinct: int) -> None:
+        super().__init__()
+        self.max_distinct = max_distinct
+
+    def __missing__(self, value: Any) -> Any:
+        # Колонка с большим числом различных значений дальше не запоминается
+        if len(self) < self.max_distinct:
+            self[value] = value
+        return value
+
+
+def compact_rows(rows: Iterable[Any], max_distinct: int = SHARED_MAX_DISTINCT) -> Iterator[Any]:
+    """Выдает записи, в которых одинаковые значения колонки - один общий объект.
+
+    Нужна там, где строки накапливаются в памяти (сортировка): значения колонок
+    с небольшим числом различных значений (бренд, рейтинг) хранятся по одному
+    объекту на значение, а не на строку. Строки, которые не являются
+    записями, выдаются без изменений.
+
+    Args:
+        rows: Строки (записи или словари).
+        max_distinct: Количество различных значений, запоминаемых для колонки.
+
+    Yields:
+        Записи с общими объектами повторяющихся значений.
+    """
+    current = None
+    shared: list = []
+    lookup = dict.__getitem__
+    for row in rows:
+        if type(row) is not current:
+            if not isinstance(row, Record):
+                yield row
+                continue
+            current = type(row)
+            shared = [_SharedValues(max_distinct) for _ in current.fields]
+        yield current(map(lookup, shared, tuple.__iter__(row)))
+
+
+def pack_rows(rows: List[Any]) -> Tuple[Optional[Tuple[str, ...]], List[Any]]:
+    """Готовит порцию строк к сохранению через pickle.
+
+    Каждая запись сохранялась бы отдельным вызовом восстановления, поэтому
+    порция записей одного типа сохраняется как заголовок и кортежи значений:
+    так pickle работает вдвое быстрее.
+
+    Args:
+        rows: Порция строк (записи или словари).
+
+    Returns:
+        Пара (заголовок, кортежи значений) или (None, rows), если строки разнотипны.
+    """
+    current = type(rows[0]) if rows else None
+    if current is None or not issubclass(current, Record) or any(type(row) is not current for row in rows):
+        return None, rows
+    values = tuple.__getitem__
+    everything = slice(None)
+    return current.fields, [values(row, everything) for row in rows]
+
+
+def unpack_rows(packed: Tuple[Optional[Tuple[str, ...]], List[Any]]) -> List[Any]:
+    """Восстанавливает порцию строк, подготовленную pack_rows."""
+    fields, rows = packed
+    if fields is None:
+        return rows
+    return list(map(record_type(fields), rows))
@@ -0,0 +1,200 @@
+from typing import Callable, Dict, Iterable, Optional, Union
+
+from project.model.util import convert_to_number_if_possible
+
+# Количество строк, по которым определяются типы колонок
+SAMPLE_SIZE = 1000
+
+# Поддерживаемые типы колонок
+COLUMN_TYPES = ('int', 'float', 'str')
+
+
+def infer_column_type(values: Iterable[str]) -> str:
+    """Определяет тип колонки по ее значениям.
+
+    Проверка идет от самого узкого типа к самому широкому и не возвращается
+    назад, поэтому исключение при разборе возникает не более двух раз на колонку.
+
+    Args:
+        values: Строковые значения колонки.
+
+    Returns:
+        'int', если все значения целые, 'float', если все числовые, иначе 'str'.
+    """
+    column_type = 'int'
+    for value in values:
+        if column_type == 'int':
+            try:
+                int(value)
+                continue
+            except ValueError:
+                column_type = 'float'
+        try:
+            float(value)
+        except ValueError:
+            return 'str'
+    return column_type
+
+
+def make_converter(column_type: str) -> Callable[[str], Union[int, float, str]]:
+    """Создает функцию преобразования значений колонки заданного типа.
+
+    Значения, не соответствующие типу (например, пропуски за пределами выборки),
+    обрабатываются так же, как без схемы - через convert_to_number_if_possible.
+
+    Args:
+        column_type: Тип колонки: 'int', 'float' или 'str'.
+
+    Returns:
+        Функция преобразования строки в значение колонки.
+
+    Raises:
+        ValueError: Если тип колонки не поддерживается.
+    """
+    match column_type:
+        case 'int': parse = int
+        case 'float': parse = float
+        case 'str': return lambda value: value.strip("'\"")
+        case _: raise ValueError(f"Неизвестный тип колонки: {column_type}")
+
+    def convert(value: str) -> Union[int, float, str]:
+        try:
+            return parse(value)
+        except ValueError:
+            return convert_to_number_if_possible(value)
+
+    return convert
+
+
+class Schema:
+    """Схема CSV-файла: тип каждой колонки и преобразователи значений.
+
+    Строковый тип, заданный явно, отключает угадывание чисел: значения
+    сравниваются как текст. Строковый тип, определенный по выборке, этого не
+    делает: в колонке со смешанными значениями (123, abc) числа по-прежнему
+    сравниваются как числа, как без схемы и в колоночном движке.
+    """
+
+    def __init__(self, types: Dict[str, str], inferred: Iterable[str] = ()) -> None:
+        """
+        Args:
+            types: Словарь {колонка: тип}.
+            inferred: Колонки, типы которых определены по выборке, а не заданы явно.
+
+        Raises:
+            ValueError: Если указан неподдерживаемый тип.
+        """
+        self.types = dict(types)
+        self.inferred = frozenset(inferred) & set(self.types)
+        self._converters = {
+            field: convert_to_number_if_possible if column_type == 'str' and field in self.inferred
+            else make_converter(column_type)
+            for field, column_type in self.types.items()
+        }
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Schema) and self.types == other.types and self.inferred == other.inferred
+
+    def __reduce__(self) -> tuple:
+        # Преобразователи - замыкания, поэтому для передачи в другие процессы
+        # схема сериализуется только словарем типов
+        return (Schema, (self.types, sorted(self.inferred)))
+
+    def __repr__(self) -> str:
+        return f"Schema({self.types})"
+
+    def converter(self, field: str) -> Callable[[str], Union[int, float, str]]:
+        """Возвращает преобразователь значений колонки.
+
+        Для колонок, отсутствующих в схеме, используется convert_to_number_if_possible.
+        """
+        return self._converters.get(field, convert_to_number_if_possible)
+
+    def column_type(self, field: str) -> Optional[str]:
+        """Возвращает тип колонки или None, если колонки нет в схеме."""
+        return self.types.get(field)
+
+    @staticmethod
+    def parse(spec: str) -> 'Schema':
+        """Разбирает описание схемы из командной строки.
+
+        Args:
+            spec: Строка вида "price:int,rating:float".
+
+        Returns:
+            Схема с указанными типами.
+
+        Raises:
+            ValueError: Если описание некорректно.
+        """
+        types = {}
+        for part in spec.split(','):
+            field, separator, column_type = part.partition(':')
+            field, column_type = field.strip(), column_type.strip()
+            if not separator or not field or column_type not in COLUMN_TYPES:
+                raise ValueError(f"Некорректное описание колонки в схеме: {part.strip()}")
+            types[field] = column_type
+        return Schema(types)
+
+    @staticmethod
+    def infer(header: Iterable[str], rows: Iterable[Iterable[str]]) -> 'Schema':
+        """Определяет схему по выборке строк.
+
+        Args:
+            header: Названия колонок.
+            rows: Строки выборки в виде последовательностей ячеек.
+
+        Returns:
+            Схема с определенными типами колонок.
+        """
+        header = list(header)
+        columns = list(zip(*rows)) or [()] * len(header)
+        return Schema({field: infer_column_type(values) for field, values in zip(header, columns)}, header)
+
+    @staticmethod
+    def combine(schemas: Dict[str, 'Schema'], overrides: Optional['Schema'] = None) -> 'Schema':
+        """Объединяет схемы нескольких файлов одного набора данных (шардов).
+
+        Набор колонок во всех файлах должен совпадать (порядок может
+        отличаться). Целые и дробные значения одной колонки совместимы и дают
+        дробный тип; число в одном файле и строка в другом - ошибка, если тип
+        колонки не задан явно.
+
+        Args:
+            schemas: Словарь {путь к файлу: схема файла}.
+            overrides: Явно заданные типы колонок; для них типы файлов не сверяются.
+
+        Returns:
+            Общая схема.
+
+        Raises:
+            ValueError: Если колонки или типы колонок файлов не совпадают.
+        """
+        types: Dict[str, str] = {}
+        origins: Dict[str, str] = {}
+        first_path, first = next(iter(schemas.items()), (None, None))
+        for path, schema in schemas.items():
+            missing = set(first.types) - set(schema.types)
+            extra = set(schema.types) - set(first.types)
+            if missing or extra:
+                details = '; '.join(
+                    f"{label}: {', '.join(sorted(columns))}"
+                    for label, columns in (('нет колонок', missing), ('лишние колонки', extra)) if columns
+                )
+                raise ValueError(f"Колонки файла {path} не совпадают с {first_path} ({details})")
+            for field, column_type in schema.types.items():
+                known = types.get(field)
+                if known is None or known == column_type or (overrides and overrides.column_type(field)):
+                    types.setdefault(field, column_type)
+                    origins.setdefault(field, path)
+                elif 'str' in (known, column_type):
+                    raise ValueError(
+                        f"Тип колонки {field} не совпадает: {known} в {origins[field]}, {column_type} в {path}"
+                    )
+                else:
+                    types[field] = 'float'
+        inferred = set().union(*(schema.inferred for schema in schemas.values()))
+        if overrides:
+            types.update(overrides.types)
+            inferred = (inferred - set(overrides.types)) | overrides.inferred
+        return Schema(types, inferred)
@@ -0,0 +1,153 @@
+import math
+from typing import List, Sequence, Union
+
+Number = Union[int, float]
+
+# Размер фрагмента, который дешевле отсортировать, чем разбивать дальше
+SMALL_SELECTION = 32
+
+
+def select_kth(values: Sequence[Number], k: int) -> Number:
+    """Находит k-й по возрастанию элемент (нумерация с нуля) без полной сортировки.
+
+    Интроселект: быстрый выбор с опорным элементом - медианой трех, с
+    ограничением глубины. Если разбиения оказываются неудачными и глубина
+    исчерпана, остаток сортируется, поэтому худший случай - O(n log n), а
+    ожидаемое время - O(n).
+
+    Args:
+        values: Числа.
+        k: Номер искомого элемента в отсортированном порядке.
+
+    Returns:
+        k-й по возрастанию элемент.
+
+    Raises:
+        IndexError: Если k вне диапазона.
+    """
+    if not 0 <= k < len(values):
+        raise IndexError("Номер элемента вне диапазона")
+    depth = 2 * max(len(values), 1).bit_length()
+    while True:
+        if len(values) <= SMALL_SELECTION or depth == 0:
+            return sorted(values)[k]
+        depth -= 1
+        pivot = sorted((values[0], values[len(values) // 2], values[-1]))[1]
+        less = [value for value in values if value < pivot]
+        if k < len(less):
+            values = less
+            continue
+        greater = [value for value in values if value > pivot]
+        equal = len(values) - len(less) - len(greater)
+        if k < len(less) + equal:
+            return pivot
+        k -= len(less) + equal
+        values = greater
+
+
+def quantile(values: Sequence[Number], level: float) -> Number:
+    """Вычисляет квантиль с линейной интерполяцией между соседними элементами.
+
+    Для level=0.5 и четного числа элементов результат - среднее двух
+    центральных элементов, как у медианы.
+
+    Args:
+        values: Числа.
+        level: Уровень квантиля от 0 до 1.
+
+    Returns:
+        Значение квантиля или 0 для пустых данных.
+    """
+    if not values:
+        return 0
+    position = level * (len(values) - 1)
+    lower_index = math.floor(position)
+    fraction = position - lower_index
+    lower = select_kth(values, lower_index)
+    if not fraction:
+        return lower
+    # Следующий по порядку элемент: равный найденному или ближайший больший
+    if sum(1 for value in values if value <= lower) > lower_index + 1:
+        upper = lower
+    else:
+        upper = min(value for value in values if value > lower)
+    if fraction == 0.5:
+        return (lower + upper) / 2
+    return lower + (upper - lower) * fraction
+
+
+def median(values: Sequence[Number]) -> Number:
+    """Вычисляет медиану выбором, без сортировки всех значений."""
+    return quantile(values, 0.5)
+
+
+class P2Quantile:
+    """Потоковая оценка квантиля алгоритмом P² (Jain, Chlamtac).
+
+    Хранит пять маркеров вместо всех значений, поэтому память постоянна и не
+    зависит от объема данных. Результат приближенный; первые пять значений
+    учитываются точно.
+    """
+    __slots__ = ('level', 'count', 'heights', 'positions', 'desired', 'increments')
+
+    def __init__(self, level: float) -> None:
+        """
+        Args:
+            level: Уровень квантиля от 0 до 1.
+        """
+        self.level = level
+        self.count = 0
+        self.heights: List[float] = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * level, 1 + 4 * level, 3 + 2 * level, 5]
+        self.increments = [0, level / 2, level, (1 + level) / 2, 1]
+
+    def add(self, value: Number) -> None:
+        """Учитывает очередное значение."""
+        self.count += 1
+        heights = self.heights
+        if self.count <= 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = next(i for i in range(4) if heights[i] <= value < heights[i + 1])
+
+        positions = self.positions
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Корректировка внутренних маркеров параболической или линейной формулой
+        for i in range(1, 4):
+            delta = self.desired[i] - positions[i]
+            if (delta >= 1 and positions[i + 1] - positions[i] > 1) or \
+                    (delta <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if delta > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def result(self) -> Number:
+        """Возвращает текущую оценку квантиля (0 для пустых данных)."""
+        if self.count <= 5:
+            return quantile(self.heights, self.level)
+        return self.heights[2]
+
+    def _parabolic(self, i: int, step: int) -> float:
+        """Параболическая (P²) формула пересчета высоты маркера."""
+        q, n = self.heights, self.positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
@@ -0,0 +1,668 @@
+import array
+import heapq
+import operator
+from itertools import compress, repeat
+from typing import Any, Callable, Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from project.model.accumulators import quantile_level, validate_aggregate
+from project.model.row import Record, record_type
+from project.model.schema import Schema, infer_column_type
+from project.model.selection import quantile
+from project.model.util import convert_to_number_if_possible
+from project.model.zone_map import ZoneMap
+
+try:
+    import numpy as np
+except ImportError:  # NumPy - необязательная зависимость
+    np = None
+
+# Операторы сравнения для векторных фильтров
+COMPARATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '<': operator.lt,
+    '>=': operator.ge,
+    '<=': operator.le,
+}
+
+# Коды типов array.array для числовых колонок
+ARRAY_TYPECODES: Dict[str, str] = {'int': 'q', 'float': 'd'}
+
+# Код типа array.array для кодов словарной строковой колонки (int32)
+CODE_TYPECODE = 'i'
+
+# Строковая колонка кодируется словарем, если различных значений не больше
+# этой доли строк и не больше DICTIONARY_MAX_DISTINCT
+DICTIONARY_MAX_RATIO = 0.5
+DICTIONARY_MAX_DISTINCT = 1 << 16
+
+# Количество строк, после которого проверяется доля различных значений при кодировании
+DICTIONARY_CHUNK = 4096
+
+# Запись дробных чисел, целые значения которых в CSV записаны без дробной части
+INTEGRAL_FORMAT = 'integral'
+
+
+class Column:
+    """Типизированная колонка таблицы.
+
+    Числовые значения хранятся компактно: в ``array.array`` или, если установлен
+    NumPy, в ``numpy.ndarray``. Строковые значения хранятся списком, а колонка с
+    небольшим числом различных значений (бренд, категория) может храниться
+    словарем: values содержит целые коды, dictionary - различные значения по
+    возрастанию. Порядок кодов совпадает с порядком строк, поэтому сортировка
+    выполняется по кодам, а условие вычисляется один раз для каждого значения
+    словаря. Колонку кодирует таблица при первом обращении (Table.encoded_column).
+
+    Для числовой колонки запоминается, как числа были записаны в CSV (text):
+    общий формат записи или, если его нет, сами строки. По этой записи
+    сопоставляется шаблон LIKE, чтобы результат совпадал с построчным фильтром.
+    """
+    __slots__ = ('name', 'kind', 'values', 'zones', 'dictionary', 'text')
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        values: Sequence[Any],
+        zones: Optional[ZoneMap] = None,
+        dictionary: Optional[List[str]] = None,
+        text: Union[str, List[str], None] = None
+    ) -> None:
+        """
+        Args:
+            name: Название колонки.
+            kind: Тип колонки: 'int', 'float' или 'str'.
+            values: Значения колонки или коды значений словаря.
+            zones: Статистики блоков числовой колонки, если известны.
+            dictionary: Различные значения строковой колонки по возрастанию,
+                если values - их коды. None - values хранит сами значения.
+            text: Запись чисел в CSV: формат (спецификация format или
+                INTEGRAL_FORMAT) либо строки без крайних пробелов. None - запись
+                неизвестна, числа записываются str.
+        """
+        self.name = name
+        self.kind = kind
+        self.values = values
+        self.zones = zones
+        self.dictionary = dictionary
+        self.text = text
+
+    @classmethod
+    def from_strings(cls, name: str, raw: List[str], kind: Optional[str] = None, text: bool = True) -> 'Column':
+        """Создает колонку из строк, один раз определяя ее тип.
+
+        Колонка считается целочисленной, если все значения преобразуются в int,
+        дробной - если все преобразуются в float, иначе остается строковой.
+
+        Args:
+            name: Название колонки.
+            raw: Строковые значения из CSV.
+            kind: Заданный тип колонки. Если не указан, определяется по значениям.
+            text: Запоминать запись чисел в CSV (требует проверки всех значений).
+
+        Returns:
+            Типизированная колонка.
+
+        Raises:
+            ValueError: Если значения не соответствуют заданному типу.
+        """
+        kind = kind or infer_column_type(raw)
+        if kind == 'str':
+            return cls(name, kind, raw)
+        try:
+            numbers = list(map(int if kind == 'int' else float, raw))
+            return cls(name, kind, _pack(kind, numbers), text=_number_text(kind, raw, numbers) if text else None)
+        except OverflowError:
+            # Целые числа вне диапазона int64 в дробных потеряли бы точность, поэтому остаются строками
+            return cls(name, 'str', raw)
+        except ValueError:
+            raise ValueError(f"Значения колонки {name} не соответствуют типу {kind}") from None
+
+    def dictionary_encoded(self) -> Optional['Column']:
+        """Кодирует строковую колонку словарем, если различных значений мало.
+
+        Равные значения после кодирования - один объект строки словаря, а
+        колонка занимает по 4 байта на строку вместо ссылки и объекта строки.
+        Различные значения собираются порциями по DICTIONARY_CHUNK строк:
+        как только их доля среди прочитанных строк превышает
+        DICTIONARY_MAX_RATIO, кодирование прекращается.
+
+        Returns:
+            Словарная колонка или None, если колонку кодировать невыгодно.
+        """
+        if self.kind != 'str' or self.dictionary is not None:
+            return None
+        raw = self.values
+        distinct: set = set()
+        for start in range(0, len(raw), DICTIONARY_CHUNK):
+            distinct.update(raw[start:start + DICTIONARY_CHUNK])
+            seen = min(start + DICTIONARY_CHUNK, len(raw))
+            if len(distinct) > min(DICTIONARY_MAX_RATIO * seen, DICTIONARY_MAX_DISTINCT):
+                return None
+        dictionary = sorted(distinct)
+        codes = {value: code for code, value in enumerate(dictionary)}
+        return Column(self.name, self.kind, _pack_codes(map(codes.__getitem__, raw)), dictionary=dictionary)
+
+    @property
+    def is_numeric(self) -> bool:
+        """Признак числовой колонки."""
+        return self.kind != 'str'
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def take(self, indices: Sequence[int]) -> 'Column':
+        """Возвращает новую колонку из значений с указанными индексами.
+
+        Args:
+            indices: Индексы строк.
+
+        Returns:
+            Колонка того же типа.
+        """
+        if np is not None and isinstance(self.values, np.ndarray):
+            taken = self.values[np.asarray(indices, dtype=np.intp)]
+        elif isinstance(self.values, array.array):
+            taken = array.array(self.values.typecode, map(self.values.__getitem__, indices))
+        else:
+            taken = list(map(self.values.__getitem__, indices))
+        text = self.text
+        if isinstance(text, list):
+            text = list(map(text.__getitem__, indices))
+        return Column(self.name, self.kind, taken, dictionary=self.dictionary, text=text)
+
+    def to_list(self) -> List[Union[int, float, str]]:
+        """Возвращает значения колонки обычным списком Python."""
+        if self.dictionary is not None:
+            return list(map(self.dictionary.__getitem__, self.values.tolist()))
+        return self.values.tolist() if self.is_numeric else list(self.values)
+
+    def texts(self) -> List[str]:
+        """Возвращает значения колонки так, как они записаны в CSV, без крайних пробелов."""
+        if not self.is_numeric:
+            return [value.strip() for value in self.to_list()]
+        if isinstance(self.text, list):
+            return self.text
+        return list(map(number_formatter(self.text or ''), self.values.tolist()))
+
+    def numeric_values(self) -> Sequence[Union[int, float]]:
+        """Возвращает значения числовой колонки.
+
+        Raises:
+            ValueError: Если колонка строковая.
+        """
+        if not self.is_numeric:
+            raise ValueError("Агрегация для строк не предусмотрена")
+        return self.values
+
+    def aggregate(self, aggregator_type: str) -> Union[int, float]:
+        """Вычисляет агрегат над всей колонкой.
+
+        Для пустой колонки возвращается 0.
+
+        Медиана и квантили вычисляются выбором (numpy.partition или интроселект),
+        без полной сортировки колонки. Если у колонки есть статистики блоков,
+        min и max берутся из них.
+
+        Args:
+            aggregator_type: Тип агрегации: min, max, avg, sum, count, median или квантиль pNN.
+
+        Returns:
+            Результат агрегации.
+
+        Raises:
+            ValueError: Если тип агрегации неизвестен или колонка строковая.
+        """
+        validate_aggregate(aggregator_type)
+        if aggregator_type == 'count':
+            # Количество значений определено и для строковой колонки
+            return len(self)
+        values = self.numeric_values()
+        if self.zones is not None and aggregator_type in ('min', 'max'):
+            result = self.zones.min() if aggregator_type == 'min' else self.zones.max()
+            if result is not None:
+                return result
+        level = quantile_level(aggregator_type)
+        if not len(values):
+            return 0
+        if np is not None and isinstance(values, np.ndarray):
+            match aggregator_type:
+                case 'min': return values.min().item()
+                case 'max': return values.max().item()
+                case 'avg': return values.mean().item()
+                case 'sum': return values.sum().item()
+                case 'median': return np.median(values).item()
+            return np.quantile(values, level).item()
+        match aggregator_type:
+            case 'min': return min(values)
+            case 'max': return max(values)
+            case 'avg': return sum(values) / len(values)
+            case 'sum': return sum(values)
+        return quantile(values.tolist(), level)
+
+
+class Table:
+    """Колоночная таблица с типизированными колонками.
+
+    Альтернатива списку словарей: тип каждой колонки определяется один раз при
+    загрузке, а фильтрация, сортировка и агрегация выполняются над колонками
+    целиком, без повторного преобразования ячеек.
+    """
+
+    def __init__(self, columns: List[Column]) -> None:
+        """
+        Args:
+            columns: Колонки таблицы одинаковой длины.
+        """
+        self.columns: Dict[str, Column] = {column.name: column for column in columns}
+        # Строковые колонки, которые проверены и не кодируются словарем
+        self._plain: Set[str] = set()
+
+    @classmethod
+    def from_rows(
+        cls,
+        header: List[str],
+        rows: Iterable[Sequence[str]],
+        schema: Optional[Schema] = None,
+        fields: Optional[Collection[str]] = None,
+        text_fields: Optional[Collection[str]] = None
+    ) -> 'Table':
+        """Строит таблицу из строк CSV.
+
+        Разбор ячеек в колонки - основная часть загрузки, поэтому для запроса,
+        которому нужны не все колонки, остальные колонки не собираются.
+
+        Args:
+            header: Названия колонок.
+            rows: Строки CSV в виде последовательностей ячеек.
+            schema: Схема с типами колонок. Колонки вне схемы типизируются автоматически.
+            fields: Колонки, попадающие в таблицу. None - все колонки.
+            text_fields: Колонки, для которых запоминается запись чисел в CSV.
+                None - все колонки.
+
+        Returns:
+            Колоночная таблица.
+        """
+        width = len(header)
+        wanted = [index for index, name in enumerate(header) if fields is None or name in fields]
+        if not wanted or len(wanted) == width:
+            wanted = list(range(width))
+        raw: List[List[str]] = [[] for _ in wanted]
+        pick = None
+        if len(wanted) < width:
+            pick = operator.itemgetter(*wanted)
+            if len(wanted) == 1:
+                index = wanted[0]
+                pick = lambda row: (row[index],)
+        for row in rows:
+            if len(row) < width:
+                row = list(row) + [''] * (width - len(row))
+            for values, cell in zip(raw, row if pick is None else pick(row)):
+                values.append(cell)
+        return cls([
+            Column.from_strings(
+                header[index], values, schema.column_type(header[index]) if schema else None,
+                text_fields is None or header[index] in text_fields
+            )
+            for index, values in zip(wanted, raw)
+        ])
+
+    @property
+    def column_names(self) -> List[str]:
+        """Названия колонок в порядке файла."""
+        return list(self.columns)
+
+    def __len__(self) -> int:
+        for column in self.columns.values():
+            return len(column)
+        return 0
+
+    def column(self, name: str) -> Column:
+        """Возвращает колонку по названию.
+
+        Raises:
+            ValueError: Если колонки нет в таблице.
+        """
+        try:
+            return self.columns[name]
+        except KeyError:
+            raise ValueError(f"Колонка не найдена: {name}") from None
+
+    def encoded_column(self, name: str) -> Column:
+        """Возвращает колонку, при первом обращении кодируя строковую колонку словарем.
+
+        Словарная колонка заменяет исходную в таблице целиком, поэтому
+        одновременные запросы видят либо исходную, либо закодированную колонку.
+
+        Raises:
+            ValueError: Если колонки нет в таблице.
+        """
+        column = self.column(name)
+        if column.kind != 'str' or column.dictionary is not None or name in self._plain:
+            return column
+        encoded = column.dictionary_encoded()
+        if encoded is None:
+            self._plain.add(name)
+            return column
+        self.columns[name] = encoded
+        return encoded
+
+    def select(self, names: Sequence[str]) -> 'Table':
+        """Возвращает таблицу из указанных колонок в заданном порядке (без копирования значений).
+
+        Raises:
+            ValueError: Если колонки нет в таблице.
+        """
+        return Table([self.column(name) for name in names])
+
+    def take(self, indices: Sequence[int]) -> 'Table':
+        """Возвращает таблицу из строк с указанными индексами (в заданном порядке)."""
+        return Table([column.take(indices) for column in self.columns.values()])
+
+    def filter_indices(
+        self,
+        field: str,
+        operator_: str,
+        expected_value: Union[int, float, str],
+        candidates: Optional[Sequence[int]] = None,
+        convert: Callable[[str], Union[int, float, str]] = convert_to_number_if_possible
+    ) -> Sequence[int]:
+        """Вычисляет индексы строк, удовлетворяющих условию.
+
+        Сравнение выполняется сразу над всей колонкой. Строки сравниваются без
+        учета регистра и крайних пробелов, как в построчном фильтре. Если у
+        числовой колонки есть статистики блоков, блоки без подходящих строк
+        пропускаются, а блоки, где подходят все строки, не проверяются.
+
+        Args:
+            field: Название колонки.
+            operator_: Оператор сравнения.
+            expected_value: Ожидаемое значение.
+            candidates: Индексы строк-кандидатов по возрастанию. None - все строки.
+            convert: Преобразование строкового ожидаемого значения (по схеме
+                колонки или с угадыванием числа).
+
+        Returns:
+            Индексы подходящих строк по возрастанию.
+
+        Raises:
+            ValueError: Если оператор не поддерживается.
+        """
+        if operator_ not in COMPARATORS:
+            raise ValueError(f"Unsupported operator: {operator_}")
+        compare = COMPARATORS[operator_]
+        if isinstance(expected_value, str):
+            expected_value = convert(expected_value)
+        if isinstance(expected_value, str):
+            expected_value = expected_value.strip().lower()
+        column = self.columns.get(field)
+        if candidates is None and column is not None and column.zones is not None \
+                and not isinstance(expected_value, str):
+            return self._filter_blocks(column, [(operator_, expected_value)])
+        if candidates is None and column is not None and column.is_numeric and not isinstance(expected_value, str) \
+                and not (np is not None and isinstance(column.values, np.ndarray)):
+            # Полный просмотр array.array: сравнение без вызова Python-функции на каждый элемент
+            return list(compress(range(len(column)), map(compare, column.values, repeat(expected_value))))
+        return self.match_indices(field, lambda value: compare(value, expected_value), candidates, expected_value)
+
+    def match_indices(
+        self,
+        field: str,
+        test: Callable[[Any], bool],
+        candidates: Optional[Sequence[int]] = None,
+        expected_value: Any = None,
+        as_text: bool = False
+    ) -> Sequence[int]:
+        """Вычисляет индексы строк, значение колонки которых проходит проверку.
+
+        Значения строковой колонки перед проверкой нормализуются так же, как в
+        построчном фильтре: строки приводятся к нижнему регистру без крайних
+        пробелов, а если ожидается не строка - еще и к числу, если это возможно.
+        Если ожидается число, проверка числовой колонки при наличии NumPy
+        выполняется векторно: test получает массив целиком. У словарной колонки
+        test проверяет каждое значение словаря один раз, а строки отбираются
+        сравнением кодов.
+
+        Args:
+            field: Название колонки.
+            test: Проверка нормализованного значения.
+            candidates: Индексы строк-кандидатов по возрастанию. None - все строки.
+            expected_value: Значение, с которым test сравнивает значение колонки.
+            as_text: Проверять числа в той записи, в какой они были в CSV.
+
+        Returns:
+            Индексы подходящих строк по возрастанию. Пусто, если колонки нет.
+        """
+        if field not in self.columns:
+            return []
+        column = self.encoded_column(field)
+        values = column.texts() if as_text and column.is_numeric else column.values
+        rows = range(len(column)) if candidates is None else candidates
+
+        if column.dictionary is not None:
+            normalize = _normalize_text if isinstance(expected_value, str) else normalize_value
+            matching = [code for code, value in enumerate(column.dictionary) if test(normalize(value))]
+            return _match_codes(values, matching, candidates)
+
+        if np is not None and isinstance(values, np.ndarray) and not isinstance(expected_value, (str, type(None))):
+            # Векторная проверка: test применяется к массиву целиком
+            if candidates is None:
+                return np.flatnonzero(test(values))
+            rows = np.asarray(candidates, dtype=np.intp)
+            return rows[test(values[rows])]
+
+        if np is not None and isinstance(rows, np.ndarray):
+            rows = rows.tolist()
+        if column.is_numeric:
+            return [index for index in rows if test(values[index])]
+        if isinstance(expected_value, str):
+            return [index for index in rows if test(values[index].strip().lower())]
+        return [index for index in rows if test(normalize_value(values[index]))]
+
+    def filter_range(
+        self,
+        field: str,
+        low: Union[int, float, str],
+        high: Union[int, float, str],
+        candidates: Optional[Sequence[int]] = None,
+        convert: Callable[[str], Union[int, float, str]] = convert_to_number_if_possible
+    ) -> Sequence[int]:
+        """Вычисляет индексы строк, значение колонки которых лежит в отрезке [low, high].
+
+        Если у числовой колонки есть статистики блоков, обе границы
+        проверяются по ним одновременно.
+
+        Args:
+            field: Название колонки.
+            low: Нижняя граница (включительно).
+            high: Верхняя граница (включительно).
+            candidates: Индексы строк-кандидатов по возрастанию. None - все строки.
+            convert: Преобразование строковых границ, как в filter_indices.
+
+        Returns:
+            Индексы подходящих строк по возрастанию.
+        """
+        column = self.columns.get(field)
+        bounds = [convert(bound) if isinstance(bound, str) else bound for bound in (low, high)]
+        if candidates is None and column is not None and column.zones is not None \
+                and not any(isinstance(bound, str) for bound in bounds):
+            return self._filter_blocks(column, [('>=', bounds[0]), ('<=', bounds[1])])
+        candidates = self.filter_indices(field, '>=', bounds[0], candidates, convert)
+        return self.filter_indices(field, '<=', bounds[1], candidates, convert)
+
+    @staticmethod
+    def _filter_blocks(column: Column, conditions: List[Tuple[str, Union[int, float]]]) -> Sequence[int]:
+        """Проверка числовой колонки по блокам с учетом их статистик."""
+        values = column.values
+        blocks = column.zones.blocks(conditions)
+        if np is not None and isinstance(values, np.ndarray):
+            parts = []
+            for start, end, complete in blocks:
+                if complete:
+                    parts.append(np.arange(start, end))
+                    continue
+                block = values[start:end]
+                mask = np.ones(len(block), dtype=bool)
+                for operator_, expected_value in conditions:
+                    mask &= COMPARATORS[operator_](block, expected_value)
+                parts.append(np.flatnonzero(mask) + start)
+            return np.concatenate(parts) if parts else np.arange(0, dtype=np.intp)
+        indices: List[int] = []
+        for start, end, complete in blocks:
+            if complete:
+                indices.extend(range(start, end))
+                continue
+            (operator_, expected_value), *rest = conditions
+            matches = map(COMPARATORS[operator_], values[start:end], repeat(expected_value))
+            rows = list(compress(range(start, end), matches))
+            for operator_, expected_value in rest:
+                compare = COMPARATORS[operator_]
+                rows = [index for index in rows if compare(values[index], expected_value)]
+            indices.extend(rows)
+        return indices
+
+    def argsort(self, field: str, descending: bool = False, limit: Optional[int] = None) -> Sequence[int]:
+        """Вычисляет порядок строк при сортировке по колонке.
+
+        Сортировка устойчивая: строки с равными ключами сохраняют исходный порядок.
+        При заданном limit полная сортировка не выполняется: отбираются только
+        первые limit строк (частичное разбиение или ограниченная куча).
+
+        Args:
+            field: Название колонки.
+            descending: Сортировать по убыванию.
+            limit: Количество первых строк результата. None - все строки.
+
+        Returns:
+            Индексы строк в отсортированном порядке.
+        """
+        values = self.encoded_column(field).values
+        if limit is not None and limit >= len(values):
+            limit = None
+        if np is not None and isinstance(values, np.ndarray):
+            keys = -values if descending else values
+            if limit is None:
+                return np.argsort(keys, kind='stable')
+            if limit <= 0:
+                return np.arange(0, dtype=np.intp)
+            # Граничное значение k-й строки; из равных ему берутся первые по порядку
+            kth = np.partition(keys, limit - 1)[limit - 1]
+            smaller = np.flatnonzero(keys < kth)
+            equal = np.flatnonzero(keys == kth)[:limit - len(smaller)]
+            candidates = np.sort(np.concatenate([smaller, equal]))
+            return candidates[np.argsort(keys[candidates], kind='stable')]
+        if limit is None:
+            return sorted(range(len(values)), key=values.__getitem__, reverse=descending)
+        select = heapq.nlargest if descending else heapq.nsmallest
+        return select(limit, range(len(values)), key=values.__getitem__)
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        """Возвращает таблицу как словарь {колонка: список значений} для вывода.
+
+        Числа выводятся в той записи, в какой они были в CSV (Column.text),
+        поэтому вывод не зависит от движка.
+        """
+        return {name: _output_values(column) for name, column in self.columns.items()}
+
+    def iter_rows(self) -> Iterator[Record]:
+        """Выдает строки таблицы в виде записей, читаемых как словари (значения - как в to_dict)."""
+        make = record_type(tuple(self.column_names))
+        for values in zip(*(_output_values(column) for column in self.columns.values())):
+            yield make(values)
+
+
+def _output_values(column: Column) -> List[str]:
+    """Значения колонки для вывода: строки как есть, числа в записи из CSV."""
+    return column.texts() if column.is_numeric else column.to_list()
+
+
+def normalize_value(value: str) -> Union[int, float, str]:
+    """Нормализует значение ячейки для сравнения: число или строка в нижнем регистре."""
+    value = convert_to_number_if_possible(value)
+    return value.strip().lower() if isinstance(value, str) else value
+
+
+def number_formatter(spec: str) -> Callable[[Union[int, float]], str]:
+    """Создает функцию записи числа в формате spec.
+
+    Args:
+        spec: Спецификация format или INTEGRAL_FORMAT: целые значения без
+            дробной части, остальные - как str.
+
+    Returns:
+        Функция записи числа строкой.
+    """
+    if spec == INTEGRAL_FORMAT:
+        return lambda value: str(int(value)) if value.is_integer() else str(value)
+    return lambda value: format(value, spec)
+
+
+def _number_text(kind: str, raw: List[str], numbers: List[Union[int, float]]) -> Union[str, List[str]]:
+    """Определяет, как записаны числа колонки в CSV.
+
+    Форматы-кандидаты (str, фиксированное число знаков первого значения,
+    INTEGRAL_FORMAT) проверяются на всех значениях; несовпадение обычно
+    находится на первых строках. Если ни один формат не подходит,
+    возвращаются сами строки.
+
+    Args:
+        kind: Тип колонки: 'int' или 'float'.
+        raw: Строковые значения из CSV.
+        numbers: Преобразованные значения.
+
+    Returns:
+        Спецификация формата или строки без крайних пробелов.
+    """
+    specs = ['']
+    if kind == 'float' and raw:
+        first = raw[0].strip()
+        if '.' in first and first.replace('.', '', 1).lstrip('+-').isdigit():
+            specs.insert(0, f".{len(first) - first.index('.') - 1}f")
+        specs.append(INTEGRAL_FORMAT)
+    for spec in specs:
+        if all(map(operator.eq, map(number_formatter(spec), numbers), raw)):
+            return spec
+    return [value.strip() for value in raw]
+
+
+def _normalize_text(value: str) -> str:
+    """Приводит строку к нижнему регистру без крайних пробелов."""
+    return value.strip().lower()
+
+
+def _match_codes(codes: Sequence[int], matching: List[int], candidates: Optional[Sequence[int]]) -> Sequence[int]:
+    """Индексы строк словарной колонки, код которых входит в matching, по возрастанию."""
+    if not matching:
+        return []
+    if np is not None and isinstance(codes, np.ndarray):
+        rows = None if candidates is None else np.asarray(candidates, dtype=np.intp)
+        selected = codes if rows is None else codes[rows]
+        mask = selected == matching[0] if len(matching) == 1 else np.isin(selected, matching)
+        return np.flatnonzero(mask) if rows is None else rows[mask]
+    if candidates is not None:
+        if np is not None and isinstance(candidates, np.ndarray):
+            candidates = candidates.tolist()
+        expected = frozenset(matching)
+        return [index for index in candidates if codes[index] in expected]
+    if len(matching) == 1:
+        # Сравнение без вызова Python-функции на каждую строку
+        return list(compress(range(len(codes)), map(operator.eq, codes, repeat(matching[0]))))
+    return list(compress(range(len(codes)), map(frozenset(matching).__contains__, codes)))
+
+
+def _pack_codes(codes: Iterable[int]) -> Sequence[int]:
+    """Упаковывает коды словарной колонки в int32: ndarray при наличии NumPy, иначе array.array."""
+    packed = array.array(CODE_TYPECODE, codes)
+    if np is not None:
+        return np.frombuffer(packed, dtype=np.int32).copy()
+    return packed
+
+
+def _pack(kind: str, values: Iterable[Union[int, float]]) -> Sequence[Union[int, float]]:
+    """Упаковывает числа в компактное хранилище: ndarray при наличии NumPy, иначе array.array."""
+    packed = array.array(ARRAY_TYPECODES[kind], values)
+    if np is not None:
+        return np.frombuffer(packed, dtype=np.int64 if kind == 'int' else np.float64).copy()
+    return packed
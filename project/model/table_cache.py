@@ -0,0 +1,319 @@
+import array
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from itertools import accumulate
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from project.model.schema import Schema
+from project.model.table import ARRAY_TYPECODES, CODE_TYPECODE, Column, Table
+from project.model.zone_map import ZoneMap
+
+try:
+    import numpy as np
+except ImportError:  # NumPy - необязательная зависимость
+    np = None
+
+# Сигнатура и версия формата файла кэша (3 - текст числовых колонок и словарные строковые колонки)
+MAGIC = b'WMCACHE3'
+
+# Расширение файлов кэша
+CACHE_SUFFIX = '.wmcache'
+
+# Размер кэша по умолчанию
+DEFAULT_CACHE_SIZE = 1 << 30
+
+# Размер блоков в начале и конце файла, по которым считается хэш содержимого
+FINGERPRINT_BLOCK = 1 << 16
+
+# Выравнивание секций с данными колонок
+ALIGNMENT = 8
+
+
+def file_identity(file_path: str) -> Dict[str, Any]:
+    """Вычисляет идентичность CSV-файла для проверки актуальности кэша.
+
+    Хэш считается по размеру, времени изменения и блокам в начале и конце
+    файла, а не по всему содержимому: иначе проверка кэша стоила бы полного
+    чтения файла.
+
+    Args:
+        file_path: Путь к CSV-файлу.
+
+    Returns:
+        Словарь с путем, размером, временем изменения и хэшем содержимого.
+    """
+    stat = os.stat(file_path)
+    digest = hashlib.blake2b(f"{stat.st_size}:{stat.st_mtime_ns}".encode(), digest_size=16)
+    with open(file_path, mode='rb') as csvfile:
+        digest.update(csvfile.read(FINGERPRINT_BLOCK))
+        if stat.st_size > FINGERPRINT_BLOCK:
+            csvfile.seek(max(stat.st_size - FINGERPRINT_BLOCK, FINGERPRINT_BLOCK))
+            digest.update(csvfile.read())
+    return {
+        'path': os.path.abspath(file_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'hash': digest.hexdigest(),
+    }
+
+
+class TableCache:
+    """Дисковый кэш разобранных CSV-файлов в двоичном колоночном формате.
+
+    Файл кэша состоит из сигнатуры, JSON-заголовка и выровненных секций с
+    данными колонок. Числовые колонки хранятся сырыми массивами int64/float64
+    и при наличии NumPy отображаются в память без копирования; для них в
+    заголовке сохраняются статистики блоков (zone map). Записи кэша
+    проверяются по идентичности исходного файла и вытесняются по принципу
+    LRU, когда суммарный размер кэша превышает лимит.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int = DEFAULT_CACHE_SIZE) -> None:
+        """
+        Args:
+            cache_dir: Каталог кэша. Создается при необходимости.
+            max_size: Максимальный суммарный размер файлов кэша в байтах.
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get_or_parse(
+        self,
+        file_path: str,
+        schema: Optional[Schema],
+        parse: Callable[[], Table]
+    ) -> Table:
+        """Загружает таблицу из кэша или разбирает файл и сохраняет результат.
+
+        Args:
+            file_path: Путь к CSV-файлу.
+            schema: Схема, с которой разбирается файл (входит в ключ кэша).
+            parse: Функция разбора файла при промахе кэша.
+
+        Returns:
+            Колоночная таблица.
+        """
+        identity = file_identity(file_path)
+        table = self.load(file_path, schema, identity)
+        if table is None:
+            table = parse()
+            self.store(file_path, table, schema, identity)
+        return table
+
+    def load(
+        self,
+        file_path: str,
+        schema: Optional[Schema] = None,
+        identity: Optional[Dict[str, Any]] = None
+    ) -> Optional[Table]:
+        """Загружает таблицу из кэша.
+
+        Args:
+            file_path: Путь к CSV-файлу.
+            schema: Схема, с которой разбирался файл.
+            identity: Идентичность файла, если уже вычислена.
+
+        Returns:
+            Таблица или None, если записи нет или исходный файл изменился.
+        """
+        entry_path = self._entry_path(file_path, schema)
+        try:
+            cachefile = open(entry_path, mode='rb')
+        except FileNotFoundError:
+            return None
+        with cachefile:
+            try:
+                buffer = mmap.mmap(cachefile.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Пустой файл - запись повреждена
+                return None
+        header = self._read_header(buffer)
+        if header is None or header['source'] != (identity or file_identity(file_path)):
+            return None
+        # Время доступа к записи - основа вытеснения LRU
+        os.utime(entry_path)
+        data_start = header['data_start']
+        return Table([self._read_column(buffer, data_start, description) for description in header['columns']])
+
+    def store(
+        self,
+        file_path: str,
+        table: Table,
+        schema: Optional[Schema] = None,
+        identity: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Сохраняет таблицу в кэш и вытесняет старые записи при превышении лимита.
+
+        Args:
+            file_path: Путь к CSV-файлу.
+            table: Разобранная таблица.
+            schema: Схема, с которой разбирался файл.
+            identity: Идентичность файла, если уже вычислена.
+        """
+        sections: List[bytes] = []
+        descriptions = []
+        for name in table.column_names:
+            # В кэше строковые колонки с небольшим числом значений хранятся словарем
+            data, description = self._encode_column(table.encoded_column(name))
+            descriptions.append(description)
+            sections.append(data)
+
+        offset = 0
+        for description, data in zip(descriptions, sections):
+            # Смещения секций отсчитываются от начала области данных
+            description['offset'] = offset
+            offset = _align(offset + len(data))
+        header = {
+            'source': identity or file_identity(file_path),
+            'byteorder': sys.byteorder,
+            'columns': descriptions,
+        }
+        header_bytes = json.dumps(header).encode('utf-8')
+        data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, mode='wb') as cachefile:
+                cachefile.write(MAGIC)
+                cachefile.write(struct.pack('<Q', len(header_bytes)))
+                cachefile.write(header_bytes)
+                for description, data in zip(descriptions, sections):
+                    cachefile.write(b'\0' * (data_start + description['offset'] - cachefile.tell()))
+                    cachefile.write(data)
+            os.replace(temp_path, self._entry_path(file_path, schema))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._evict()
+
+    def _entry_path(self, file_path: str, schema: Optional[Schema]) -> str:
+        """Путь к записи кэша для файла и схемы."""
+        key = json.dumps([os.path.abspath(file_path), schema.types if schema else None])
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest()[:32] + CACHE_SUFFIX)
+
+    def _evict(self) -> None:
+        """Удаляет давно не использованные записи, пока кэш превышает лимит."""
+        evict_least_recent(self.cache_dir, CACHE_SUFFIX, self.max_size)
+
+    @staticmethod
+    def _read_header(buffer: mmap.mmap) -> Optional[Dict[str, Any]]:
+        """Читает заголовок файла кэша или возвращает None для чужого формата."""
+        if buffer[:len(MAGIC)] != MAGIC:
+            return None
+        (length,) = struct.unpack_from('<Q', buffer, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(buffer[start:start + length].decode('utf-8'))
+        if header.get('byteorder') != sys.byteorder:
+            return None
+        header['data_start'] = _align(start + length)
+        return header
+
+    @staticmethod
+    def _encode_column(column: Column) -> Tuple[bytes, Dict[str, Any]]:
+        """Сериализует колонку в байты и описание для заголовка."""
+        description = {'name': column.name, 'kind': column.kind, 'rows': len(column)}
+        if column.is_numeric:
+            # И array.array, и ndarray хранят значения как int64/float64
+            data = column.values.tobytes()
+            if isinstance(column.text, list):
+                # Записи чисел без общего формата хранятся после значений
+                data += _encode_strings(column.text)
+                description['text_strings'] = True
+            elif column.text is not None:
+                description['text'] = column.text
+            description['length'] = len(data)
+            description['zones'] = ZoneMap.build(column.values).to_dict()
+            return data, description
+        if column.dictionary is not None:
+            # Словарная колонка: коды int32, затем значения словаря
+            codes = column.values.tobytes()
+            data = codes + _encode_strings(column.dictionary)
+            description['dictionary'] = len(column.dictionary)
+        else:
+            data = _encode_strings(column.values)
+        description['length'] = len(data)
+        return data, description
+
+    @staticmethod
+    def _read_column(buffer: mmap.mmap, data_start: int, description: Dict[str, Any]) -> Column:
+        """Восстанавливает колонку из секции файла кэша."""
+        kind, rows = description['kind'], description['rows']
+        offset = data_start + description['offset']
+        end = offset + description['length']
+        if kind != 'str':
+            zones = ZoneMap.from_dict(description['zones']) if 'zones' in description else None
+            if np is not None:
+                dtype = np.int64 if kind == 'int' else np.float64
+                values = np.frombuffer(buffer, dtype=dtype, count=rows, offset=offset)
+            else:
+                values = array.array(ARRAY_TYPECODES[kind])
+                values.frombytes(buffer[offset:offset + rows * values.itemsize])
+            text = description.get('text')
+            if description.get('text_strings'):
+                text = _decode_strings(buffer, offset + rows * values.itemsize, end, rows)
+            return Column(description['name'], kind, values, zones, text=text)
+        if 'dictionary' not in description:
+            return Column(description['name'], kind, _decode_strings(buffer, offset, end, rows))
+        if np is not None:
+            codes = np.frombuffer(buffer, dtype=np.int32, count=rows, offset=offset)
+        else:
+            codes = array.array(CODE_TYPECODE)
+            codes.frombytes(buffer[offset:offset + rows * codes.itemsize])
+        dictionary = _decode_strings(buffer, offset + rows * codes.itemsize, end, description['dictionary'])
+        return Column(description['name'], kind, codes, dictionary=dictionary)
+
+
+def _encode_strings(values: List[str]) -> bytes:
+    """Сериализует строки одним блоком текста и смещениями границ значений."""
+    offsets = array.array('q', accumulate((len(value) for value in values), initial=0))
+    return offsets.tobytes() + ''.join(values).encode('utf-8')
+
+
+def _decode_strings(buffer: mmap.mmap, start: int, end: int, count: int) -> List[str]:
+    """Восстанавливает count строк, сериализованных _encode_strings."""
+    offsets = array.array('q')
+    offsets_size = (count + 1) * offsets.itemsize
+    offsets.frombytes(buffer[start:start + offsets_size])
+    text = buffer[start + offsets_size:end].decode('utf-8')
+    return [text[begin:finish] for begin, finish in zip(offsets, offsets[1:])]
+
+
+def evict_least_recent(cache_dir: str, suffix: str, max_size: int) -> None:
+    """Удаляет из каталога кэша давно не использованные файлы, пока их размер превышает лимит.
+
+    Время использования - время изменения файла: при чтении записи оно
+    обновляется.
+
+    Args:
+        cache_dir: Каталог кэша.
+        suffix: Расширение файлов записей.
+        max_size: Максимальный суммарный размер записей в байтах.
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(suffix):
+            try:
+                stat = os.stat(os.path.join(cache_dir, name))
+            except FileNotFoundError:  # Запись удалена другим процессом
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_size:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def _align(offset: int) -> int:
+    """Округляет смещение вверх до границы ALIGNMENT."""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
@@ -48,3 +48,66 @@ class ExpressionParser:
                 right_hand = convert_to_number_if_possible(parts[1].strip())
                 return (left_hand, op, right_hand)
         raise ValueError(f"Не найден оператор в выражении: {row}")
+
+    @staticmethod
+    def parse_expressions(row: str) -> list[tuple[str, str, Union[int, float, str]]]:
+        """Разбирает список выражений через запятую.
+
+        Args:
+            row: Строка с выражениями (например, "price=min,price=max").
+
+        Returns:
+            Список кортежей (поле, оператор, значение) без повторов.
+
+        Raises:
+            ValueError: Если в одном из выражений не найден поддерживаемый оператор.
+        """
+        expressions = [ExpressionParser.parse_expression(part) for part in row.split(',') if part.strip()]
+        if not expressions:
+            raise ValueError(f"Не найден оператор в выражении: {row}")
+        return list(dict.fromkeys(expressions))
+
+    @staticmethod
+    def parse_columns(row: str) -> list[str]:
+        """Разбирает список колонок через запятую.
+
+        Args:
+            row: Строка с названиями колонок (например, "name,price").
+
+        Returns:
+            Названия колонок в заданном порядке без повторов.
+
+        Raises:
+            ValueError: Если колонки не указаны.
+        """
+        columns = [part.strip() for part in row.split(',') if part.strip()]
+        if not columns:
+            raise ValueError(f"Не указаны колонки: {row}")
+        return list(dict.fromkeys(columns))
+
+# Множители суффиксов размеров
+SIZE_UNITS = {'': 1, 'B': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+def parse_size(text: str) -> int:
+    """Разбирает размер в байтах с необязательным суффиксом (K, M, G, T).
+
+    Args:
+        text: Строка вида "512M", "1G" или "4096".
+
+    Returns:
+        Размер в байтах.
+
+    Raises:
+        ValueError: Если строка не является размером.
+    """
+    normalized = text.strip().upper().removesuffix('IB').removesuffix('B')
+    number, unit = normalized, ''
+    if normalized and normalized[-1] in SIZE_UNITS:
+        number, unit = normalized[:-1], normalized[-1]
+    try:
+        size = int(float(number) * SIZE_UNITS[unit])
+    except ValueError:
+        raise ValueError(f"Некорректный размер: {text}") from None
+    if size < 0:
+        raise ValueError(f"Некорректный размер: {text}")
+    return size
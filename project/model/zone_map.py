@@ -0,0 +1,141 @@
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # NumPy - необязательная зависимость
+    np = None
+
+Number = Union[int, float]
+
+# Количество строк в одном блоке статистик
+ZONE_ROWS = 1 << 16
+
+
+class ZoneMap:
+    """Статистики блоков числовой колонки (zone map).
+
+    Для каждого блока из ZONE_ROWS строк хранятся минимум, максимум и
+    количество пропусков (NaN). По ним фильтр пропускает блоки, в которых
+    условие заведомо не выполняется, и не проверяет построчно блоки, где оно
+    выполняется для всех строк; min и max колонки берутся из статистик без
+    просмотра значений. Выигрыш наибольший для отсортированных или
+    сгруппированных по значению выгрузок.
+    """
+    __slots__ = ('block_rows', 'rows', 'mins', 'maxs', 'nulls')
+
+    def __init__(
+        self,
+        block_rows: int,
+        rows: int,
+        mins: List[Number],
+        maxs: List[Number],
+        nulls: List[int]
+    ) -> None:
+        """
+        Args:
+            block_rows: Количество строк в блоке.
+            rows: Количество строк колонки.
+            mins: Минимумы блоков без учета пропусков (NaN, если в блоке одни пропуски).
+            maxs: Максимумы блоков без учета пропусков.
+            nulls: Количество пропусков в блоках.
+        """
+        self.block_rows = block_rows
+        self.rows = rows
+        self.mins = mins
+        self.maxs = maxs
+        self.nulls = nulls
+
+    @staticmethod
+    def build(values: Sequence[Number], block_rows: int = ZONE_ROWS) -> 'ZoneMap':
+        """Вычисляет статистики блоков числовых значений.
+
+        Args:
+            values: Значения колонки (array.array или numpy.ndarray).
+            block_rows: Количество строк в блоке.
+
+        Returns:
+            Статистики блоков.
+        """
+        rows = len(values)
+        if np is not None and isinstance(values, np.ndarray):
+            if not rows:
+                return ZoneMap(block_rows, 0, [], [], [])
+            starts = np.arange(0, rows, block_rows)
+            # fmin/fmax пропускают NaN, если в блоке есть другие значения
+            mins = np.fmin.reduceat(values, starts).tolist()
+            maxs = np.fmax.reduceat(values, starts).tolist()
+            if values.dtype.kind == 'f':
+                nulls = np.add.reduceat(np.isnan(values), starts).tolist()
+            else:
+                nulls = [0] * len(starts)
+            return ZoneMap(block_rows, rows, mins, maxs, nulls)
+
+        mins, maxs, nulls = [], [], []
+        for start in range(0, rows, block_rows):
+            block = [value for value in values[start:start + block_rows] if value == value]
+            nulls.append(min(block_rows, rows - start) - len(block))
+            mins.append(min(block) if block else float('nan'))
+            maxs.append(max(block) if block else float('nan'))
+        return ZoneMap(block_rows, rows, mins, maxs, nulls)
+
+    @staticmethod
+    def from_dict(description: Dict[str, Any]) -> 'ZoneMap':
+        """Восстанавливает статистики из описания, сохраненного to_dict."""
+        return ZoneMap(
+            description['block_rows'], description['rows'],
+            description['min'], description['max'], description['nulls']
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Возвращает статистики в виде словаря для заголовка файла кэша."""
+        return {
+            'block_rows': self.block_rows,
+            'rows': self.rows,
+            'min': self.mins,
+            'max': self.maxs,
+            'nulls': self.nulls,
+        }
+
+    def min(self) -> Optional[Number]:
+        """Минимум колонки или None, если его нельзя получить из статистик (пусто или есть NaN)."""
+        return min(self.mins) if self.mins and not any(self.nulls) else None
+
+    def max(self) -> Optional[Number]:
+        """Максимум колонки или None, если его нельзя получить из статистик (пусто или есть NaN)."""
+        return max(self.maxs) if self.maxs and not any(self.nulls) else None
+
+    def blocks(self, conditions: Sequence[Tuple[str, Number]]) -> Iterator[Tuple[int, int, bool]]:
+        """Перечисляет блоки, в которых могут быть строки, удовлетворяющие всем сравнениям.
+
+        Args:
+            conditions: Пары (оператор, число): значение колонки сравнивается с числом.
+
+        Yields:
+            Тройки (начало, конец, все_строки_подходят) в порядке строк.
+        """
+        for block, (low, high, nulls) in enumerate(zip(self.mins, self.maxs, self.nulls)):
+            verdicts = [_block_verdict(operator_, value, low, high, nulls) for operator_, value in conditions]
+            if False in verdicts:
+                continue
+            start = block * self.block_rows
+            yield start, min(start + self.block_rows, self.rows), all(verdict is True for verdict in verdicts)
+
+def _block_verdict(operator_: str, value: Number, low: Number, high: Number, nulls: int) -> Optional[bool]:
+    """Итог сравнения для блока: True - подходят все строки, False - ни одна, None - неизвестно."""
+    if low != low:
+        # В блоке одни пропуски: NaN не равен ничему и ни с чем не упорядочен
+        return operator_ == '!='
+    complete = not nulls
+    match operator_:
+        case '>': none, every = high <= value, low > value
+        case '>=': none, every = high < value, low >= value
+        case '<': none, every = low >= value, high < value
+        case '<=': none, every = low > value, high <= value
+        case '=': none, every = value < low or value > high, low == high == value
+        case '!=':
+            # Для != пропуски подходят, поэтому полнота блока от них не зависит
+            none, every, complete = low == high == value and not nulls, value < low or value > high, True
+        case _: return None
+    if none:
+        return False
+    return True if every and complete else None
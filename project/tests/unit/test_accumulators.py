@@ -0,0 +1,57 @@
+# test_accumulators.py
+import pytest
+from project.model.accumulators import Accumulator
+
+def test_accumulator_results():
+    """Тест вычисления агрегатов по накопленным статистикам."""
+    accumulator = Accumulator.for_aggregate("median")
+    for value in (999, 1199, 199, 299):
+        accumulator.add(value)
+    assert accumulator.result("min") == 199
+    assert accumulator.result("max") == 1199
+    assert accumulator.result("avg") == 674
+    assert accumulator.result("median") == 649
+
+def test_accumulator_merge():
+    """Тест объединения накопителей, собранных по разным частям данных."""
+    left, right = Accumulator.for_aggregate("median"), Accumulator.for_aggregate("median")
+    for value in (5, 1):
+        left.add(value)
+    for value in (3, 9, 7):
+        right.add(value)
+    merged = left.merge(right)
+    assert (merged.count, merged.total, merged.minimum, merged.maximum) == (5, 25, 1, 9)
+    assert merged.result("median") == 5
+
+def test_empty_accumulator():
+    """Тест пустого накопителя: результат 0."""
+    assert Accumulator().result("max") == 0
+
+def test_string_value_error():
+    """Тест ошибки при добавлении строкового значения."""
+    with pytest.raises(ValueError, match="Агрегация для строк не предусмотрена"):
+        Accumulator().add("apple")
+
+def test_quantile_results():
+    """Тест точного и приближенного квантиля в накопителе."""
+    exact = Accumulator.for_aggregate("p90")
+    approximate = Accumulator.for_aggregate("p90", approximate=True)
+    for value in range(1, 1001):
+        exact.add(value)
+        approximate.add(value)
+    assert exact.result("p90") == pytest.approx(900.1)
+    assert approximate.values is None
+    assert approximate.result("p90") == pytest.approx(900.1, abs=5)
+
+def test_unknown_aggregate_error():
+    """Тест ошибки для неизвестного типа агрегации."""
+    with pytest.raises(ValueError, match="Неизвестный тип агрегации"):
+        Accumulator().result("p101")
+
+def test_sum_and_count():
+    """Тест суммы и количества значений."""
+    accumulator = Accumulator.for_aggregates(("sum", "count"))
+    for value in (2, 3.5, 4):
+        accumulator.add(value)
+    assert accumulator.result("sum") == 9.5
+    assert accumulator.result("count") == 3
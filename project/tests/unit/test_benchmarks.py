@@ -0,0 +1,39 @@
+# test_benchmarks.py
+import csv
+import pytest
+from benchmarks.generate import generate_csv, parse_rows
+from benchmarks.run import compare, run_benchmarks
+
+def test_generator_is_deterministic(tmp_path):
+    """Тест генератора: одинаковые параметры дают одинаковый файл, кардинальность задается параметрами."""
+    first, second = tmp_path / "first.csv", tmp_path / "second.csv"
+    generate_csv(str(first), 500, extra_columns=2, brands=3, cardinality=5)
+    generate_csv(str(second), 500, extra_columns=2, brands=3, cardinality=5)
+    assert first.read_bytes() == second.read_bytes()
+
+    with open(first, newline="") as csvfile:
+        rows = list(csv.DictReader(csvfile))
+    assert list(rows[0]) == ["name", "brand", "price", "rating", "attr_1", "attr_2"]
+    assert len(rows) == 500
+    assert len({row["brand"] for row in rows}) == 3
+    assert len({row["attr_2"] for row in rows}) == 5
+
+def test_parse_rows():
+    """Тест разбора размера набора данных."""
+    assert parse_rows("10k") == 10_000
+    assert parse_rows("10M") == 10_000_000
+    assert parse_rows("2_500") == 2500
+    with pytest.raises(ValueError, match="Некорректное количество строк"):
+        parse_rows("many")
+
+def test_run_and_compare(tmp_path):
+    """Тест запуска замеров в отдельном процессе и сравнения отчетов."""
+    report = run_benchmarks(["200"], ["parse", "aggregate_max"], repeat=1, data_dir=str(tmp_path))
+    assert [(result["case"], result["rows"]) for result in report["results"]] == [("parse", 200), ("aggregate_max", 200)]
+    assert all(result["best"] > 0 and result["rows_per_second"] > 0 for result in report["results"])
+    with pytest.raises(ValueError, match="Неизвестные замеры"):
+        run_benchmarks(["200"], ["unknown"], data_dir=str(tmp_path))
+
+    slower = {"results": [dict(result, best=result["best"] * 2) for result in report["results"]]}
+    assert [row["regression"] for row in compare(report, slower)] == [True, True]
+    assert [row["regression"] for row in compare(slower, report)] == [False, False]
@@ -0,0 +1,105 @@
+# test_compression.py
+import bz2
+import gzip
+import struct
+import zlib
+import pytest
+from unittest.mock import patch
+from project.model import compression
+from project.model.compression import detect_compression, open_binary, open_text
+from project.model.csv_parser import CSVParser
+from project.model.index import SecondaryIndex
+
+CSV_CONTENT = (
+    'name,brand,price,rating\n'
+    'iphone 15 pro,apple,999,4.9\n'
+    '"redmi, note 12",xiaomi,199,4.6\n'
+    '"poco\nx5 pro",xiaomi,299,4.4\n'
+    'iphone se,apple,429,4.1\n'
+)
+
+def write_bgzf(path, data, block_size):
+    """Записывает данные в формате BGZF (bgzip): независимые gzip-блоки с размером в заголовке."""
+    with open(path, "wb") as file:
+        for start in range(0, len(data), block_size):
+            block = data[start:start + block_size]
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+            deflated = compressor.compress(block) + compressor.flush()
+            size = 18 + len(deflated) + 8
+            file.write(b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00" + struct.pack("<H", size - 1))
+            file.write(deflated + struct.pack("<II", zlib.crc32(block), len(block)))
+
+@pytest.fixture(params=["gzip", "bz2", "bgzf"])
+def compressed_file(request, tmp_path):
+    """
+    Фикстура создает сжатый CSV-файл в одном из форматов.
+    """
+    data = CSV_CONTENT.encode("utf-8")
+    path = tmp_path / "products.csv.gz"
+    if request.param == "gzip":
+        path.write_bytes(gzip.compress(data))
+    elif request.param == "bz2":
+        path = tmp_path / "products.csv.bz2"
+        path.write_bytes(bz2.compress(data))
+    else:
+        write_bgzf(path, data, 16)
+    return str(path)
+
+def test_detect_compression(compressed_file, tmp_path):
+    """Тест определения формата по сигнатуре, а не по расширению файла."""
+    plain = tmp_path / "plain.csv.gz"
+    plain.write_text(CSV_CONTENT, encoding="utf-8")
+    assert detect_compression(str(plain)) is None
+    assert detect_compression(compressed_file) in ("gzip", "bz2", "bgzf")
+
+def test_compressed_file_reads_like_plain(compressed_file, tmp_path):
+    """Тест чтения сжатого файла: строки, таблица и схема те же, что у несжатого."""
+    plain = tmp_path / "products.csv"
+    plain.write_text(CSV_CONTENT, encoding="utf-8")
+    plain = str(plain)
+
+    assert CSVParser.parse(compressed_file) == CSVParser.parse(plain)
+    assert list(CSVParser.iter_rows(compressed_file, ["name", "price"])) == \
+        list(CSVParser.iter_rows(plain, ["name", "price"]))
+    assert CSVParser.parse_table(compressed_file).to_dict() == CSVParser.parse_table(plain).to_dict()
+    assert CSVParser.infer_schema(compressed_file) == CSVParser.infer_schema(plain)
+
+def test_bgzf_blocks_are_inflated_in_parallel(tmp_path):
+    """Тест параллельной распаковки блоков BGZF: порядок данных сохраняется."""
+    data = "".join(f"item {i},brand {i % 7},{i}\n" for i in range(20000)).encode("utf-8")
+    path = str(tmp_path / "items.csv.gz")
+    write_bgzf(path, data, 1000)
+
+    with patch.object(compression, "SPAN_SIZE", 4096), \
+            patch.object(compression, "_parallel_chunks", wraps=compression._parallel_chunks) as parallel:
+        with open_binary(path, workers=4) as file:
+            assert file.read() == data
+    parallel.assert_called_once()
+    with open_binary(path, workers=1) as file:
+        assert file.read() == data
+
+def test_zstd_requires_package(tmp_path):
+    """Тест файла zstd без установленного пакета zstandard."""
+    path = tmp_path / "products.csv.zst"
+    path.write_bytes(b"\x28\xb5\x2f\xfd" + b"\x00" * 16)
+    with patch.object(compression, "zstandard", None):
+        with pytest.raises(ValueError, match="нужен пакет zstandard"):
+            open_text(str(path))
+
+def test_zstd_frames_are_read_in_order(tmp_path):
+    """Тест многокадрового zstd: кадры распаковываются параллельно и склеиваются по порядку."""
+    zstandard = pytest.importorskip("zstandard")
+    data = CSV_CONTENT.encode("utf-8") * 50
+    path = tmp_path / "products.csv.zst"
+    compressor = zstandard.ZstdCompressor()
+    path.write_bytes(b"".join(compressor.compress(data[i:i + 100]) for i in range(0, len(data), 100)))
+
+    assert len(compression._zstd_frames(str(path))) == -(-len(data) // 100)
+    for workers in (1, 4):
+        with open_binary(str(path), workers=workers) as file:
+            assert file.read() == data
+
+def test_index_requires_plain_file(compressed_file):
+    """Тест построения индекса по сжатому файлу: смещения записей в нем не определены."""
+    with pytest.raises(ValueError, match="несжатого"):
+        SecondaryIndex.build(compressed_file, "brand")
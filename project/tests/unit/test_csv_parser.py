@@ -1,5 +1,6 @@
 # test_csv_parser.py
 import pytest
+from collections.abc import Mapping
 from pathlib import Path
 from project.model.csv_parser import CSVParser
 
@@ -27,13 +28,13 @@ def test_parse_returns_list_of_dicts(sample_csv):
     """
     Тест проверяет базовую функциональность парсера:
     1. Возвращаемый тип - список
-    2. Каждый элемент списка - словарь
-    3. Ключи словаря соответствуют заголовкам CSV
+    2. Каждый элемент списка читается как словарь (запись Record)
+    3. Ключи записи соответствуют заголовкам CSV
     """
     result = CSVParser.parse(sample_csv)
     
     assert isinstance(result, list)  # Проверяем тип возвращаемого значения
-    assert all(isinstance(item, dict) for item in result)  # Все элементы - словари
+    assert all(isinstance(item, Mapping) for item in result)  # Все элементы - отображения
     assert set(result[0].keys()) == {"name", "brand", "price", "rating"}  # Проверяем ключи
 
 def test_parse_correct_values(sample_csv):
@@ -72,4 +73,16 @@ def test_parse_file_not_found():
     если оно не будет выброшено или будет другого типа, тест завершится с ошибкой.
     """
     with pytest.raises(FileNotFoundError):
-        CSVParser.parse("non_existent_file.csv")
\ No newline at end of file
+        CSVParser.parse("non_existent_file.csv")
+
+def test_iter_rows_streams_rows(sample_csv):
+    """
+    Тест проверяет потоковое чтение:
+    1. Возвращается итератор, а не список
+    2. Строки выдаются по одной в порядке файла
+    """
+    rows = CSVParser.iter_rows(sample_csv)
+
+    assert not isinstance(rows, list)  # Данные не материализуются целиком
+    assert next(rows)["name"] == "iphone 15 pro"
+    assert [row["brand"] for row in rows] == ["samsung", "xiaomi"]
@@ -1,8 +1,13 @@
 # test_dispatcher.py
+import gzip
+import json
 import pytest
 from unittest.mock import patch, MagicMock
 from argparse import Namespace
 from project.controller.dispatcher import CLIArgumentsDispatcher
+from project.model.csv_parser import CSVParser
+from project.model.schema import Schema
+from project.model.table import Table
 from typing import List, Dict, Any
 
 @pytest.fixture
@@ -54,6 +59,49 @@ class TestProcessorPipeline:
         # (999 + 1199 + 199) / 3 ≈ 799.0
         assert result["avg"][0] == pytest.approx(799.0, 0.1)
         
+    def test_pipeline_with_multiple_aggregates(self, sample_csv_data, mock_args):
+        """Тест нескольких агрегатов по разным полям в одной таблице результата."""
+        mock_args.aggregate = "price=min,price=max,price=avg,rating=median"
+        result = CLIArgumentsDispatcher._processor_pipeline(iter(sample_csv_data), mock_args)
+        assert result == {"price_min": [199], "price_max": [1199], "price_avg": [799], "rating_median": [4.8]}
+
+    def test_pipeline_with_group_by(self, sample_csv_data, mock_args):
+        """Тест группировки с лимитом: лимит применяется к группам, а не к строкам."""
+        mock_args.group_by = "brand"
+        mock_args.aggregate = "price=max"
+        mock_args.limit = 1
+        result = CLIArgumentsDispatcher._processor_pipeline(iter(sample_csv_data), mock_args)
+        assert result == {"brand": ["apple"], "max": [999]}
+
+    def test_pipeline_group_by_order(self, sample_csv_data, mock_args):
+        """Тест сортировки с группировкой: порядок задается группам до лимита; по другому полю - ошибка."""
+        mock_args.group_by = "brand"
+        mock_args.aggregate = "price=max"
+        mock_args.order_by = "brand=desc"
+        mock_args.limit = 2
+        table = Table.from_rows(["brand", "price"], [[row["brand"], row["price"]] for row in sample_csv_data])
+        for data in (iter(sample_csv_data), table):
+            result = CLIArgumentsDispatcher._processor_pipeline(data, mock_args)
+            assert result == {"brand": ["xiaomi", "samsung"], "max": [199, 1199]}
+        mock_args.order_by = "price=desc"
+        with pytest.raises(ValueError, match="по полю группировки brand"):
+            CLIArgumentsDispatcher._processor_pipeline(iter(sample_csv_data), mock_args)
+
+    def test_pipeline_with_stream(self, sample_csv_data, mock_args):
+        """Тест конвейера над потоковым итератором строк."""
+        mock_args.where = "price>500"
+        mock_args.aggregate = "rating=min"
+        result = CLIArgumentsDispatcher._processor_pipeline(iter(sample_csv_data), mock_args)
+        assert result == {"min": [4.8]}
+
+    def test_pipeline_with_schema(self, sample_csv_data, mock_args):
+        """Тест конвейера с заданной схемой колонок."""
+        mock_args.where = "rating>=4.8"
+        mock_args.aggregate = "price=avg"
+        schema = Schema.parse("price:int,rating:float")
+        result = CLIArgumentsDispatcher._processor_pipeline(sample_csv_data, mock_args, schema)
+        assert result == {"avg": [1099]}
+
     def test_pipeline_full_flow(self, sample_csv_data, mock_args):
         """Тест полного конвейера обработки (where -> order_by -> aggregate)."""
         mock_args.where = "rating>4.6"
@@ -63,16 +111,60 @@ class TestProcessorPipeline:
         assert "max" in result
         assert result["max"][0] == 1199  # galaxy (после фильтрации и сортировки)
 
+    def test_pipeline_with_table(self, mock_args):
+        """Тест конвейера над колоночной таблицей."""
+        table = Table.from_rows(["name", "price"], [["iphone", "999"], ["redmi", "199"]])
+        mock_args.where = "price>500"
+        result = CLIArgumentsDispatcher._processor_pipeline(table, mock_args)
+        assert result == {"name": ["iphone"], "price": ["999"]}
+
+    def test_pipeline_with_limit(self, sample_csv_data, mock_args):
+        """Тест конвейера с сортировкой и лимитом (top-K)."""
+        mock_args.order_by = "price=desc"
+        mock_args.limit = 2
+        result = CLIArgumentsDispatcher._processor_pipeline(iter(sample_csv_data), mock_args)
+        assert [item["name"] for item in result] == ["galaxy", "iphone"]
+
+    def test_limit_does_not_truncate_aggregate_input(self, sample_csv_data, mock_args):
+        """Тест лимита вместе с агрегацией: агрегат считается по всем строкам."""
+        mock_args.order_by = "price=desc"
+        mock_args.aggregate = "price=min"
+        mock_args.limit = 1
+        result = CLIArgumentsDispatcher._processor_pipeline(sample_csv_data, mock_args)
+        assert result == {"min": [199]}
+
+    def test_pipeline_with_sort_memory(self, sample_csv_data, mock_args):
+        """Тест конвейера с внешней сортировкой при маленьком бюджете памяти."""
+        mock_args.order_by = "price=asc"
+        mock_args.sort_memory = "1"
+        result = CLIArgumentsDispatcher._processor_pipeline(iter(sample_csv_data), mock_args)
+        assert [item["price"] for item in result] == ["199", "999", "1199"]
+
+    def test_referenced_fields(self, mock_args):
+        """Тест выбора полей для чтения: при агрегации нужны только поля запроса."""
+        assert CLIArgumentsDispatcher._referenced_fields(mock_args) is None
+        mock_args.where = "brand=apple"
+        mock_args.aggregate = "price=max"
+        assert CLIArgumentsDispatcher._referenced_fields(mock_args) == {"brand", "price"}
+
+# Файл, в котором индекс brand избирателен: apple - 2 записи из 7
+INDEXED_CSV = (
+    "name,brand,price\niphone,apple,999\ngalaxy,samsung,1199\nse,apple,429\nredmi,xiaomi,199\n"
+    "pixel,google,899\nnord,oneplus,499\nmate,huawei,799\n"
+)
+
 class TestCLIArgumentsDispatcher:
     """Тестирование основного диспетчера командной строки."""
     
     @patch('project.controller.dispatcher.CLIArgumentParser')
-    @patch('project.controller.dispatcher.CSVParser.parse')
+    @patch('project.controller.dispatcher.CSVParser.infer_schema')
+    @patch('project.controller.dispatcher.CSVParser.iter_rows')
     @patch('project.controller.dispatcher.print_results')
     def test_run_method(
         self, 
         mock_print_results, 
         mock_parse, 
+        mock_infer_schema,
         mock_parser,
         sample_csv_data
     ):
@@ -95,11 +187,13 @@ class TestCLIArgumentsDispatcher:
         
         # Проверки
         mock_parser.assert_called_once()
-        mock_parse.assert_called_once_with("test.csv")
+        mock_infer_schema.assert_called_once_with("test.csv")
+        mock_parse.assert_called_once_with("test.csv", None)
         mock_print_results.assert_called_once_with(sample_csv_data)
         
     @patch('project.controller.dispatcher.CLIArgumentParser')
-    def test_argument_definitions(self, mock_parser):
+    @patch('project.controller.dispatcher.CSVParser')
+    def test_argument_definitions(self, mock_csv_parser, mock_parser):
         """Тест корректности определения аргументов командной строки."""
         # Создаем mock для парсера
         mock_parser_instance = MagicMock()
@@ -111,4 +205,195 @@ class TestCLIArgumentsDispatcher:
         # Проверяем что все аргументы были добавлены
         calls = mock_parser_instance.add_argument.call_args_list
         added_args = {call[0][0].lstrip('-') for call in calls}
-        assert added_args == {'file', 'where', 'aggregate', 'order-by'}
\ No newline at end of file
+        assert added_args == {'file', 'where', 'aggregate', 'order-by', 'engine', 'schema', 'workers',
+                              'cache-dir', 'cache-size', 'limit', 'sort-memory', 'group-by', 'max-groups', 'approx',
+                              'server', 'result-cache', 'result-cache-size', 'result-ttl', 'output',
+                              'profile', 'explain', 'select'}
+
+    @patch('project.controller.dispatcher.print_results')
+    def test_index_build_and_lookup(self, mock_print_results, tmp_path):
+        """Тест команды index build и чтения по индексу при фильтрации."""
+        csv_file = tmp_path / "products.csv"
+        csv_file.write_text(INDEXED_CSV)
+
+        CLIArgumentsDispatcher.run(['index', 'build', '--file', str(csv_file), '--column', 'brand'])
+        info = mock_print_results.call_args[0][0]
+        assert info["kind"] == ["str"] and info["distinct"] == [6]
+
+        with patch('project.controller.dispatcher.CSVParser.iter_rows') as mock_iter_rows:
+            CLIArgumentsDispatcher.run(['--file', str(csv_file), '--where', 'brand=apple AND price>500'])
+        mock_iter_rows.assert_not_called()
+        assert mock_print_results.call_args[0][0] == [{"name": "iphone", "brand": "apple", "price": "999"}]
+
+    @patch('project.controller.dispatcher.print_results')
+    def test_result_cache(self, mock_print_results, tmp_path):
+        """Тест кэша результатов: повторный запрос не читает файл."""
+        csv_file = tmp_path / "products.csv"
+        csv_file.write_text("name,brand,price\niphone,apple,999\ngalaxy,samsung,1199\nse,apple,429\n")
+        argv = ['--file', str(csv_file), '--result-cache', str(tmp_path / "results"),
+                '--where', 'brand=apple', '--aggregate', 'price=max']
+
+        CLIArgumentsDispatcher.run(argv)
+        with patch('project.controller.dispatcher.CSVParser') as mock_csv_parser:
+            CLIArgumentsDispatcher.run(argv[:-2] + ['--aggregate', ' price = max '])
+        mock_csv_parser.iter_rows.assert_not_called()
+        assert mock_print_results.call_args_list[0] == mock_print_results.call_args_list[1]
+        assert mock_print_results.call_args[0][0] == {"max": [999]}
+
+    @patch('project.controller.dispatcher.print_results')
+    def test_result_cache_keeps_fused_filter(self, mock_print_results, tmp_path, capsys):
+        """Тест кэша результатов в однократном запуске: фильтр по-прежнему выполняется в цикле агрегации."""
+        csv_file = tmp_path / "products.csv"
+        csv_file.write_text("name,brand,price\niphone,apple,999\ngalaxy,samsung,1199\nse,apple,429\n")
+        CLIArgumentsDispatcher.run(['--file', str(csv_file), '--result-cache', str(tmp_path / "results"),
+                                    '--where', 'brand=apple', '--aggregate', 'price=max', '--profile', 'json'])
+        stages = [stage["stage"] for stage in json.loads(capsys.readouterr().err)["stages"]]
+        assert "where+aggregate" in stages and "where" not in stages
+        assert mock_print_results.call_args[0][0] == {"max": [999]}
+
+    def test_streaming_output(self, tmp_path, capsys):
+        """Тест потокового формата вывода: строки не собираются в список и выводятся в CSV."""
+        csv_file = tmp_path / "products.csv"
+        csv_file.write_text("name,brand,price\niphone,apple,999\ngalaxy,samsung,1199\nse,apple,429\n")
+        args = Namespace(file=str(csv_file), where="brand=apple", aggregate=None, order_by=None, output="csv")
+        assert not isinstance(CLIArgumentsDispatcher._processor_pipeline(iter([]), args), list)
+
+        CLIArgumentsDispatcher.run(['--file', str(csv_file), '--where', 'brand=apple', '--output', 'csv'])
+        assert capsys.readouterr().out == "name,brand,price\niphone,apple,999\nse,apple,429\n"
+        CLIArgumentsDispatcher.run(['--file', str(csv_file), '--group-by', 'brand', '--output', 'jsonl'])
+        assert capsys.readouterr().out == '{"brand": "apple", "count": 2}\n{"brand": "samsung", "count": 1}\n'
+
+    def test_output_same_on_engines(self, tmp_path, capsys):
+        """Тест вывода строк: числа выводятся как в CSV, вывод не зависит от движка."""
+        csv_file = tmp_path / "amounts.csv"
+        csv_file.write_text("id,weight,amount\nA,1e3,99999999999999999999\nB,2.50,5\n")
+        for output in ('csv', 'jsonl'):
+            outputs = []
+            for engine in ('stream', 'columnar'):
+                CLIArgumentsDispatcher.run(['--file', str(csv_file), '--engine', engine, '--output', output,
+                                            '--order-by', 'id=asc'])
+                outputs.append(capsys.readouterr().out)
+            assert outputs[0] == outputs[1]
+        assert outputs[0].splitlines()[0] == '{"id": "A", "weight": "1e3", "amount": "99999999999999999999"}'
+
+    @patch('project.controller.dispatcher.print_results')
+    def test_explain_and_profile(self, mock_print_results, tmp_path, capsys):
+        """Тест --explain (план с индексом без выполнения запроса) и --profile json (замер этапов в stderr)."""
+        csv_file = tmp_path / "products.csv"
+        csv_file.write_text(INDEXED_CSV)
+        CLIArgumentsDispatcher.run(['index', 'build', '--file', str(csv_file), '--column', 'brand'])
+        capsys.readouterr()
+        mock_print_results.reset_mock()
+
+        CLIArgumentsDispatcher.run(['--file', str(csv_file), '--where', 'brand=apple',
+                                    '--order-by', 'price=desc', '--limit', '1', '--explain', 'json'])
+        plan = {step["step"]: step["plan"] for step in json.loads(capsys.readouterr().out)}
+        mock_print_results.assert_not_called()
+        assert "индекс brand: 2 записей-кандидатов из 7" in plan["read"]
+        assert "top-K" in plan["order_by"] and "limit" not in plan
+
+        CLIArgumentsDispatcher.run(['--file', str(csv_file), '--where', 'price>500',
+                                    '--aggregate', 'price=max', '--profile', 'json'])
+        mock_print_results.assert_called_once_with({"max": [1199]})
+        report = json.loads(capsys.readouterr().err)
+        stages = {stage["stage"]: stage for stage in report["stages"]}
+        assert list(stages) == ["read", "where+aggregate", "output"]
+        assert stages["read"]["rows_out"] == 7 and stages["read"]["bytes_read"] == csv_file.stat().st_size
+        assert stages["where+aggregate"]["rows_in"] == 7 and stages["where+aggregate"]["rows_out"] == 1
+        assert report["total"]["peak_memory"] > 0
+
+    @patch('project.controller.dispatcher.print_results')
+    def test_select(self, mock_print_results, tmp_path):
+        """Тест --select: читаются только нужные колонки, выводятся выбранные на всех движках."""
+        csv_file = tmp_path / "products.csv"
+        csv_file.write_text("name,brand,price,rating\niphone,apple,999,4.9\ngalaxy,samsung,1199,4.8\nse,apple,429,4.1\n")
+        argv = ['--file', str(csv_file), '--where', 'brand=apple', '--order-by', 'price=asc', '--select', 'price,name']
+
+        with patch('project.controller.dispatcher.CSVParser.iter_rows', wraps=CSVParser.iter_rows) as mock_iter_rows:
+            CLIArgumentsDispatcher.run(argv)
+        assert mock_iter_rows.call_args[0][1] == {"name", "price", "brand"}
+        expected = [{"price": "429", "name": "se"}, {"price": "999", "name": "iphone"}]
+        assert mock_print_results.call_args[0][0] == expected
+
+        with patch('project.controller.dispatcher.CSVParser.parse_table', wraps=CSVParser.parse_table) as mock_parse:
+            CLIArgumentsDispatcher.run(argv + ['--engine', 'columnar'])
+        assert mock_parse.call_args[0][2] == {"name", "price", "brand"}
+        assert mock_print_results.call_args[0][0] == {"price": ["429", "999"], "name": ["se", "iphone"]}
+        CLIArgumentsDispatcher.run(argv + ['--workers', '2'])
+        assert mock_print_results.call_args[0][0] == expected
+
+        with pytest.raises(ValueError, match="Колонка не найдена: cost"):
+            CLIArgumentsDispatcher.run(['--file', str(csv_file), '--select', 'name,cost'])
+        with pytest.raises(ValueError, match="несовместим с агрегацией"):
+            CLIArgumentsDispatcher.run(['--file', str(csv_file), '--select', 'name', '--aggregate', 'price=max'])
+
+    @patch('project.controller.dispatcher.print_results')
+    def test_mixed_column_engines_agree(self, mock_print_results, tmp_path):
+        """Тест колонки со смешанными значениями: число в условии находит строки на обоих движках."""
+        csv_file = tmp_path / "codes.csv"
+        csv_file.write_text("code,price\n123,10\nabc,20\n123,30\n")
+
+        for engine in ('stream', 'columnar'):
+            CLIArgumentsDispatcher.run(['--file', str(csv_file), '--engine', engine,
+                                        '--where', 'code=123', '--aggregate', 'price=sum'])
+        assert mock_print_results.call_args_list[0][0][0] == {"sum": [40]}
+        assert mock_print_results.call_args_list[1][0][0] == {"sum": [40]}
+
+        CLIArgumentsDispatcher.run(['--file', str(csv_file), '--where', "code='123'", '--schema', 'code:str'])
+        assert mock_print_results.call_args[0][0] == [{"code": "123", "price": "10"}, {"code": "123", "price": "30"}]
+
+    @patch('project.controller.dispatcher.print_results')
+    def test_str_schema_literal_engines_agree(self, mock_print_results, tmp_path):
+        """Тест значения без кавычек для строковой колонки схемы: 007 не равно 7 на обоих движках."""
+        csv_file = tmp_path / "codes.csv"
+        csv_file.write_text("code,price\n007,1\n7,2\n")
+
+        for where in ("code=007", "code IN (007, 8)", "code BETWEEN 006 AND 0071"):
+            for engine in ('stream', 'columnar'):
+                CLIArgumentsDispatcher.run(['--file', str(csv_file), '--engine', engine, '--schema', 'code:str',
+                                            '--where', where, '--aggregate', 'price=sum'])
+                assert mock_print_results.call_args[0][0] == {"sum": [1]}, (where, engine)
+        CLIArgumentsDispatcher.run(['--file', str(csv_file), '--where', 'code=007', '--aggregate', 'price=sum'])
+        assert mock_print_results.call_args[0][0] == {"sum": [3]}
+
+    @patch('project.controller.dispatcher.print_results')
+    def test_like_numbers_engines_agree(self, mock_print_results, tmp_path):
+        """Тест LIKE по числовым колонкам: шаблон сопоставляется с записью из CSV на обоих движках."""
+        csv_file = tmp_path / "ratings.csv"
+        csv_file.write_text("code,price,rating\n007,4.50,5\n12,10.00,4.5\n70,5.00,5.0\n")
+
+        for where in ("rating LIKE '5'", "rating LIKE '5.0'", "price LIKE '%.50'", "code LIKE '0%'"):
+            results = []
+            for engine in ('stream', 'columnar'):
+                CLIArgumentsDispatcher.run(['--file', str(csv_file), '--engine', engine,
+                                            '--where', where, '--aggregate', 'price=count'])
+                results.append(mock_print_results.call_args[0][0])
+            assert results[0] == results[1] == {"count": [1]}, where
+
+    @patch('project.controller.dispatcher.print_results')
+    def test_compressed_input(self, mock_print_results, tmp_path):
+        """Тест сжатого входного файла: результат тот же на потоковом и колоночном движках."""
+        csv_file = tmp_path / "products.csv.gz"
+        csv_file.write_bytes(gzip.compress(b"name,brand,price\niphone,apple,999\ngalaxy,samsung,1199\nse,apple,429\n"))
+
+        for engine in ('stream', 'columnar'):
+            CLIArgumentsDispatcher.run(['--file', str(csv_file), '--engine', engine,
+                                        '--where', 'brand=apple', '--aggregate', 'price=max'])
+        assert mock_print_results.call_args_list[0][0][0] == {"max": [999]}
+        assert mock_print_results.call_args_list[1][0][0] == {"max": [999]}
+
+    @patch('project.controller.dispatcher.print_results')
+    def test_glob_input_shards(self, mock_print_results, tmp_path):
+        """Тест шаблона --file: шарды обрабатываются вместе, несовпадение колонок - ошибка."""
+        (tmp_path / "2026-01.csv").write_text("brand,price\napple,999\nxiaomi,199\n")
+        (tmp_path / "2026-02.csv").write_text("price,brand\n1199,apple\n")
+        pattern = str(tmp_path / "2026-*.csv")
+
+        CLIArgumentsDispatcher.run(['--file', pattern, '--group-by', 'brand', '--aggregate', 'price=max'])
+        mock_print_results.assert_called_once_with({"brand": ["apple", "xiaomi"], "max": [1199, 199]})
+
+        (tmp_path / "2026-03.csv").write_text("brand,cost\napple,1\n")
+        with pytest.raises(ValueError, match="Колонки файла .*2026-03.csv не совпадают"):
+            CLIArgumentsDispatcher.run(['--file', pattern, '--aggregate', 'price=max'])
+        with pytest.raises(ValueError, match="Нет файлов"):
+            CLIArgumentsDispatcher.run(['--file', str(tmp_path / "2025-*.csv")])
@@ -0,0 +1,38 @@
+# test_external_sort.py
+import pytest
+from project.model import external_sort
+from project.model.external_sort import ExternalSort
+from project.model.processors import OrderBy
+
+@pytest.fixture
+def rows():
+    """
+    Фикстура предоставляет строки с повторяющимися ключами сортировки,
+    чтобы проверить устойчивость порядка равных элементов.
+    """
+    return [{"id": str(i), "price": str((i * 37) % 11)} for i in range(300)]
+
+@pytest.mark.parametrize("direction", ["asc", "desc"])
+def test_spilled_sort_matches_in_memory_sort(rows, tmp_path, direction):
+    """Тест сортировки со сбросом фрагментов на диск: порядок совпадает с OrderBy."""
+    expected = OrderBy.execute(rows, ("price", "=", direction))
+    result = ExternalSort.iter_sorted(iter(rows), ("price", "=", direction), 2048, temp_dir=str(tmp_path))
+    assert list(result) == expected
+
+def test_multi_pass_merge(rows, tmp_path, monkeypatch):
+    """Тест многопроходного слияния при большом числе фрагментов."""
+    monkeypatch.setattr(external_sort, "MAX_MERGE_FANIN", 3)
+    monkeypatch.setattr(external_sort, "BATCH_SIZE", 4)
+    result = ExternalSort.iter_sorted(rows, ("price", "=", "asc"), 1, temp_dir=str(tmp_path))
+    assert list(result) == OrderBy.execute(rows, ("price", "=", "asc"))
+
+def test_fits_in_memory(rows, tmp_path):
+    """Тест данных в пределах бюджета: временные файлы не создаются."""
+    result = list(ExternalSort.iter_sorted(rows, ("price", "=", "asc"), 1 << 30, temp_dir=str(tmp_path)))
+    assert len(result) == 300
+    assert list(tmp_path.iterdir()) == []
+
+def test_invalid_direction(rows):
+    """Тест ошибки при некорректном направлении сортировки."""
+    with pytest.raises(ValueError, match="Направление сортировки должно быть 'asc' или 'desc'"):
+        list(ExternalSort.iter_sorted(rows, ("price", "=", "up"), 1024))
@@ -0,0 +1,68 @@
+# test_grouping.py
+import random
+import pytest
+from project.model.grouping import HashAggregate
+from project.model.table import Table
+
+@pytest.fixture
+def sample_data():
+    """
+    Фикстура предоставляет строки нескольких брендов для группировки.
+    """
+    return [
+        {"name": "iphone", "brand": "apple", "price": "999"},
+        {"name": "galaxy", "brand": "samsung", "price": "1199"},
+        {"name": "redmi", "brand": "xiaomi", "price": "199"},
+        {"name": "poco", "brand": "xiaomi", "price": "299"},
+        {"name": "se", "brand": "apple", "price": "429"},
+    ]
+
+EXPRESSIONS = [("price", "=", "min"), ("price", "=", "avg"), ("price", "=", "count"), ("price", "=", "median")]
+
+def test_group_aggregates(sample_data):
+    """Тест агрегатов по группам за один проход, группы упорядочены по ключу."""
+    result = HashAggregate.execute(iter(sample_data), "brand", EXPRESSIONS)
+    assert result == {
+        "brand": ["apple", "samsung", "xiaomi"],
+        "min": [429, 1199, 199],
+        "avg": [714, 1199, 249],
+        "count": [2, 1, 2],
+        "median": [714, 1199, 249],
+    }
+
+def test_table_matches_stream(sample_data):
+    """Тест группировки колоночной таблицы: результат совпадает с потоковым."""
+    header = list(sample_data[0])
+    table = Table.from_rows(header, [[row[name] for name in header] for row in sample_data])
+    assert HashAggregate.execute(table, "brand", EXPRESSIONS) == HashAggregate.execute(sample_data, "brand", EXPRESSIONS)
+
+def test_count_of_string_field(sample_data):
+    """Тест количества строк группы по строковому полю."""
+    result = HashAggregate.execute(sample_data, "brand", [("name", "=", "count")])
+    assert result == {"brand": ["apple", "samsung", "xiaomi"], "count": [2, 1, 2]}
+
+def test_spill_matches_in_memory(tmp_path):
+    """Тест сброса групп на диск: результат совпадает с агрегацией в памяти."""
+    rng = random.Random(5)
+    rows = [{"key": str(rng.randint(0, 300)), "value": str(rng.randint(0, 1000))} for _ in range(5000)]
+    expressions = [("value", "=", "sum"), ("value", "=", "p90")]
+    expected = HashAggregate.execute(rows, "key", expressions)
+    spilled = HashAggregate.execute(iter(rows), "key", expressions, max_groups=10, temp_dir=str(tmp_path))
+    assert spilled == expected
+    assert len(spilled["key"]) == 301
+
+def test_merge_partial_groups(sample_data):
+    """Тест объединения частичных таблиц групп разных частей данных."""
+    groups = HashAggregate.accumulate(sample_data[:3], "brand", EXPRESSIONS)
+    HashAggregate.merge(groups, HashAggregate.accumulate(sample_data[3:], "brand", EXPRESSIONS))
+    result = HashAggregate.result_table("brand", EXPRESSIONS, HashAggregate.layout(EXPRESSIONS), groups.items())
+    assert result == HashAggregate.execute(sample_data, "brand", EXPRESSIONS)
+
+def test_empty_input():
+    """Тест группировки пустых данных: групп нет."""
+    assert HashAggregate.execute(iter([]), "brand", EXPRESSIONS) == {}
+
+def test_invalid_max_groups(sample_data):
+    """Тест ошибки при неположительном количестве групп в памяти."""
+    with pytest.raises(ValueError, match="Количество групп в памяти"):
+        HashAggregate.execute(sample_data, "brand", EXPRESSIONS, max_groups=0)
@@ -0,0 +1,110 @@
+# test_index.py
+import os
+import pytest
+from project.model.csv_parser import CSVParser
+from project.model.index import IndexedReader, SecondaryIndex, index_path
+from project.model.predicates import PredicateParser
+from project.model.processors import Where
+from project.model.schema import Schema
+
+CSV_CONTENT = (
+    'name,brand,price,rating\n'
+    'iphone 15 pro,apple,999,4.9\n'
+    'galaxy s23,samsung,1199,4.8\n'
+    '"redmi, note 12",xiaomi,199,4.6\n'
+    '"poco\nx5 pro",xiaomi,299,4.4\n'
+    'iphone se,apple,429,4.1\n'
+    'galaxy a54,samsung,349,4.2\n'
+)
+
+@pytest.fixture
+def csv_file(tmp_path):
+    """
+    Фикстура создает CSV-файл, в том числе с записями в кавычках и переводом строки.
+    """
+    path = tmp_path / "products.csv"
+    path.write_text(CSV_CONTENT, encoding="utf-8")
+    return str(path)
+
+def scan(csv_file, condition, schema):
+    """Эталонный результат: полный просмотр файла."""
+    return list(Where.execute(CSVParser.iter_rows(csv_file), PredicateParser.parse(condition), schema))
+
+def indexed(csv_file, condition, schema):
+    predicate = PredicateParser.parse(condition)
+    rows = IndexedReader.iter_rows(csv_file, predicate, schema)
+    return None if rows is None else list(Where.execute(rows, predicate, schema))
+
+def test_build_writes_sidecar_file(csv_file):
+    """Тест построения индекса: файл рядом с CSV и сведения об индексе."""
+    info = SecondaryIndex.build(csv_file, "brand")
+    assert info["index"] == index_path(csv_file, "brand")
+    assert os.path.exists(info["index"])
+    assert (info["kind"], info["rows"], info["distinct"]) == ("str", 6, 3)
+
+@pytest.mark.parametrize("condition", [
+    "brand=apple",
+    "brand=xiaomi",
+    "brand IN (apple, samsung)",
+    "brand=apple AND price>500",
+    "brand=huawei",
+    "price>=349",
+    "price<349",
+    "price BETWEEN 299 AND 999",
+    "price=999 OR brand=xiaomi",
+    "NOT brand=apple AND price>300",
+])
+def test_indexed_lookup_matches_scan(csv_file, condition):
+    """Тест чтения по индексам: результат совпадает с полным просмотром файла."""
+    SecondaryIndex.build(csv_file, "brand")
+    SecondaryIndex.build(csv_file, "price")
+    schema = CSVParser.infer_schema(csv_file)
+    assert indexed(csv_file, condition, schema) == scan(csv_file, condition, schema)
+
+def test_lookup_reads_quoted_records(csv_file):
+    """Тест чтения по смещениям записей с запятыми и переводами строк в кавычках."""
+    SecondaryIndex.build(csv_file, "brand")
+    rows = indexed(csv_file, "brand=xiaomi", CSVParser.infer_schema(csv_file))
+    assert [row["name"] for row in rows] == ["redmi, note 12", "poco\nx5 pro"]
+
+def test_unusable_index_falls_back_to_scan(csv_file):
+    """Тест отказа от индекса: без индексов, при OR с неиндексированным полем и несовпадении типа."""
+    schema = CSVParser.infer_schema(csv_file)
+    assert indexed(csv_file, "brand=apple", schema) is None
+    SecondaryIndex.build(csv_file, "brand")
+    assert indexed(csv_file, "brand=apple OR rating>4.5", schema) is None
+    assert indexed(csv_file, "name LIKE 'galaxy%'", schema) is None
+    SecondaryIndex.build(csv_file, "price")
+    assert indexed(csv_file, "price=999", Schema.parse("price:str")) is None
+
+@pytest.mark.parametrize("condition", ["code=123", "code='123'", "code=abc", "code IN (123, abc)", "code=0123 OR code=x"])
+def test_mixed_column_index_matches_scan(tmp_path, condition):
+    """Тест индекса колонки со смешанными значениями: результат тот же, что без индекса."""
+    path = tmp_path / "codes.csv"
+    path.write_text("code,price\n123,10\nabc,20\n0123,30\nx,40\n123.0,50\n")
+    csv_file = str(path)
+    for schema in (CSVParser.infer_schema(csv_file), Schema.parse("code:str")):
+        expected = scan(csv_file, condition, schema)
+        SecondaryIndex.build(csv_file, "code")
+        result = indexed(csv_file, condition, schema)
+        os.remove(index_path(csv_file, "code"))
+        assert (expected if result is None else result) == expected
+
+def test_stale_index_is_ignored(csv_file):
+    """Тест актуальности: после изменения CSV-файла индекс не используется."""
+    SecondaryIndex.build(csv_file, "brand")
+    with open(csv_file, "a", encoding="utf-8") as file:
+        file.write("pixel 8,google,699,4.7\n")
+    assert SecondaryIndex.open(csv_file, "brand") is None
+    assert indexed(csv_file, "brand=google", CSVParser.infer_schema(csv_file)) is None
+
+def test_corrupt_index_is_ignored(csv_file):
+    """Тест поврежденного файла индекса: он не открывается."""
+    with open(index_path(csv_file, "brand"), "wb") as file:
+        file.write(b"garbage")
+    assert SecondaryIndex.open(csv_file, "brand") is None
+
+def test_build_unknown_column(csv_file):
+    """Тест ошибки при построении индекса по несуществующей колонке."""
+    with pytest.raises(ValueError, match="Колонка не найдена"):
+        SecondaryIndex.build(csv_file, "color")
@@ -0,0 +1,54 @@
+# test_mmap_reader.py
+import pytest
+from project.model.csv_parser import CSVParser
+from project.model.mmap_reader import MMapReader
+
+@pytest.fixture
+def sample_csv(tmp_path):
+    """
+    Фикстура создает CSV-файл, в котором есть значение в кавычках
+    с запятой и переводом строки внутри, а также короткая строка.
+    """
+    file_path = tmp_path / "test.csv"
+    file_path.write_text(
+        "name,brand,price,rating\r\n"
+        "iphone 15 pro,apple,999,4.9\r\n"
+        "\"galaxy, s23\nultra\",samsung,1199,4.8\r\n"
+        "\r\n"
+        "redmi note 12,xiaomi\r\n"
+    )
+    return str(file_path)
+
+def test_all_fields_match_dict_reader(sample_csv):
+    """Тест чтения всех полей: результат совпадает с csv.DictReader."""
+    assert list(MMapReader.iter_rows(sample_csv)) == CSVParser.parse(sample_csv)
+
+def test_only_requested_fields(sample_csv):
+    """Тест чтения только запрошенных полей."""
+    rows = list(MMapReader.iter_rows(sample_csv, {"brand", "price"}))
+    assert rows == [
+        {"brand": "apple", "price": "999"},
+        {"brand": "samsung", "price": "1199"},
+        {"brand": "xiaomi", "price": None},
+    ]
+
+def test_iter_rows_with_fields(sample_csv):
+    """Тест потокового чтения парсером с указанием полей."""
+    rows = CSVParser.iter_rows(sample_csv, {"name"})
+    assert [row["name"] for row in rows] == ["iphone 15 pro", "galaxy, s23\nultra", "redmi note 12"]
+
+def test_empty_file(tmp_path):
+    """Тест файла только с заголовком."""
+    file_path = tmp_path / "empty.csv"
+    file_path.write_text("name,price\n")
+    assert list(MMapReader.iter_rows(str(file_path), {"price"})) == []
+
+def test_bare_quote_inside_field(tmp_path):
+    """Тест кавычки не в начале поля: это обычный символ, следующие записи не склеиваются."""
+    file_path = tmp_path / "tv.csv"
+    file_path.write_text('name,brand,price\nTV 55" LED,lg,500\nphone,apple,700\n"a""b" c,"x\ny",500\n')
+    rows = list(MMapReader.iter_rows(str(file_path)))
+    assert rows == CSVParser.parse(str(file_path))
+    assert [row["price"] for row in rows] == ["500", "700", "500"]
+    assert rows[2] == {"name": 'a"b c', "brand": "x\ny", "price": "500"}
+    assert [row["price"] for row in MMapReader.iter_rows(str(file_path), {"price"})] == ["500", "700", "500"]
@@ -0,0 +1,125 @@
+# test_parallel.py
+import csv
+import gzip
+import pytest
+from project.model.csv_parser import CSVParser
+from project.model.mmap_reader import iter_records
+from project.model.parallel import ParallelScan, find_chunk_boundaries, plan_chunks, read_header
+
+@pytest.fixture
+def quoted_csv(tmp_path):
+    """
+    Фикстура создает CSV-файл с переводами строк внутри значений в кавычках.
+    Такие переводы строк не должны становиться границами частей файла.
+    """
+    file_path = tmp_path / "quoted.csv"
+    with open(file_path, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["name", "brand", "price"])
+        for i in range(200):
+            writer.writerow([f"item {i}\nline two", "apple" if i % 3 else "xiaomi", str(100 + i)])
+    return str(file_path)
+
+def test_read_header(quoted_csv):
+    """Тест чтения заголовка и смещения начала данных."""
+    header, data_start = read_header(quoted_csv)
+    assert header == ["name", "brand", "price"]
+    assert data_start == len("name,brand,price\r\n")
+
+def test_boundaries_respect_quotes(quoted_csv):
+    """Тест выравнивания частей по концам записей, а не по переводам строк в кавычках."""
+    _, data_start = read_header(quoted_csv)
+    chunks = find_chunk_boundaries(quoted_csv, data_start, 7)
+
+    assert len(chunks) > 1
+    with open(quoted_csv, "rb") as csvfile:
+        data = csvfile.read()
+    rows = []
+    for start, end in chunks:
+        part = data[start:end].decode()
+        assert part.count('"') % 2 == 0  # Ни одна запись не разорвана
+        rows.extend(csv.reader(part.splitlines(keepends=True)))
+    assert len(rows) == 200
+
+@pytest.mark.parametrize("chunk_count", range(2, 12))
+def test_boundaries_with_bare_quotes(tmp_path, chunk_count):
+    """Тест кавычек внутри полей без кавычек рядом с границами частей: ни одна запись не теряется."""
+    file_path = tmp_path / "tv.csv"
+    lines = [f'TV {i}" LED,lg,{i}\n' if i % 2 else f'"tv\n{i}",lg,{i}\n' for i in range(20)]
+    file_path.write_text("name,brand,price\n" + "".join(lines))
+    header, data_start = read_header(str(file_path))
+    chunks = find_chunk_boundaries(str(file_path), data_start, chunk_count)
+
+    with open(file_path, "rb") as csvfile:
+        data = csvfile.read()
+    prices = [row["price"] for start, end in chunks for row in iter_records(data, start, end, header)]
+    assert prices == [str(i) for i in range(20)]
+
+def test_filter_and_order_match_sequential(quoted_csv):
+    """Тест совпадения параллельного результата с последовательным."""
+    expected = sorted(
+        (row for row in CSVParser.parse(quoted_csv) if row["brand"] == "apple"),
+        key=lambda row: int(row["price"]), reverse=True
+    )
+    result = ParallelScan.execute(
+        quoted_csv, 3, where=("brand", "=", "apple"), order_by=("price", "=", "desc")
+    )
+    assert result == expected
+
+@pytest.mark.parametrize("aggregator_type, expected", [
+    ("min", 100), ("max", 299), ("avg", 199.5), ("median", 199.5)
+])
+def test_partial_aggregates_merge(quoted_csv, aggregator_type, expected):
+    """Тест объединения частичных агрегатов из разных процессов."""
+    result = ParallelScan.execute(quoted_csv, 3, aggregates=[("price", "=", aggregator_type)])
+    assert result == {aggregator_type: [expected]}
+
+def test_invalid_aggregate(quoted_csv):
+    """Тест ошибки неизвестного типа агрегации до запуска процессов."""
+    with pytest.raises(ValueError, match="Неизвестный тип агрегации"):
+        ParallelScan.execute(quoted_csv, 2, aggregates=[("price", "=", "total")])
+
+def test_multiple_aggregates_single_pass(quoted_csv):
+    """Тест нескольких агрегатов за один параллельный проход."""
+    result = ParallelScan.execute(
+        quoted_csv, 3, aggregates=[("price", "=", "min"), ("price", "=", "max"), ("price", "=", "p50")]
+    )
+    assert result == {"min": [100], "max": [299], "p50": [199.5]}
+
+def test_group_by_merges_partial_tables(quoted_csv):
+    """Тест группировки: частичные таблицы групп процессов объединяются по ключам."""
+    result = ParallelScan.execute(quoted_csv, 3, aggregates=[("price", "=", "sum")], group_by="brand")
+    apple = [100 + i for i in range(200) if i % 3]
+    xiaomi = [100 + i for i in range(200) if not i % 3]
+    assert result == {"brand": ["apple", "xiaomi"], "sum": [sum(apple), sum(xiaomi)]}
+
+def test_group_by_order(quoted_csv):
+    """Тест сортировки групп: порядок по ключу группировки применяется после объединения частей."""
+    result = ParallelScan.execute(
+        quoted_csv, 3, aggregates=[("price", "=", "count")], group_by="brand", order_by=("brand", "=", "desc"), limit=1
+    )
+    assert result == {"brand": ["xiaomi"], "count": [67]}
+    with pytest.raises(ValueError, match="по полю группировки"):
+        ParallelScan.execute(quoted_csv, 3, group_by="brand", order_by=("price", "=", "desc"))
+
+def test_multiple_files_are_merged(quoted_csv, tmp_path):
+    """Тест обработки нескольких файлов-шардов: частичные результаты объединяются."""
+    second = tmp_path / "second.csv"
+    second.write_text("price,brand,name\n50,apple,a\n500,xiaomi,b\n")
+    files = [quoted_csv, str(second)]
+
+    result = ParallelScan.execute(files, 2, aggregates=[("price", "=", "min"), ("price", "=", "count")])
+    assert result == {"min": [50], "count": [202]}
+    top = ParallelScan.execute(files, 2, where=("brand", "=", "xiaomi"), order_by=("price", "=", "desc"), limit=2)
+    assert [row["price"] for row in top] == ["500", "298"]
+
+def test_compressed_shard_is_one_chunk(quoted_csv, tmp_path):
+    """Тест сжатого шарда: он не делится на части и распаковывается целиком в одном процессе."""
+    second = tmp_path / "second.csv.gz"
+    second.write_bytes(gzip.compress(b"price,brand,name\n50,apple,a\n500,xiaomi,b\n"))
+    files = [quoted_csv, str(second)]
+
+    assert [chunk[1:] for chunk in plan_chunks(files, 2) if chunk[0] == str(second)] == \
+        [(None, None, ["price", "brand", "name"])]
+    result = ParallelScan.execute(files, 2, where=("brand", "=", "xiaomi"), aggregates=[("price", "=", "max")])
+    assert result == {"max": [500]}
@@ -0,0 +1,91 @@
+# test_planner.py
+import pytest
+from unittest.mock import patch
+from project.model.csv_parser import CSVParser
+from project.model.index import SecondaryIndex
+from project.model.planner import QueryPlanner
+from project.model.grouping import HashAggregate
+from project.model.predicates import PredicateParser
+from project.model.processors import Aggregate
+
+CSV_CONTENT = "name,brand,price\n" + "".join(
+    f"item {i},{'apple' if i % 10 == 0 else 'samsung'},{i * 10}\n" for i in range(50)
+)
+
+@pytest.fixture
+def csv_file(tmp_path):
+    """Фикстура создает CSV-файл, где apple - десятая часть записей."""
+    path = tmp_path / "products.csv"
+    path.write_text(CSV_CONTENT)
+    return str(path)
+
+def test_sort_before_aggregate_removed():
+    """Тест удаления сортировки перед агрегацией: поле сортировки не читается, фильтр объединяется с агрегатом."""
+    plan = QueryPlanner.plan(
+        PredicateParser.parse("brand=apple"), ("rating", "=", "desc"), None, [("price", "=", "max")], None,
+        file_path="products.csv"
+    )
+    assert plan.order_by is None and plan.sort is None
+    assert plan.fields == {"brand", "price"}
+    assert plan.fused
+    assert "сортировка по rating удалена" in plan.rewrites[0]
+
+    plan = QueryPlanner.plan(None, ("price", "=", "desc"), None, None, 5)
+    assert (plan.sort, plan.limit, plan.fields, plan.fused) == ("top_k", None, None, False)
+
+def test_sort_of_groups():
+    """Тест сортировки с группировкой: строки не сортируются, порядок применяется к группам."""
+    plan = QueryPlanner.plan(
+        None, ("brand", "=", "desc"), "brand", [("price", "=", "max")], 3, file_path="products.csv"
+    )
+    assert plan.order_by == ("brand", "=", "desc") and plan.sort is None and plan.limit == 3
+    assert plan.fields == {"brand", "price"}
+    with pytest.raises(ValueError, match="по полю группировки brand"):
+        QueryPlanner.plan(None, ("price", "=", "desc"), "brand", [("price", "=", "max")], None)
+
+def test_select_fields():
+    """Тест выбора колонок: читаются колонки результата, условия и сортировки; с агрегацией - ошибка."""
+    plan = QueryPlanner.plan(
+        PredicateParser.parse("brand=apple"), ("price", "=", "desc"), None, None, None, select=["name"]
+    )
+    assert plan.select == ["name"] and plan.fields == {"name", "brand", "price"}
+    with pytest.raises(ValueError, match="несовместим с агрегацией"):
+        QueryPlanner.plan(None, None, None, [("price", "=", "max")], None, select=["name"])
+
+def test_sort_operator_by_file_size(csv_file):
+    """Тест выбора сортировки: внешняя для потока из большого файла или с бюджетом, иначе в памяти."""
+    order_by = ("price", "=", "desc")
+    assert QueryPlanner.plan(None, order_by, None, None, None, file_path=csv_file).sort == "memory"
+    plan = QueryPlanner.plan(None, order_by, None, None, None, file_path=csv_file, sort_memory=1024)
+    assert (plan.sort, plan.sort_memory) == ("external", 1024)
+    with patch("project.model.planner.DEFAULT_SORT_MEMORY", 1024):
+        plan = QueryPlanner.plan(None, order_by, None, None, None, file_path=csv_file)
+        assert (plan.sort, plan.sort_memory) == ("external", 1024)
+        # Колоночная таблица уже в памяти
+        assert QueryPlanner.plan(None, order_by, None, None, None, sort_memory=1024).sort == "memory"
+
+def test_index_access_by_selectivity(csv_file):
+    """Тест выбора чтения по индексу: только если кандидатов меньше INDEX_MAX_SELECTIVITY записей."""
+    SecondaryIndex.build(csv_file, "brand")
+    schema = CSVParser.infer_schema(csv_file)
+
+    plan = QueryPlanner.plan(PredicateParser.parse("brand=apple"), None, None, None, None, schema, csv_file,
+                             use_index=True)
+    assert (plan.access, plan.index_fields, len(plan.offsets), plan.index_rows) == ("index", ["brand"], 5, 50)
+
+    plan = QueryPlanner.plan(PredicateParser.parse("brand=samsung"), None, None, None, None, schema, csv_file,
+                             use_index=True)
+    assert plan.access == "scan" and plan.offsets is None
+    assert plan.rewrites == ["индекс brand не используется: кандидатов 45 из 50"]
+
+def test_fused_filter_aggregates(csv_file):
+    """Тест фильтра в цикле агрегации: результат совпадает с отдельным этапом фильтрации."""
+    schema = CSVParser.infer_schema(csv_file)
+    predicate = PredicateParser.parse("price>=250")
+    rows = list(CSVParser.iter_rows(csv_file))
+    expressions = [("price", "=", "min"), ("price", "=", "count")]
+
+    assert Aggregate.execute_many(iter(rows), expressions, schema, where=predicate) == {"min": [250], "count": [25]}
+    assert HashAggregate.execute(iter(rows), "brand", expressions, schema, where=predicate) == {
+        "brand": ["apple", "samsung"], "min": [300, 250], "count": [2, 23]
+    }
@@ -0,0 +1,157 @@
+# test_predicates.py
+import pytest
+from project.model import predicates
+from project.model.predicates import And, Comparison, Like, Not, Or, Predicate, PredicateParser
+from project.model.processors import Where
+from project.model.schema import Schema
+from project.model.table import Table
+
+@pytest.fixture
+def sample_data():
+    """
+    Фикстура предоставляет строки для проверки составных условий.
+    """
+    return [
+        {"name": "iPhone 15 Pro", "brand": "apple", "price": "999", "rating": "4.9"},
+        {"name": "Galaxy S23", "brand": "samsung", "price": "1199", "rating": "4.8"},
+        {"name": "Redmi Note 12", "brand": "xiaomi", "price": "199", "rating": "4.6"},
+        {"name": "Poco X5 Pro", "brand": "Xiaomi ", "price": "299", "rating": "4.4"},
+    ]
+
+def names(rows):
+    return [row["name"] for row in rows]
+
+@pytest.mark.parametrize("condition, expected", [
+    ("brand=apple", ["iPhone 15 Pro"]),
+    ("name=Galaxy S23", ["Galaxy S23"]),
+    ("brand IN (apple, xiaomi) AND price>500", ["iPhone 15 Pro"]),
+    ("brand = xiaomi OR rating >= 4.9", ["iPhone 15 Pro", "Redmi Note 12", "Poco X5 Pro"]),
+    ("NOT (brand=xiaomi OR price>1000)", ["iPhone 15 Pro"]),
+    ("price BETWEEN 199 AND 999", ["iPhone 15 Pro", "Redmi Note 12", "Poco X5 Pro"]),
+    ("price NOT BETWEEN 199 AND 999", ["Galaxy S23"]),
+    ("name LIKE '%pro'", ["iPhone 15 Pro", "Poco X5 Pro"]),
+    ("name not like 'r_dmi%' and brand not in ('samsung')", ["iPhone 15 Pro", "Poco X5 Pro"]),
+    ("brand=apple OR brand=samsung AND price<1000", ["iPhone 15 Pro"]),
+])
+def test_rows_and_table_agree(sample_data, condition, expected):
+    """Тест составных условий: построчный и колоночный фильтры дают одинаковый результат."""
+    predicate = PredicateParser.parse(condition)
+    assert names(Where.execute(iter(sample_data), predicate)) == expected
+    header = list(sample_data[0])
+    table = Table.from_rows(header, [[row[name] for name in header] for row in sample_data])
+    assert names(Where.execute(table, predicate).iter_rows()) == expected
+
+def test_precedence():
+    """Тест приоритета связок: NOT сильнее AND, AND сильнее OR."""
+    predicate = PredicateParser.parse("a=1 OR NOT b=2 AND c=3")
+    assert isinstance(predicate, Or)
+    assert isinstance(predicate.operands[1], And)
+    assert isinstance(predicate.operands[1].operands[0], Not)
+
+def test_cheap_predicates_first():
+    """Тест порядка вычисления: дешевое сравнение проверяется раньше LIKE."""
+    predicate = PredicateParser.parse("name LIKE '%x%' AND price>500")
+    calls = []
+    row = {"name": "x", "price": "100"}
+    original = Like.compile
+    try:
+        Like.compile = lambda self, schema=None: lambda row: calls.append(row) or True
+        assert not predicate.compile()(row)
+    finally:
+        Like.compile = original
+    assert calls == []
+
+def test_quoted_values_and_schema():
+    """Тест строк в кавычках и преобразования значений по схеме."""
+    predicate = PredicateParser.parse("code IN ('007', \"a,b\") OR code='it''s'")
+    schema = Schema.parse("code:str")
+    test = predicate.compile(schema)
+    assert test({"code": "007"})
+    assert test({"code": "it's"})
+    assert test({"code": "A,B"})
+    assert not test({"code": "7"})
+
+def test_missing_field():
+    """Тест отсутствующего поля: сравнение ложно, отрицание истинно."""
+    assert not Comparison("color", "=", "red").compile()({"brand": "apple"})
+    assert PredicateParser.parse("NOT color=red").compile()({"brand": "apple"})
+
+def test_fields():
+    """Тест списка полей, на которые ссылается условие."""
+    predicate = PredicateParser.parse("(brand=apple OR name LIKE 'a%') AND NOT price BETWEEN 1 AND 2")
+    assert predicate.fields() == {"brand", "name", "price"}
+    assert predicate.text_fields() == {"name"}
+    assert PredicateParser.parse("NOT price LIKE '5%' OR brand=apple").text_fields() == {"price"}
+
+def test_unquoted_value_kept_as_text():
+    """Тест значения без кавычек: остается строкой, число получается преобразователем колонки."""
+    predicate = PredicateParser.parse("code=007")
+    assert predicate.value == "007"
+    assert predicate.compile()({"code": "7"})
+    assert not predicate.compile(Schema.parse("code:str"))({"code": "7"})
+    assert predicate.compile(Schema.parse("code:str"))({"code": "007"})
+
+def test_predicate_is_abstract():
+    """Тест базового класса условия: без реализации методов экземпляр не создается."""
+    with pytest.raises(TypeError):
+        Predicate()
+
+@pytest.mark.parametrize("condition", ["", "price IN (1", "NOT (brand=apple", "(price>1", "price ! 5", "price BETWEEN 1"])
+def test_invalid_condition(condition):
+    """Тест ошибки разбора некорректного условия."""
+    with pytest.raises(ValueError, match="Некорректное условие фильтрации"):
+        PredicateParser.parse(condition)
+
+@pytest.mark.parametrize("condition, expected", [
+    ("brand=Black and Decker", ("brand", "=", "Black and Decker")),
+    ("name=O'Brien", ("name", "=", "O'Brien")),
+    ("note=a=b", ("note", "=", "a=b")),
+    ("product name=iphone 15", ("product name", "=", "iphone 15")),
+    ("brand=apple AND", ("brand", "=", "apple AND")),
+    ("title>=Bolt (2008)", ("title", ">=", "Bolt (2008)")),
+])
+def test_legacy_condition(condition, expected):
+    """Тест условий, которые разбирались одним сравнением до появления составных условий."""
+    predicate = PredicateParser.parse(condition)
+    assert isinstance(predicate, Comparison)
+    assert (predicate.field, predicate.operator, predicate.value) == expected
+    assert predicate.compile()({expected[0]: expected[2].upper()})
+
+def test_key_is_canonical():
+    """Тест канонической записи: пробелы, регистр значений и порядок операндов не важны."""
+    assert PredicateParser.parse("brand=Apple and price > 500").key() == \
+        PredicateParser.parse("price>500 AND brand = apple").key()
+    assert PredicateParser.parse("price>500").key() != PredicateParser.parse("price>=500").key()
+
+@pytest.mark.parametrize("condition, other, expected", [
+    ("price>500", "price>300", True),
+    ("price>300", "price>500", False),
+    ("price>=300", "price>300", False),
+    ("price BETWEEN 400 AND 500", "price>=400", True),
+    ("brand=apple AND price>500", "price>300", True),
+    ("price>500", "brand=apple AND price>300", False),
+    ("price>500 OR price=200", "price>100", True),
+    ("price IN (1, 2)", "price<3", True),
+    ("brand=apple", "brand IN (apple, lg)", True),
+    ("rating>4", "price>4", False),
+    ("NOT price>5", "NOT price>5", True),
+])
+def test_implies(condition, other, expected):
+    """Тест следования условий, по которому переиспользуются отфильтрованные наборы."""
+    assert PredicateParser.parse(condition).implies(PredicateParser.parse(other)) is expected
+
+def test_implies_ignores_ranges_of_strings():
+    """Тест: для строковой колонки числовые диапазоны не сравниваются."""
+    schema = Schema({"price": "str"})
+    assert not PredicateParser.parse("price>'500'").implies(PredicateParser.parse("price>'300'"), schema)
+
+def test_normalized_values_remembered(monkeypatch):
+    """Тест запоминания нормализованных значений: результат не меняется, в том числе после отключения."""
+    monkeypatch.setattr(predicates, "NORMALIZED_CACHE_SIZE", 4)
+    repeated = [{"brand": brand} for brand in ["Apple ", "xiaomi", "apple", "Apple "] * 3]
+    unique = [{"brand": f"brand {index}"} for index in range(10)] + [{"brand": "APPLE"}, {}]
+    # Повторы до заполнения - значения запоминаются; уникальные значения первыми - запоминание отключается
+    for rows in (repeated + unique, unique + repeated):
+        test = PredicateParser.parse("brand=apple").compile()
+        expected = [row.get("brand", "").strip().lower() == "apple" for row in rows]
+        assert [test(row) for row in rows] == expected
@@ -1,7 +1,8 @@
 # test_processors.py
 import pytest
 from typing import List, Dict
-from project.model.processors import Aggregate, Where, OrderBy
+from project.model.processors import Aggregate, Limit, Select, Where, OrderBy
+from project.model.table import Table
 
 @pytest.fixture
 def sample_data() -> List[Dict[str, str]]:
@@ -41,11 +42,37 @@ class TestAggregate:
         # Отсортированные цены: [199, 299, 999, 1199] → медиана (299+999)/2 = 649
         assert result == 649
         
+    def test_quantile_aggregation(self, sample_data):
+        """Тест квантилей: точный выбором и приближенный потоковой оценкой."""
+        # Отсортированные цены: [199, 299, 999, 1199] → p90 = 999 + 0.7 * 200 = 1139
+        assert Aggregate.execute(sample_data, ("price", "=", "p90")) == 1139
+        assert Aggregate.execute(iter(sample_data), ("price", "=", "median"), approximate=True) == 649
+
+    def test_unknown_aggregation_error(self, sample_data):
+        """Тест ошибки для неизвестного типа агрегации."""
+        with pytest.raises(ValueError, match="Неизвестный тип агрегации"):
+            Aggregate.execute(sample_data, ("price", "=", "p200"))
+
+    def test_multiple_aggregates_single_pass(self, sample_data):
+        """Тест нескольких агрегатов за один проход по одноразовому итератору."""
+        expressions = [("price", "=", "min"), ("price", "=", "max"), ("price", "=", "median")]
+        result = Aggregate.execute_many(iter(sample_data), expressions)
+        assert result == {"min": [199], "max": [1199], "median": [649]}
+
     def test_convert_float_to_int(self):
         """Тест конвертации float в int при необходимости."""
         assert Aggregate.convert_float_to_int_if_necessary(5.0) == 5
         assert Aggregate.convert_float_to_int_if_necessary(5.5) == 5.5
         
+    def test_aggregation_accepts_iterator(self, sample_data):
+        """Тест потоковой агрегации: данные передаются одноразовым итератором."""
+        assert Aggregate.execute(iter(sample_data), ("price", "=", "avg")) == 674
+        assert Aggregate.execute(iter(sample_data), ("price", "=", "max")) == 1199
+
+    def test_avg_of_empty_iterator(self):
+        """Тест среднего для пустого потока."""
+        assert Aggregate._agr_avg(iter([]), "price") == 0
+
     def test_string_aggregation_error(self, sample_data):
         """Тест ошибки при агрегации строковых значений."""
         with pytest.raises(ValueError, match="Агрегация для строк не предусмотрена"):
@@ -75,6 +102,13 @@ class TestWhere:
         result = Where.execute(sample_data, ("brand", "!=", "apple"))
         assert len(result) == 3  # Все кроме apple
         
+    def test_iter_filter_is_lazy(self, sample_data):
+        """Тест ленивой фильтрации: строки выдаются по мере чтения источника."""
+        result = Where.iter_filter(iter(sample_data), ("brand", "=", "xiaomi"))
+        assert not isinstance(result, list)
+        assert next(result)["name"] == "redmi"
+        assert next(result)["name"] == "poco"
+
     def test_case_insensitive_filter(self, sample_data):
         """Тест регистронезависимой фильтрации строк."""
         result = Where.execute(sample_data, ("brand", "=", "XIAOMI"))
@@ -95,7 +129,48 @@ class TestOrderBy:
         ratings = [item["rating"] for item in result]
         assert ratings == ["4.9", "4.8", "4.6", "4.4"]
         
+    def test_sort_accepts_iterator(self, sample_data):
+        """Тест сортировки потокового итератора."""
+        result = OrderBy.execute(iter(sample_data), ("price", "", "asc"))
+        assert [item["name"] for item in result] == ["redmi", "poco", "iphone", "galaxy"]
+
+    def test_top_k_matches_full_sort(self, sample_data):
+        """Тест отбора top-K кучей: результат совпадает с началом полной сортировки."""
+        rows = sample_data + [{"name": "mi", "brand": "xiaomi", "price": "999", "rating": "4.0"}]
+        for direction in ("asc", "desc"):
+            expected = OrderBy.execute(rows, ("price", "", direction))[:3]
+            assert OrderBy.execute(iter(rows), ("price", "", direction), limit=3) == expected
+
     def test_invalid_sort_direction(self, sample_data):
         """Тест ошибки при некорректном направлении сортировки."""
         with pytest.raises(ValueError, match="Направление сортировки должно быть 'asc' или 'desc'"):
-            OrderBy.execute(sample_data, ("price", "", "invalid"))
\ No newline at end of file
+            OrderBy.execute(sample_data, ("price", "", "invalid"))
+
+class TestLimit:
+    """Тестирование ограничения количества строк."""
+
+    def test_limit(self, sample_data):
+        """Тест выбора первых строк."""
+        assert [row["name"] for row in Limit.execute(sample_data, 2)] == ["iphone", "galaxy"]
+
+    def test_limit_stops_reading_source(self, sample_data):
+        """Тест ленивого лимита: источник не дочитывается."""
+        source = iter(sample_data)
+        assert len(list(Limit.iter_limit(source, 1))) == 1
+        assert next(source)["name"] == "galaxy"
+
+    def test_negative_limit(self, sample_data):
+        """Тест ошибки при отрицательном лимите."""
+        with pytest.raises(ValueError, match="Лимит строк должен быть неотрицательным"):
+            Limit.execute(sample_data, -1)
+
+class TestSelect:
+    """Тестирование выбора колонок результата."""
+
+    def test_select_rows_and_table(self, sample_data):
+        """Тест проекции строк и колоночной таблицы: колонки в порядке --select."""
+        assert Select.execute(sample_data[:1], ["price", "name"]) == [{"price": "999", "name": "iphone"}]
+        table = Table.from_rows(["name", "price"], [["iphone", "999"]])
+        assert Select.execute(table, ["price"]).to_dict() == {"price": ["999"]}
+        with pytest.raises(ValueError, match="Колонка не найдена: rating"):
+            Select.execute(table, ["rating"])
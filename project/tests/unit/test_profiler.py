@@ -0,0 +1,39 @@
+# test_profiler.py
+from unittest.mock import patch
+from project.model.profiler import Profiler
+from project.model.table import Table
+
+def test_stages_rows_and_self_time():
+    """Тест вложенных ленивых этапов: строки на входе и выходе, собственное время без времени предыдущих этапов."""
+    profiler = Profiler(trace_memory=False)
+    profiler.start()
+    with patch("project.model.profiler.PROFILE_BATCH", 2):
+        rows = profiler.iterate("read", ({"price": i} for i in range(5)), bytes_read=100)
+        rows = profiler.iterate("where", (row for row in rows if row["price"] % 2 == 0))
+        assert [row["price"] for row in rows] == [0, 2, 4]
+    profiler.call("aggregate", Table.from_rows, ["price"], [["4"]])
+    profiler.stop()
+
+    report = profiler.report()
+    assert [(stage["stage"], stage["rows_in"], stage["rows_out"]) for stage in report["stages"]] == [
+        ("read", None, 5), ("where", 5, 3), ("aggregate", 3, 1)
+    ]
+    assert report["stages"][0]["bytes_read"] == 100
+    assert all(stage["wall"] >= 0 and stage["peak_memory"] is None for stage in report["stages"])
+    assert report["total"]["wall"] >= sum(stage["wall"] for stage in report["stages"])
+
+def test_peak_memory_and_disabled():
+    """Тест пиковой памяти этапа и выключенного профилировщика, возвращающего данные без обертки."""
+    profiler = Profiler()
+    profiler.start()
+    profiler.call("build", lambda: [bytearray(1 << 20)])
+    profiler.stop()
+    report = profiler.report()
+    assert report["stages"][0]["peak_memory"] >= 1 << 20
+    assert report["total"]["peak_memory"] >= 1 << 20
+
+    profiler = Profiler(enabled=False)
+    rows = iter([1, 2])
+    assert profiler.iterate("read", rows) is rows
+    assert profiler.call("sum", sum, [1, 2]) == 3
+    assert profiler.report()["stages"] == []
@@ -0,0 +1,112 @@
+# test_result_cache.py
+import os
+import pytest
+from project.model import result_cache
+from project.model.csv_parser import CSVParser
+from project.model.predicates import PredicateParser
+from project.model.result_cache import ResultCache
+from project.model.table import Table
+
+@pytest.fixture
+def csv_file(tmp_path):
+    """
+    Фикстура создает CSV-файл с товарами.
+    """
+    path = tmp_path / "products.csv"
+    path.write_text(
+        "name,brand,price\n"
+        "iphone,apple,999\n"
+        "galaxy,samsung,1199\n"
+        "redmi,xiaomi,199\n"
+        "poco,xiaomi,399\n",
+        encoding="utf-8"
+    )
+    return str(path)
+
+def exhausted():
+    """Поток, чтение которого означает, что сохраненный набор не использован."""
+    raise AssertionError("Файл прочитан повторно")
+    yield
+
+def test_memory_lru():
+    """Тест вытеснения давно не использованных результатов из памяти."""
+    cache = ResultCache(max_entries=2)
+    cache.put("a", [{"x": 1}])
+    cache.put("b", {"max": [2]})
+    cache.get("a")
+    cache.put("c", [])
+    assert cache.get("a") == [{"x": 1}] and cache.get("c") == []
+    assert cache.get("b") is None
+
+def test_disk_store_and_ttl(tmp_path, monkeypatch):
+    """Тест дискового хранилища: результат доступен другому процессу до истечения времени жизни."""
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "time", lambda: now[0])
+    ResultCache(cache_dir=str(tmp_path), ttl=60).put("key", {"avg": [1.5]})
+    assert ResultCache(cache_dir=str(tmp_path), ttl=60).get("key") == {"avg": [1.5]}
+    now[0] += 61
+    assert ResultCache(cache_dir=str(tmp_path), ttl=60).get("key") is None
+    assert not os.listdir(tmp_path)
+
+def test_disk_size_limit(tmp_path):
+    """Тест ограничения размера дискового хранилища."""
+    cache = ResultCache(cache_dir=str(tmp_path), max_size=1)
+    cache.put("key", [{"name": "iphone"}])
+    assert not os.listdir(tmp_path)
+
+def test_large_results_are_not_cached():
+    """Тест ограничения размера кэшируемого результата."""
+    cache = ResultCache(max_rows=2)
+    cache.put("key", {"name": ["a", "b", "c"]})
+    assert cache.get("key") is None
+
+def test_fingerprint_depends_on_file(csv_file):
+    """Тест ключа: он меняется при изменении файла и запроса."""
+    key = ResultCache.fingerprint(csv_file, {"where": "price > '500'"})
+    assert key == ResultCache.fingerprint(csv_file, {"where": "price > '500'"})
+    assert key != ResultCache.fingerprint(csv_file, {"where": "price > '300'"})
+    with open(csv_file, "a", encoding="utf-8") as file:
+        file.write("pixel,google,699\n")
+    assert key != ResultCache.fingerprint(csv_file, {"where": "price > '500'"})
+
+def test_narrower_filter_reuses_rows(csv_file):
+    """Тест переиспользования: price>500 вычисляется по сохраненному набору price>300."""
+    cache = ResultCache()
+    schema = CSVParser.infer_schema(csv_file)
+    wide = PredicateParser.parse("price>300")
+    assert [row["name"] for row in cache.filter(CSVParser.iter_rows(csv_file), wide, csv_file, schema)] == \
+        ["iphone", "galaxy", "poco"]
+    narrow = PredicateParser.parse("price > 500 AND brand != samsung")
+    assert [row["name"] for row in cache.filter(exhausted(), narrow, csv_file, schema)] == ["iphone"]
+
+def test_filter_with_fewer_fields_is_not_reused(csv_file):
+    """Тест: набор строк с частью полей не подходит запросу, которому нужны все поля."""
+    cache = ResultCache()
+    schema = CSVParser.infer_schema(csv_file)
+    list(cache.filter(CSVParser.iter_rows(csv_file, {"price"}), PredicateParser.parse("price>300"), csv_file,
+                      schema, fields={"price"}))
+    narrow = PredicateParser.parse("price>500")
+    assert len(list(cache.filter(exhausted(), narrow, csv_file, schema, fields={"price"}))) == 2
+    with pytest.raises(AssertionError, match="прочитан"):
+        list(cache.filter(exhausted(), narrow, csv_file, schema))
+
+def test_unrelated_filter_reads_data(csv_file):
+    """Тест: условие, не следующее из сохраненного, фильтрует все данные."""
+    cache = ResultCache()
+    schema = CSVParser.infer_schema(csv_file)
+    list(cache.filter(CSVParser.iter_rows(csv_file), PredicateParser.parse("price<300"), csv_file, schema))
+    with pytest.raises(AssertionError, match="прочитан"):
+        list(cache.filter(exhausted(), PredicateParser.parse("price>500"), csv_file, schema))
+
+def test_narrower_filter_on_table(csv_file, monkeypatch):
+    """Тест переиспользования индексов строк колоночной таблицы."""
+    cache = ResultCache()
+    table = CSVParser.parse_table(csv_file)
+    assert cache.filter(table, PredicateParser.parse("price>300"), csv_file).column("name").to_list() == \
+        ["iphone", "galaxy", "poco"]
+    seen = []
+    original = Table.filter_indices
+    monkeypatch.setattr(Table, "filter_indices", lambda self, *args: seen.append(list(args[3])) or original(self, *args))
+    assert cache.filter(table, PredicateParser.parse("price>500"), csv_file).column("name").to_list() == \
+        ["iphone", "galaxy"]
+    assert seen == [[0, 1, 3]]
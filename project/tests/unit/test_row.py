@@ -0,0 +1,60 @@
+# test_row.py
+import pickle
+import pytest
+from collections.abc import Mapping
+from project.model.csv_parser import CSVParser
+from project.model.row import compact_rows, make_record, pack_rows, record_type, unpack_rows
+
+def test_record_reads_like_dict():
+    """Тест записи: доступ по ключу, get, in, итерация по колонкам и сравнение со словарем."""
+    row = make_record(["name", "price"], ["iphone", "999"])
+    assert isinstance(row, Mapping)
+    assert row["price"] == "999" and row.get("brand") is None and row.get("brand", "-") == "-"
+    assert "name" in row and "brand" not in row
+    assert list(row) == ["name", "price"] and list(row.values()) == ["iphone", "999"]
+    assert dict(row) == {"name": "iphone", "price": "999"}
+    assert row == {"name": "iphone", "price": "999"} and {"name": "iphone", "price": "999"} == row
+    assert row != {"name": "iphone"} and row != make_record(["name", "brand"], ["iphone", "999"])
+    assert repr(row) == "{'name': 'iphone', 'price': '999'}"
+    with pytest.raises(KeyError):
+        row["brand"]
+
+def test_record_type_shared():
+    """Тест типа записей: один тип на заголовок, запись сохраняется через pickle."""
+    assert record_type(("a", "b")) is record_type(("a", "b"))
+    row = record_type(("a", "b"))(["1", "2"])
+    restored = pickle.loads(pickle.dumps(row))
+    assert type(restored) is type(row) and restored == row
+
+def test_compact_rows_shares_values():
+    """Тест общих значений: равные значения колонки становятся одним объектом, словари не меняются."""
+    make = record_type(("brand", "price"))
+    rows = [make(["".join(["app", "le"]), str(price)]) for price in (10, 20)] + [{"brand": "x"}]
+    assert rows[0]["brand"] is not rows[1]["brand"]
+    compacted = list(compact_rows(rows))
+    assert compacted == rows
+    assert compacted[0]["brand"] is compacted[1]["brand"]
+    assert compacted[2] is rows[2]
+
+def test_compact_rows_max_distinct():
+    """Тест лимита: после max_distinct различных значений новые значения не запоминаются."""
+    make = record_type(("name",))
+    rows = [make(["".join(["item", str(i % 3)])]) for i in range(6)]
+    compacted = list(compact_rows(rows, max_distinct=1))
+    assert compacted[0]["name"] is compacted[3]["name"]
+    assert compacted[1]["name"] is not compacted[4]["name"]
+
+def test_pack_rows():
+    """Тест подготовки порции к pickle: записи одного типа - заголовок и кортежи, иначе без изменений."""
+    rows = [make_record(["a"], ["1"]), make_record(["a"], ["2"])]
+    fields, values = pack_rows(rows)
+    assert fields == ("a",) and values == [("1",), ("2",)]
+    assert unpack_rows(pickle.loads(pickle.dumps((fields, values)))) == rows
+    mixed = [rows[0], {"a": "3"}]
+    assert pack_rows(mixed) == (None, mixed) and unpack_rows((None, mixed)) is mixed
+
+def test_parser_pads_short_rows(tmp_path):
+    """Тест чтения строк: недостающие значения - None, значения без колонки и пустые строки отбрасываются."""
+    path = tmp_path / "rows.csv"
+    path.write_text("name,price\niphone\n\nxiaomi,199,extra\n")
+    assert CSVParser.parse(str(path)) == [{"name": "iphone", "price": None}, {"name": "xiaomi", "price": "199"}]
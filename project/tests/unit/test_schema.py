@@ -0,0 +1,79 @@
+# test_schema.py
+import pytest
+from project.model.csv_parser import CSVParser
+from project.model.schema import Schema, infer_column_type, make_converter
+
+class TestInferColumnType:
+    """Тестирование определения типа колонки."""
+
+    def test_int_column(self):
+        """Тест целочисленной колонки."""
+        assert infer_column_type(["1", "42", "-7"]) == "int"
+
+    def test_float_column(self):
+        """Тест колонки с целыми и дробными значениями."""
+        assert infer_column_type(["1", "4.5", "3"]) == "float"
+
+    def test_str_column(self):
+        """Тест строковой колонки."""
+        assert infer_column_type(["1", "4.5", "apple"]) == "str"
+
+class TestConverter:
+    """Тестирование преобразователей значений."""
+
+    def test_int_converter(self):
+        """Тест целочисленного преобразователя."""
+        assert make_converter("int")("42") == 42
+
+    def test_converter_fallback(self):
+        """Тест значения, не соответствующего типу колонки."""
+        assert make_converter("int")("4.5") == 4.5
+        assert make_converter("float")("n/a") == "n/a"
+
+    def test_str_converter_strips_quotes(self):
+        """Тест строкового преобразователя: числа не разбираются, кавычки снимаются."""
+        assert make_converter("str")("'123'") == "123"
+
+class TestSchema:
+    """Тестирование схемы CSV-файла."""
+
+    def test_parse(self):
+        """Тест разбора схемы из командной строки."""
+        schema = Schema.parse("price:int, rating : float")
+        assert schema.types == {"price": "int", "rating": "float"}
+
+    @pytest.mark.parametrize("spec", ["price", "price:decimal", ":int"])
+    def test_parse_invalid(self, spec):
+        """Тест ошибок разбора некорректной схемы."""
+        with pytest.raises(ValueError, match="Некорректное описание колонки в схеме"):
+            Schema.parse(spec)
+
+    def test_unknown_field_uses_default_converter(self):
+        """Тест колонки вне схемы: значение угадывается как раньше."""
+        assert Schema.parse("price:int").converter("rating")("4.5") == 4.5
+
+    def test_infer_schema_from_file(self, tmp_path):
+        """Тест определения схемы по выборке строк файла."""
+        file_path = tmp_path / "test.csv"
+        file_path.write_text("name,price,rating\niphone,999,4.9\nredmi,199,5\n")
+        schema = CSVParser.infer_schema(str(file_path))
+        assert schema == Schema({"name": "str", "price": "int", "rating": "float"}, ["name", "price", "rating"])
+        assert schema.converter("name")("123") == 123
+        assert Schema.parse("name:str").converter("name")("123") == "123"
+
+    def test_combine_shards(self):
+        """Тест общей схемы шардов: порядок колонок не важен, int и float дают float."""
+        combined = Schema.combine({
+            "a.csv": Schema({"name": "str", "price": "int"}),
+            "b.csv": Schema({"price": "float", "name": "str"}),
+        })
+        assert combined.types == {"name": "str", "price": "float"}
+
+    def test_combine_shard_errors(self):
+        """Тест понятных ошибок несовпадения колонок и типов шардов."""
+        with pytest.raises(ValueError, match=r"Колонки файла b.csv не совпадают с a.csv \(нет колонок: price; лишние колонки: cost\)"):
+            Schema.combine({"a.csv": Schema({"price": "int"}), "b.csv": Schema({"cost": "int"})})
+        shards = {"a.csv": Schema({"price": "int"}), "b.csv": Schema({"price": "str"})}
+        with pytest.raises(ValueError, match="Тип колонки price не совпадает: int в a.csv, str в b.csv"):
+            Schema.combine(shards)
+        assert Schema.combine(shards, Schema({"price": "str"})).types == {"price": "str"}
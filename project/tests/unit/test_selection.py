@@ -0,0 +1,48 @@
+# test_selection.py
+import random
+import pytest
+from project.model.selection import P2Quantile, median, quantile, select_kth
+
+def test_select_kth_matches_sort():
+    """Тест выбора k-го элемента: результат совпадает с отсортированным списком."""
+    rng = random.Random(7)
+    values = [rng.randint(0, 50) for _ in range(500)]
+    ordered = sorted(values)
+    for k in (0, 1, 249, 250, 498, 499):
+        assert select_kth(values, k) == ordered[k]
+
+def test_select_kth_out_of_range():
+    """Тест ошибки при номере элемента вне диапазона."""
+    with pytest.raises(IndexError):
+        select_kth([1, 2, 3], 3)
+
+def test_median():
+    """Тест медианы для нечетного и четного числа элементов."""
+    assert median([5, 1, 3]) == 3
+    assert median([4, 1, 3, 2]) == 2.5
+    assert median([]) == 0
+
+def test_quantile_interpolation():
+    """Тест квантиля с линейной интерполяцией между соседними элементами."""
+    values = list(range(1, 11))
+    assert quantile(values, 0) == 1
+    assert quantile(values, 1) == 10
+    assert quantile(values, 0.9) == pytest.approx(9.1)
+    assert quantile([2, 2, 2, 7], 0.5) == 2
+
+def test_p2_estimate():
+    """Тест потоковой оценки P²: близка к точному квантилю."""
+    rng = random.Random(11)
+    values = [rng.gauss(100, 15) for _ in range(20000)]
+    for level in (0.5, 0.9, 0.99):
+        estimator = P2Quantile(level)
+        for value in values:
+            estimator.add(value)
+        assert estimator.result() == pytest.approx(quantile(values, level), abs=1.5)
+
+def test_p2_small_input_is_exact():
+    """Тест P² на малом количестве значений: результат точный."""
+    estimator = P2Quantile(0.5)
+    for value in (9, 1, 5):
+        estimator.add(value)
+    assert estimator.result() == 5
@@ -0,0 +1,76 @@
+# test_server.py
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from project.controller.dispatcher import CLIArgumentsDispatcher
+from project.controller.server import QueryClient, QueryServer
+from project.model.csv_parser import CSVParser
+
+@pytest.fixture
+def csv_file(tmp_path):
+    """
+    Фикстура создает CSV-файл с товарами.
+    """
+    path = tmp_path / "products.csv"
+    path.write_text(
+        "name,brand,price,rating\n"
+        "iphone 15 pro,apple,999,4.9\n"
+        "galaxy s23,samsung,1199,4.8\n"
+        "redmi note 12,xiaomi,199,4.6\n"
+        "iphone se,apple,429,4.1\n",
+        encoding="utf-8"
+    )
+    return str(path)
+
+@pytest.fixture
+def server(csv_file):
+    """
+    Фикстура запускает сервер запросов на свободном порту в отдельном потоке.
+    """
+    load = MagicMock(side_effect=CSVParser.parse_table)
+    query_server = QueryServer([csv_file], load, CLIArgumentsDispatcher._processor_pipeline, port=0)
+    thread = threading.Thread(target=query_server.serve, daemon=True)
+    thread.start()
+    yield query_server
+    query_server.shutdown()
+    thread.join()
+
+def test_queries_reuse_loaded_table(server, csv_file):
+    """Тест запросов к серверу: файл разбирается один раз, результаты как у командной строки."""
+    assert QueryClient.execute(server.address, {"file": csv_file, "where": "brand=apple", "order_by": "price=asc"}) == \
+        {"name": ["iphone se", "iphone 15 pro"], "brand": ["apple", "apple"],
+         "price": ["429", "999"], "rating": ["4.1", "4.9"]}
+    assert QueryClient.execute(server.address, {"file": csv_file, "aggregate": "price=max,rating=min"}) == \
+        {"price_max": [1199], "rating_min": [4.1]}
+    assert QueryClient.execute(server.address, {"group_by": "brand"}) == \
+        {"brand": ["apple", "samsung", "xiaomi"], "count": [2, 1, 1]}
+    assert server.load.call_count == 1
+
+def test_changed_file_is_reloaded(server, csv_file):
+    """Тест перечитывания файла, измененного после запуска сервера."""
+    with open(csv_file, "a", encoding="utf-8") as file:
+        file.write("pixel 8,google,699,4.7\n")
+    assert QueryClient.execute(server.address, {"file": csv_file, "where": "brand=google", "aggregate": "price=max"}) \
+        == {"max": [699]}
+    assert server.load.call_count == 2
+
+def test_query_errors(server, tmp_path):
+    """Тест ошибок запроса: они передаются клиенту, а сервер продолжает работать."""
+    with pytest.raises(ValueError, match="Файл не загружен"):
+        QueryClient.execute(server.address, {"file": str(tmp_path / "other.csv")})
+    with pytest.raises(ValueError, match="Неизвестный тип агрегации"):
+        QueryClient.execute(server.address, {"aggregate": "price=total"})
+    assert QueryClient.execute(server.address, {"aggregate": "price=min"}) == {"min": [199]}
+
+def test_unavailable_server():
+    """Тест недоступного сервера."""
+    with pytest.raises(ConnectionError, match="недоступен"):
+        QueryClient.execute("127.0.0.1:1", {"file": "products.csv"})
+
+@patch('project.controller.dispatcher.print_results')
+def test_thin_client_mode(mock_print_results, server, csv_file):
+    """Тест режима тонкого клиента: флаг --server передает запрос серверу."""
+    CLIArgumentsDispatcher.run(['--file', csv_file, '--server', server.address, '--where', 'price<500', '--limit', '1'])
+    mock_print_results.assert_called_once_with(
+        {"name": ["redmi note 12"], "brand": ["xiaomi"], "price": ["199"], "rating": ["4.6"]}
+    )
@@ -0,0 +1,197 @@
+# test_table.py
+import pytest
+from project.model.csv_parser import CSVParser
+from project.model.grouping import HashAggregate
+from project.model.predicates import PredicateParser
+from project.model import table
+from project.model.processors import Aggregate, Where, OrderBy
+from project.model.table import Column, Table
+
+@pytest.fixture
+def sample_table() -> Table:
+    """
+    Фикстура предоставляет колоночную таблицу с тестовыми данными.
+    Колонки price и rating должны определиться как int и float.
+    """
+    return Table.from_rows(
+        ["name", "brand", "price", "rating"],
+        [
+            ["iphone", "apple", "999", "4.9"],
+            ["galaxy", "samsung", "1199", "4.8"],
+            ["redmi", "xiaomi", "199", "4.6"],
+            ["poco", "Xiaomi ", "299", "4.4"],
+        ]
+    )
+
+class TestColumn:
+    """Тестирование определения типа колонок."""
+
+    def test_infer_int(self):
+        """Тест целочисленной колонки."""
+        column = Column.from_strings("price", ["1", "2", "3"])
+        assert column.kind == "int"
+        assert column.to_list() == [1, 2, 3]
+
+    def test_infer_float(self):
+        """Тест дробной колонки: целые и дробные значения вперемешку."""
+        column = Column.from_strings("rating", ["4", "4.5"])
+        assert column.kind == "float"
+        assert column.to_list() == [4.0, 4.5]
+
+    def test_infer_str(self):
+        """Тест строковой колонки: хотя бы одно значение не число."""
+        column = Column.from_strings("brand", ["1", "apple"])
+        assert column.kind == "str"
+        assert column.to_list() == ["1", "apple"]
+
+    def test_given_kind(self):
+        """Тест заданного схемой типа колонки."""
+        assert Column.from_strings("price", ["1", "2"], "float").to_list() == [1.0, 2.0]
+        with pytest.raises(ValueError, match="не соответствуют типу int"):
+            Column.from_strings("price", ["1", "n/a"], "int")
+
+    @pytest.mark.parametrize("raw, text", [
+        (["1", "25"], ""),
+        (["4.5", "10.25"], ""),
+        (["4.50", "10.00"], ".2f"),
+        (["4", "4.5"], table.INTEGRAL_FORMAT),
+        (["007", " 12"], ["007", "12"]),
+    ])
+    def test_number_text(self, raw, text):
+        """Тест записи чисел: общий формат, а без него - строки из CSV без крайних пробелов."""
+        column = Column.from_strings("price", raw)
+        assert column.text == text
+        assert column.texts() == [value.strip() for value in raw]
+        assert column.take([1]).texts() == [raw[1].strip()]
+
+class TestDictionaryColumn:
+    """Тестирование словарного кодирования строковых колонок."""
+
+    BRANDS = ["xiaomi", "Apple", "samsung", " apple", "xiaomi", "Apple", "samsung", "xiaomi"]
+
+    def tables(self, monkeypatch):
+        """Одна и та же таблица со словарной колонкой brand и со списком значений."""
+        header = ["brand", "price"]
+        rows = [[brand, str(index)] for index, brand in enumerate(self.BRANDS)]
+        encoded, plain = Table.from_rows(header, rows), Table.from_rows(header, rows)
+        assert encoded.encoded_column("brand").dictionary is not None
+        with monkeypatch.context() as patched:
+            patched.setattr(table, "DICTIONARY_MAX_DISTINCT", 0)
+            assert plain.encoded_column("brand").dictionary is None
+        return encoded, plain
+
+    def test_encoding(self):
+        """Тест кодирования: при загрузке колонка - список, словарем кодируется при первом обращении."""
+        sample = Table.from_rows(["brand"], [[brand] for brand in self.BRANDS])
+        assert sample.column("brand").dictionary is None
+        column = sample.encoded_column("brand")
+        assert sample.column("brand") is column and sample.encoded_column("brand") is column
+        assert column.dictionary == [" apple", "Apple", "samsung", "xiaomi"]
+        assert list(column.values) == [3, 1, 2, 0, 3, 1, 2, 3]
+        assert column.to_list() == self.BRANDS
+        assert column.to_list()[0] is column.to_list()[4]
+        assert column.take([3, 0]).to_list() == [" apple", "xiaomi"]
+
+    def test_encoding_gives_up_early(self, monkeypatch):
+        """Тест отказа от кодирования: различных значений слишком много уже в первой порции."""
+        monkeypatch.setattr(table, "DICTIONARY_CHUNK", 2)
+        column = Column("name", "str", ["a", "b", "c", "a", "a", "a", "a", "a"])
+        assert column.dictionary_encoded() is None
+        assert Column("name", "str", ["a", "a", "b", "a", "c", "a"]).dictionary_encoded().dictionary == ["a", "b", "c"]
+
+    @pytest.mark.parametrize("condition", [
+        "brand=apple", "brand!=xiaomi", "brand>b", "brand IN (samsung, apple)", "brand LIKE 'x%'",
+        "brand=apple AND price>2", "brand=nokia",
+    ])
+    def test_filters_match_plain_column(self, condition, monkeypatch):
+        """Тест условий: словарная колонка дает те же строки, что и список значений."""
+        encoded, plain = self.tables(monkeypatch)
+        predicate = PredicateParser.parse(condition)
+        assert list(predicate.filter_indices(encoded)) == list(predicate.filter_indices(plain))
+        candidates = [1, 3, 4, 6]
+        assert list(predicate.filter_indices(encoded, candidates)) == \
+            list(predicate.filter_indices(plain, candidates))
+
+    def test_sort_and_group_match_plain_column(self, monkeypatch):
+        """Тест сортировки по кодам и группировки по словарной колонке."""
+        encoded, plain = self.tables(monkeypatch)
+        for descending in (False, True):
+            for limit in (None, 3):
+                assert list(encoded.argsort("brand", descending, limit)) == \
+                    list(plain.argsort("brand", descending, limit))
+        expressions = [("price", "=", "sum")]
+        assert HashAggregate.execute(encoded, "brand", expressions) == \
+            HashAggregate.execute(plain, "brand", expressions)
+
+class TestTableProcessors:
+    """Тестирование процессоров над колоночной таблицей."""
+
+    def test_where_numeric(self, sample_table):
+        """Тест фильтрации числовой колонки."""
+        result = Where.execute(sample_table, ("price", ">", 500))
+        assert isinstance(result, Table)
+        assert result.column("name").to_list() == ["iphone", "galaxy"]
+
+    def test_where_string_case_insensitive(self, sample_table):
+        """Тест регистронезависимой фильтрации строк."""
+        result = Where.execute(sample_table, ("brand", "=", "XIAOMI"))
+        assert result.column("name").to_list() == ["redmi", "poco"]
+
+    def test_where_missing_field(self, sample_table):
+        """Тест фильтрации по отсутствующей колонке: строк нет."""
+        assert len(Where.execute(sample_table, ("color", "=", "red"))) == 0
+
+    def test_order_by_desc(self, sample_table):
+        """Тест сортировки по убыванию."""
+        result = OrderBy.execute(sample_table, ("rating", "", "desc"))
+        assert result.column("rating").to_list() == [4.9, 4.8, 4.6, 4.4]
+
+    def test_order_by_with_limit(self, sample_table):
+        """Тест частичной сортировки таблицы с лимитом."""
+        result = OrderBy.execute(sample_table, ("price", "", "desc"), limit=2)
+        assert result.column("name").to_list() == ["galaxy", "iphone"]
+
+    def test_argsort_limit_keeps_ties_stable(self):
+        """Тест устойчивости частичной сортировки при равных ключах."""
+        table = Table.from_rows(["price"], [[str(value)] for value in (5, 1, 3, 1, 5, 3, 1)])
+        for descending in (False, True):
+            full = list(table.argsort("price", descending))
+            for limit in range(8):
+                assert list(table.argsort("price", descending, limit)) == full[:limit]
+
+    def test_aggregates(self, sample_table):
+        """Тест агрегатов над типизированной колонкой."""
+        assert Aggregate.execute(sample_table, ("price", "=", "min")) == 199
+        assert Aggregate.execute(sample_table, ("price", "=", "max")) == 1199
+        assert Aggregate.execute(sample_table, ("price", "=", "avg")) == 674
+        assert Aggregate.execute(sample_table, ("price", "=", "median")) == 649
+        assert Aggregate.execute(sample_table, ("price", "=", "p90")) == 1139
+
+    def test_string_aggregation_error(self, sample_table):
+        """Тест ошибки при агрегации строковой колонки."""
+        with pytest.raises(ValueError, match="Агрегация для строк не предусмотрена"):
+            Aggregate.execute(sample_table, ("brand", "=", "avg"))
+
+def test_parse_table(tmp_path):
+    """Тест чтения CSV-файла сразу в колоночную таблицу."""
+    file_path = tmp_path / "test.csv"
+    file_path.write_text("name,price\niphone,999\nredmi,199\n")
+
+    table = CSVParser.parse_table(str(file_path))
+
+    assert table.column_names == ["name", "price"]
+    assert table.column("price").kind == "int"
+    assert table.column("price").to_list() == [999, 199]
+    assert table.to_dict() == {"name": ["iphone", "redmi"], "price": ["999", "199"]}
+
+def test_parse_table_fields(tmp_path):
+    """Тест чтения части колонок: значения те же, что при чтении всех колонок; запись чисел - только для text_fields."""
+    file_path = tmp_path / "test.csv"
+    file_path.write_text("name,brand,price\niphone,apple,999\nredmi\n")
+
+    full = CSVParser.parse_table(str(file_path)).to_dict()
+    assert CSVParser.parse_table(str(file_path), fields={"price"}).to_dict() == {"price": full["price"]}
+    table = CSVParser.parse_table(str(file_path), fields={"price", "name"})
+    assert table.to_dict() == {"name": full["name"], "price": full["price"]}
+    assert CSVParser.parse_table(str(file_path), fields=set()).column_names == ["name", "brand", "price"]
+    assert CSVParser.parse_table(str(file_path), text_fields=set()).column("price").text is None
@@ -0,0 +1,119 @@
+# test_table_cache.py
+import os
+import pytest
+from project.model import table, table_cache, zone_map
+from project.model.csv_parser import CSVParser
+from project.model.schema import Schema
+from project.model.table_cache import CACHE_SUFFIX, TableCache
+
+@pytest.fixture
+def sample_csv(tmp_path):
+    """
+    Фикстура создает CSV-файл с числовыми и строковыми колонками,
+    в том числе со строками не из ASCII.
+    """
+    file_path = tmp_path / "products.csv"
+    file_path.write_text(
+        "name,brand,price,rating\n"
+        "iphone 15 pro,apple,999,4.9\n"
+        "смартфон,xiaomi,199,4.6\n",
+        encoding="utf-8"
+    )
+    return str(file_path)
+
+@pytest.fixture(params=["numpy", "array"])
+def storage(request, monkeypatch):
+    """Фикстура прогоняет тесты с NumPy (если установлен) и без него."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(table, "np", None)
+        monkeypatch.setattr(table_cache, "np", None)
+        monkeypatch.setattr(zone_map, "np", None)
+    return request.param
+
+def test_roundtrip(sample_csv, tmp_path, storage):
+    """Тест сохранения таблицы в кэш и загрузки без разбора CSV."""
+    cache = TableCache(str(tmp_path / "cache"))
+    parsed = cache.get_or_parse(sample_csv, None, lambda: CSVParser.parse_table(sample_csv))
+
+    loaded = cache.get_or_parse(sample_csv, None, lambda: pytest.fail("Файл разобран повторно"))
+
+    assert loaded.to_dict() == parsed.to_dict()
+    assert [column.kind for column in loaded.columns.values()] == ["str", "str", "int", "float"]
+
+def test_invalidated_when_source_changes(sample_csv, tmp_path):
+    """Тест автоматической инвалидации кэша при изменении исходного файла."""
+    cache = TableCache(str(tmp_path / "cache"))
+    cache.store(sample_csv, CSVParser.parse_table(sample_csv))
+
+    with open(sample_csv, "a", encoding="utf-8") as csvfile:
+        csvfile.write("galaxy,samsung,1199,4.8\n")
+
+    assert cache.load(sample_csv) is None
+
+def test_schema_is_part_of_key(sample_csv, tmp_path):
+    """Тест раздельных записей для разных схем."""
+    cache = TableCache(str(tmp_path / "cache"))
+    cache.store(sample_csv, CSVParser.parse_table(sample_csv))
+    assert cache.load(sample_csv, Schema.parse("price:float")) is None
+
+def test_lru_eviction(tmp_path):
+    """Тест вытеснения давно не использованных записей при превышении лимита."""
+    files = []
+    for index in range(3):
+        file_path = tmp_path / f"data{index}.csv"
+        file_path.write_text("value\n" + "\n".join(str(i) for i in range(100)))
+        files.append(str(file_path))
+
+    cache_dir = tmp_path / "cache"
+    cache = TableCache(str(cache_dir))
+    cache.store(files[0], CSVParser.parse_table(files[0]))
+    entry_size = os.path.getsize(next(cache_dir.iterdir()))
+    cache.max_size = entry_size * 2
+
+    cache.store(files[1], CSVParser.parse_table(files[1]))
+    os.utime(cache._entry_path(files[0], None), (0, 0))  # Первая запись - самая старая
+    cache.store(files[2], CSVParser.parse_table(files[2]))
+
+    assert len([name for name in os.listdir(cache_dir) if name.endswith(CACHE_SUFFIX)]) == 2
+    assert cache.load(files[0]) is None
+    assert cache.load(files[2]) is not None
+
+def test_loaded_columns_have_zone_maps(sample_csv, tmp_path, storage):
+    """Тест статистик блоков: сохраняются для числовых колонок и используются после загрузки."""
+    cache = TableCache(str(tmp_path / "cache"))
+    cache.get_or_parse(sample_csv, None, lambda: CSVParser.parse_table(sample_csv))
+    loaded = cache.load(sample_csv)
+
+    assert loaded.column("name").zones is None
+    zones = loaded.column("price").zones
+    assert (zones.mins, zones.maxs, zones.nulls) == ([199], [999], [0])
+    assert loaded.column("price").aggregate("max") == 999
+    assert list(loaded.filter_indices("price", ">", "500")) == [0]
+
+def test_dictionary_columns_roundtrip(tmp_path, storage):
+    """Тест словарной колонки: в кэше хранятся коды и словарь, после загрузки колонка остается словарной."""
+    file_path = tmp_path / "brands.csv"
+    file_path.write_text("brand,price\n" + "".join(f"{brand},{index}\n" for index, brand in
+                                                  enumerate(["apple", "смартфон", "apple", "xiaomi"] * 3)))
+    cache = TableCache(str(tmp_path / "cache"))
+    parsed = cache.get_or_parse(str(file_path), None, lambda: CSVParser.parse_table(str(file_path)))
+    loaded = cache.load(str(file_path))
+
+    assert loaded.column("brand").dictionary == ["apple", "xiaomi", "смартфон"]
+    assert loaded.to_dict() == parsed.to_dict()
+    assert list(loaded.filter_indices("brand", "=", "XIAOMI")) == [3, 7, 11]
+
+def test_number_text_roundtrip(tmp_path, storage):
+    """Тест записи чисел: формат и строки без общего формата восстанавливаются из кэша."""
+    file_path = tmp_path / "codes.csv"
+    file_path.write_text("code,price\n007,4.50\n12,10.00\n")
+    cache = TableCache(str(tmp_path / "cache"))
+    cache.get_or_parse(str(file_path), None, lambda: CSVParser.parse_table(str(file_path)))
+    loaded = cache.load(str(file_path))
+
+    assert loaded.column("code").texts() == ["007", "12"]
+    assert loaded.column("price").text == ".2f" and loaded.column("price").texts() == ["4.50", "10.00"]
+    assert loaded.column("code").to_list() == [7, 12]
+    assert loaded.to_dict() == {"code": ["007", "12"], "price": ["4.50", "10.00"]}
@@ -77,4 +77,9 @@ class TestExpressionParser:
         """Тест правильного определения операторов с разной длиной."""
         # Проверяем что оператор "!=" обрабатывается раньше "="
         result = ExpressionParser.parse_expression("status!=active")
-        assert result == ("status", "!=", "active")
\ No newline at end of file
+        assert result == ("status", "!=", "active")
+
+    def test_parse_expressions_list(self):
+        """Тест разбора списка выражений через запятую без повторов."""
+        result = ExpressionParser.parse_expressions("price=min, price=max,price=min,rating=median")
+        assert result == [("price", "=", "min"), ("price", "=", "max"), ("rating", "=", "median")]
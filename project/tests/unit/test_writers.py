@@ -0,0 +1,78 @@
+# test_writers.py
+import io
+import pytest
+from unittest.mock import MagicMock, patch
+from project.view import results_printer
+from project.view.results_printer import print_results
+from project.view.writers import read_binary, write_results
+
+ROWS = [
+    {"name": "iphone 15 pro", "brand": "apple", "price": "999"},
+    {"name": "redmi, note 12", "brand": "xiaomi", "price": "199"},
+    {"name": "poco\tx5", "brand": None, "price": "299"},
+]
+
+COLUMNS = {"brand": ["apple", "xiaomi", None], "max": [999, 199, None], "avg": [4.5, 4.6, 4.7]}
+
+@pytest.mark.parametrize("output_format, expected", [
+    ("csv", 'name,brand,price\niphone 15 pro,apple,999\n"redmi, note 12",xiaomi,199\npoco\tx5,,299\n'),
+    ("tsv", 'name\tbrand\tprice\niphone 15 pro\tapple\t999\nredmi, note 12\txiaomi\t199\n"poco\tx5"\t\t299\n'),
+    ("jsonl", '{"name": "iphone 15 pro", "brand": "apple", "price": "999"}\n'
+              '{"name": "redmi, note 12", "brand": "xiaomi", "price": "199"}\n'
+              '{"name": "poco\\tx5", "brand": null, "price": "299"}\n'),
+])
+def test_text_formats(output_format, expected):
+    """Тест текстовых форматов: строки из итератора записываются без промежуточного списка."""
+    stream = io.StringIO()
+    assert write_results(iter(ROWS), output_format, stream) == 3
+    assert stream.getvalue() == expected
+
+def test_columns_table_and_batches():
+    """Тест таблицы {колонка: значения} и записи пачками: по одному write на пачку строк."""
+    stream = io.StringIO()
+    write_results(COLUMNS, "csv", stream)
+    assert stream.getvalue() == "brand,max,avg\napple,999,4.5\nxiaomi,199,4.6\n,,4.7\n"
+
+    rows = ({"id": i} for i in range(10))
+    stream = MagicMock()
+    with patch("project.view.writers.BATCH_ROWS", 4):
+        assert write_results(rows, "jsonl", stream) == 10
+    assert stream.write.call_count == 3
+
+def test_binary_round_trip():
+    """Тест двоичного колоночного формата: типы и пропуски сохраняются, группы строк читаются по очереди."""
+    stream = io.BytesIO()
+    with patch("project.view.writers.ROW_GROUP_ROWS", 2):
+        assert write_results(COLUMNS, "binary", stream) == 3
+    stream.seek(0)
+    groups = list(read_binary(stream))
+    assert groups == [
+        {"brand": ["apple", "xiaomi"], "max": [999, 199], "avg": [4.5, 4.6]},
+        {"brand": [None], "max": [None], "avg": [4.7]},
+    ]
+
+    stream = io.BytesIO()
+    write_results(ROWS, "binary", stream)
+    assert list(read_binary(io.BytesIO(stream.getvalue()))) == [{
+        "name": [row["name"] for row in ROWS], "brand": [row["brand"] for row in ROWS], "price": ["999", "199", "299"]
+    }]
+    with pytest.raises(ValueError, match="не в двоичном формате"):
+        list(read_binary(io.BytesIO(b"name,price\n")))
+
+def test_empty_result():
+    """Тест пустого результата: для таблицы колонок выводится только заголовок."""
+    stream = io.StringIO()
+    assert write_results([], "csv", stream) == 0
+    assert stream.getvalue() == ""
+    write_results({"max": []}, "csv", stream)
+    assert stream.getvalue() == "max\n"
+
+def test_table_output_is_capped(capsys):
+    """Тест табличного вывода большого результата: показываются первые строки и подсказка."""
+    with patch.object(results_printer, "TABLE_MAX_ROWS", 2):
+        print_results([{"id": i} for i in range(5)])
+        print_results({"id": [1, 2]})
+    out = capsys.readouterr().out
+    assert "Показаны первые 2 строк из 5" in out
+    assert "|    2 |" not in out.split("Показаны")[0]
+    assert out.count("Показаны") == 1
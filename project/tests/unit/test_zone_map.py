@@ -0,0 +1,70 @@
+# test_zone_map.py
+import pytest
+from project.model import table, zone_map
+from project.model.table import Column, Table
+from project.model.zone_map import ZoneMap
+
+@pytest.fixture(params=["numpy", "array"])
+def storage(request, monkeypatch):
+    """Фикстура прогоняет тесты с NumPy (если установлен) и без него."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(table, "np", None)
+        monkeypatch.setattr(zone_map, "np", None)
+    return request.param
+
+def make_table(values, kind="int", block_rows=4):
+    """Таблица из одной колонки price со статистиками блоков по block_rows строк."""
+    column = Column.from_strings("price", [str(value) for value in values], kind)
+    column.zones = ZoneMap.build(column.values, block_rows)
+    return Table([column])
+
+def test_build_statistics(storage):
+    """Тест вычисления минимума, максимума и количества пропусков по блокам."""
+    column = Column.from_strings("rating", ["4.5", "nan", "3.0", "5.0", "nan", "nan", "1.5"], "float")
+    zones = ZoneMap.build(column.values, 3)
+    assert zones.rows == 7
+    assert zones.mins[:2] == [3.0, 5.0] and zones.maxs[:2] == [4.5, 5.0]
+    assert zones.nulls == [1, 2, 0]
+    assert (zones.min(), zones.max()) == (None, None)
+    assert ZoneMap.from_dict(zones.to_dict()).nulls == zones.nulls
+
+def test_blocks_are_pruned():
+    """Тест отбора блоков: ненужные пропускаются, полностью подходящие отмечаются."""
+    zones = ZoneMap(4, 10, [0, 4, 8], [3, 7, 9], [0, 0, 0])
+    assert list(zones.blocks([(">", 5)])) == [(4, 8, False), (8, 10, True)]
+    assert list(zones.blocks([("=", 2)])) == [(0, 4, False)]
+    assert list(zones.blocks([(">=", 4), ("<=", 7)])) == [(4, 8, True)]
+    assert list(zones.blocks([("<", 0)])) == []
+
+@pytest.mark.parametrize("operator_, value", [
+    (">", "5"), (">=", "4"), ("<", "3"), ("<=", "9"), ("=", "6"), ("!=", "6"), (">", "100"), ("<", "2.5"),
+])
+def test_filter_matches_plain_scan(storage, operator_, value):
+    """Тест фильтра по блокам: результат совпадает с проверкой всех строк."""
+    values = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 6, 6, 1]
+    with_zones = make_table(values)
+    plain = Table([Column.from_strings("price", [str(value) for value in values], "int")])
+    assert list(with_zones.filter_indices("price", operator_, value)) == \
+        list(plain.filter_indices("price", operator_, value))
+
+def test_filter_range(storage):
+    """Тест отрезка: обе границы проверяются по статистикам за один проход."""
+    values = list(range(20))
+    assert list(make_table(values).filter_range("price", "6", "9")) == [6, 7, 8, 9]
+    assert list(make_table(values).filter_range("price", "30", "40")) == []
+
+def test_nan_blocks(storage):
+    """Тест блоков с пропусками: NaN не удовлетворяет сравнениям, кроме !=."""
+    table_ = make_table(["nan", "nan", "nan", "nan", "1.0", "nan", "2.0", "3.0"], kind="float")
+    assert list(table_.filter_indices("price", ">", "0")) == [4, 6, 7]
+    assert list(table_.filter_indices("price", "!=", "2")) == [0, 1, 2, 3, 4, 5, 7]
+    # С пропусками min и max статистик не используются
+    assert table_.column("price").zones.max() is None
+
+def test_aggregate_from_statistics(storage):
+    """Тест min и max из статистик блоков без просмотра значений."""
+    column = make_table([5, 3, 9, 1, 7]).column("price")
+    column.zones.mins, column.zones.maxs = [-1, -2], [100, 50]
+    assert (column.aggregate("min"), column.aggregate("max")) == (-2, 100)
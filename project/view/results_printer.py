@@ -1,15 +1,31 @@
 from typing import Union, List, Dict, Any
 from tabulate import tabulate
 
+# Максимальное количество строк табличного вывода: ширина колонок считается по всем выводимым строкам
+TABLE_MAX_ROWS = 1000
+
 def print_results(data: Union[List[Dict[str, str]], Dict[str, List[Any]]]) -> None:
     """Выводит результаты обработки в табличном формате.
 
+    Выводятся первые TABLE_MAX_ROWS строк; для больших результатов
+    предназначены потоковые форматы --output csv|tsv|jsonl|binary.
+
     Args:
         data: Данные для вывода.
     """
     if data:
+        if isinstance(data, dict):
+            total = max((len(values) for values in data.values()), default=0)
+            shown = {name: values[:TABLE_MAX_ROWS] for name, values in data.items()}
+        else:
+            total = len(data)
+            # tabulate выводит ключи только у словарей, а строки CSV - записи (Record)
+            shown = [dict(row) for row in data[:TABLE_MAX_ROWS]]
         print()
-        print(tabulate(data, headers="keys", tablefmt="github"))
+        print(tabulate(shown, headers="keys", tablefmt="github"))
         print()
+        if total > TABLE_MAX_ROWS:
+            print(f"Показаны первые {TABLE_MAX_ROWS} строк из {total}; "
+                  "полный результат: --output csv, tsv, jsonl или binary")
     else:
         print("Нет данных, соответствующих условиям")
@@ -0,0 +1,255 @@
+import csv
+import io
+import json
+import os
+import struct
+import sys
+from array import array
+from itertools import chain, islice
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
+
+from project.model.row import Record
+
+Result = Union[Iterable[Dict[str, Any]], Dict[str, List[Any]]]
+
+# Форматы вывода: table - таблица tabulate для человека, остальные - для других программ
+OUTPUT_FORMATS = ('table', 'csv', 'tsv', 'jsonl', 'binary')
+
+# Количество строк, форматируемых и записываемых одним вызовом write
+BATCH_ROWS = 4096
+
+# Количество строк в группе двоичного формата
+ROW_GROUP_ROWS = 1 << 16
+
+# Сигнатура двоичного колоночного формата
+BINARY_MAGIC = b'WMCOLS1\n'
+
+# Длина заголовка группы строк: 4 байта little-endian; 0 - конец файла
+GROUP_HEADER = struct.Struct('<I')
+
+
+def write_results(data: Result, output_format: str, stream: Optional[Union[TextIO, BinaryIO]] = None) -> int:
+    """Записывает результат в машиночитаемом формате по мере получения строк.
+
+    Строки не собираются в памяти целиком: они форматируются пачками по
+    BATCH_ROWS и записываются одним вызовом write на пачку.
+
+    Args:
+        data: Строки (список или итератор словарей) или таблица {колонка: значения}.
+        output_format: csv, tsv, jsonl или binary.
+        stream: Поток вывода: текстовый для csv/tsv/jsonl, двоичный для binary.
+            None - стандартный вывод.
+
+    Returns:
+        Количество записанных строк.
+
+    Raises:
+        ValueError: Если формат вывода неизвестен.
+    """
+    if output_format not in WRITERS:
+        raise ValueError(f"Неизвестный формат вывода: {output_format}")
+    if stream is not None:
+        return WRITERS[output_format](stream, *_header_and_rows(data))
+    if output_format == 'binary':
+        sys.stdout.flush()
+        stream = sys.stdout.buffer
+    else:
+        stream = sys.stdout
+    try:
+        written = WRITERS[output_format](stream, *_header_and_rows(data))
+        stream.flush()
+    except BrokenPipeError:
+        # Получатель (например, head) закрыл канал: остаток результата не нужен
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    return written
+
+
+def read_binary(stream: BinaryIO) -> Iterator[Dict[str, List[Any]]]:
+    """Читает результат в двоичном формате по группам строк.
+
+    Args:
+        stream: Двоичный поток, записанный write_results(..., 'binary').
+
+    Yields:
+        Группа строк в виде {колонка: значения}.
+
+    Raises:
+        ValueError: Если данные не в двоичном формате результата.
+    """
+    if stream.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+        raise ValueError("Данные не в двоичном формате результата")
+    while True:
+        length_bytes = stream.read(GROUP_HEADER.size)
+        if len(length_bytes) < GROUP_HEADER.size:
+            raise ValueError("Двоичный результат обрезан")
+        length = GROUP_HEADER.unpack(length_bytes)[0]
+        if not length:
+            return
+        header = json.loads(stream.read(length))
+        group = {}
+        for column in header['columns']:
+            group[column['name']] = _decode_column(
+                stream.read(column['size']), column, header['rows'], header['byteorder'] != sys.byteorder
+            )
+        yield group
+
+
+def _header_and_rows(data: Result) -> Tuple[List[str], Iterator[Sequence[Any]]]:
+    """Приводит результат к заголовку и итератору кортежей значений."""
+    if isinstance(data, dict):
+        return list(data), zip(*data.values())
+    rows = iter(data)
+    first = next(rows, None)
+    if first is None:
+        return [], iter(())
+    header = list(first)
+    if isinstance(first, Record):
+        # Значения записи уже идут в порядке заголовка
+        current = type(first)
+        return header, (
+            row.values() if type(row) is current else tuple(map(row.get, header)) for row in chain((first,), rows)
+        )
+    return header, (tuple(map(row.get, header)) for row in chain((first,), rows))
+
+
+def _batches(rows: Iterator[Sequence[Any]], size: int) -> Iterator[List[Sequence[Any]]]:
+    """Делит итератор строк на списки по size строк."""
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _write_delimited(stream: TextIO, header: List[str], rows: Iterator[Sequence[Any]], delimiter: str) -> int:
+    """Записывает строки с разделителем по правилам модуля csv."""
+    if not header:
+        return 0
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator='\n')
+    writer.writerow(header)
+    written = 0
+    for batch in _batches(rows, BATCH_ROWS):
+        writer.writerows(batch)
+        stream.write(buffer.getvalue())
+        buffer.seek(0)
+        buffer.truncate()
+        written += len(batch)
+    if not written:
+        stream.write(buffer.getvalue())
+    return written
+
+
+def _write_csv(stream: TextIO, header: List[str], rows: Iterator[Sequence[Any]]) -> int:
+    return _write_delimited(stream, header, rows, ',')
+
+
+def _write_tsv(stream: TextIO, header: List[str], rows: Iterator[Sequence[Any]]) -> int:
+    return _write_delimited(stream, header, rows, '\t')
+
+
+def _write_jsonl(stream: TextIO, header: List[str], rows: Iterator[Sequence[Any]]) -> int:
+    """Записывает по одному JSON-объекту на строку."""
+    written = 0
+    for batch in _batches(rows, BATCH_ROWS):
+        stream.write(''.join(json.dumps(dict(zip(header, row)), ensure_ascii=False) + '\n' for row in batch))
+        written += len(batch)
+    return written
+
+
+def _write_binary(stream: BinaryIO, header: List[str], rows: Iterator[Sequence[Any]]) -> int:
+    """Записывает строки в двоичном колоночном формате группами по ROW_GROUP_ROWS.
+
+    Формат: сигнатура BINARY_MAGIC, затем группы строк. Группа - длина
+    JSON-заголовка (4 байта little-endian), заголовок с количеством строк,
+    порядком байтов и описанием колонок (имя, тип, размер, индексы пропусков)
+    и данные колонок подряд: int - массив int64, float - массив float64,
+    str - смещения int64 (строк + 1) и текст UTF-8. Нулевая длина заголовка
+    завершает файл. Числовые колонки читаются без разбора, например
+    numpy.frombuffer.
+    """
+    stream.write(BINARY_MAGIC)
+    written = 0
+    for batch in _batches(rows, ROW_GROUP_ROWS):
+        columns, payloads = [], []
+        for name, values in zip(header, zip(*batch)):
+            description, payload = _encode_column(name, values)
+            columns.append(description)
+            payloads.append(payload)
+        group_header = json.dumps(
+            {'rows': len(batch), 'byteorder': sys.byteorder, 'columns': columns}, ensure_ascii=False
+        ).encode('utf-8')
+        stream.write(GROUP_HEADER.pack(len(group_header)) + group_header + b''.join(payloads))
+        written += len(batch)
+    stream.write(GROUP_HEADER.pack(0))
+    return written
+
+
+def _encode_column(name: str, values: Sequence[Any]) -> Tuple[Dict[str, Any], bytes]:
+    """Кодирует значения колонки группы строк: тип выбирается по самим значениям."""
+    nulls = [index for index, value in enumerate(values) if value is None]
+    kind = _column_kind(values)
+    payload = None
+    if kind == 'int':
+        try:
+            payload = array('q', (0 if value is None else value for value in values)).tobytes()
+        except OverflowError:
+            # Целые вне диапазона int64 хранятся текстом
+            kind = 'str'
+    elif kind == 'float':
+        payload = array('d', (float('nan') if value is None else value for value in values)).tobytes()
+    if payload is None:
+        texts = ['' if value is None else str(value) for value in values]
+        encoded = [text.encode('utf-8') for text in texts]
+        offsets = array('q', [0])
+        for item in encoded:
+            offsets.append(offsets[-1] + len(item))
+        payload = offsets.tobytes() + b''.join(encoded)
+    description = {'name': name, 'kind': kind, 'size': len(payload)}
+    if nulls:
+        description['nulls'] = nulls
+    return description, payload
+
+
+def _column_kind(values: Sequence[Any]) -> str:
+    """Определяет тип колонки в группе строк: int, float или str."""
+    kind = 'int'
+    for value in values:
+        value_type = type(value)
+        if value is None or value_type is int:
+            continue
+        if value_type is float:
+            kind = 'float'
+            continue
+        return 'str'
+    return kind
+
+
+def _decode_column(data: bytes, description: Dict[str, Any], rows: int, swap: bool) -> List[Any]:
+    """Декодирует значения колонки группы строк."""
+    kind = description['kind']
+    if kind in ('int', 'float'):
+        values = array('q' if kind == 'int' else 'd')
+        values.frombytes(data)
+        if swap:
+            values.byteswap()
+        values = values.tolist()
+    else:
+        offsets = array('q')
+        offsets.frombytes(data[:(rows + 1) * offsets.itemsize])
+        if swap:
+            offsets.byteswap()
+        text = data[(rows + 1) * offsets.itemsize:]
+        values = [text[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(rows)]
+    for index in description.get('nulls', ()):
+        values[index] = None
+    return values
+
+
+WRITERS = {
+    'csv': _write_csv,
+    'tsv': _write_tsv,
+    'jsonl': _write_jsonl,
+    'binary': _write_binary,
+}